@@ -1,7 +1,7 @@
 """Nintendo Entertainment System emulator package."""
 
 from .nes import NES
-from .rom import Cartridge, load_ines
+from .rom import Cartridge, load_ines, register_mapper
 
-__all__ = ["NES", "Cartridge", "load_ines"]
+__all__ = ["NES", "Cartridge", "load_ines", "register_mapper"]
 
@@ -3,11 +3,14 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 
-@dataclass
+FRAME_COUNTER_PERIOD = 29830
+
+
+@dataclass(slots=True)
 class APU:
-    registers: list[int] = field(default_factory=lambda: [0] * 0x18)
+    registers: bytearray = field(default_factory=lambda: bytearray(0x18))
     status: int = 0
-    frame_counter: int = 0
+    ticks_until_irq: int = FRAME_COUNTER_PERIOD
     frame_irq_inhibit: bool = False
     frame_irq_flag: bool = False
 
@@ -35,14 +38,13 @@ class APU:
             return value
         return 0
 
-    def clock(self) -> None:
-        self.frame_counter += 1
-        if self.frame_irq_inhibit:
+    def clock(self, cycles: int = 1) -> None:
+        ticks = self.ticks_until_irq - cycles
+        if ticks > 0 or self.frame_irq_inhibit:
+            self.ticks_until_irq = ticks
             return
-        if self.frame_counter >= 29830:
-            self.frame_counter = 0
-            self.frame_irq_flag = True
-
-    def irq_pending(self) -> bool:
-        return self.frame_irq_flag and not self.frame_irq_inhibit
-
+        # Fires on the first tick that reaches zero; a countdown that ran out while inhibited
+        # fires on its first uninhibited tick. Later periods in the same batch fire again.
+        first_irq_tick = max(self.ticks_until_irq, 1)
+        self.ticks_until_irq = FRAME_COUNTER_PERIOD - (cycles - first_irq_tick) % FRAME_COUNTER_PERIOD
+        self.frame_irq_flag = True
@@ -1,121 +1,235 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Any, Callable
 
 from .apu import APU
-from .controller import Controller
+from .controller_backend import resolve_controller_class
 from .cpu import CPU6502
+from .cpu_backend import resolve_cpu_class
+from .mapper import Mapper
 from .ppu_backend import resolve_ppu_class
 from .rom import Cartridge
 
 
-@dataclass
+@dataclass(slots=True)
 class Bus:
     cartridge: Cartridge
     ppu_backend: str = "auto"
+    cpu_backend: str = "auto"
+    controller_backend: str = "auto"
     cpu_ram: bytearray = field(default_factory=lambda: bytearray(2048))
-    controller1: Controller = field(default_factory=Controller)
-    controller2: Controller = field(default_factory=Controller)
+    controller1: Any = None
+    controller2: Any = None
+
+    apu: APU = field(init=False, repr=False)
+    ppu: Any = field(init=False, repr=False)
+    cpu: CPU6502 = field(init=False, repr=False)
+    system_clock_counter: int = field(init=False, repr=False)
+    _apu_clock: Callable[[int], None] = field(init=False, repr=False)
+    _ppu_clock_cpu_cycles: Callable[[int], bool] = field(init=False, repr=False)
+    _mapper: Mapper = field(init=False, repr=False)
+    _cart_start: int = field(init=False, repr=False)
+    _register_start: int = field(init=False, repr=False)
+    _read_table: list[Callable[[int], int]] = field(init=False, repr=False)
+    _write_table: list[Callable[[int, int], None]] = field(init=False, repr=False)
+    _io_write_table: list[Callable[[int, int], None]] = field(init=False, repr=False)
+    _dma_buffer: bytearray = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
         self.apu = APU()
         ppu_class, active_backend = resolve_ppu_class(self.ppu_backend)
         self.ppu = ppu_class(self.cartridge)
         self.ppu_backend = active_backend
-        self.cpu = CPU6502(self.cpu_read, self.cpu_write)
+        cpu_class, active_cpu_backend = resolve_cpu_class(self.cpu_backend)
+        self.cpu = cpu_class(self.cpu_read, self.cpu_write, self.cpu_ram)
+        self.cpu_backend = active_cpu_backend
+        controller_class, self.controller_backend = resolve_controller_class(self.controller_backend)
+        if self.controller1 is None:
+            self.controller1 = controller_class()
+        if self.controller2 is None:
+            self.controller2 = controller_class()
         self.system_clock_counter = 0
+        self._apu_clock = self.apu.clock
+        self._ppu_clock_cpu_cycles = self.ppu.clock_cpu_cycles
+        self._mapper = self.cartridge.mapper
+        self._cart_start = max(0x4020, self._mapper.cpu_map_start)
+        self._register_start = self._mapper.register_start
+        # Lets the translated-block cache tell a bank switch from a change under its code. Mappers
+        # written against the base contract don't provide it, and the CPU then revalidates the bytes.
+        if hasattr(self.cpu, "prg_offset") and type(self._mapper).prg_offset is not Mapper.prg_offset:
+            self.cpu.prg_offset = self._mapper.prg_offset
+        self.cpu.register_start = self._mapper.register_start
+        # One handler per 4 KiB page of the CPU address space, indexed by addr >> 12.
+        self._read_table = [self._read_ram] * 2 + [self._read_ppu] * 2 + [self._read_io]
+        self._write_table = [self._write_ram] * 2 + [self._write_ppu] * 2 + [self._write_io]
+        for page in range(5, 16):
+            mapped = (page + 1) << 12 > self._cart_start
+            self._read_table.append(self._read_cart if mapped else self._read_unmapped)
+            if page << 12 >= self._register_start or page >= 8:
+                self._write_table.append(self._write_mapper_register)
+            elif (page + 1) << 12 > self._register_start:
+                self._write_table.append(self._write_cart_checked)
+            else:
+                self._write_table.append(self._write_cart if mapped else self._write_unmapped)
+        # $4000-$401F registers, indexed by addr - 0x4000.
+        apu_write = self.apu.write
+        self._io_write_table = [apu_write] * 0x14 + [self._write_oam_dma, apu_write, self._write_strobe, apu_write]
+        self._io_write_table += [self._write_unmapped] * 8
+        self._dma_buffer = bytearray(256)
+
+    @property
+    def ram(self) -> memoryview:
+        """The 2 KiB of internal RAM, without the $0800-$1FFF mirrors."""
+        return memoryview(self.cpu_ram)
 
     def cpu_read(self, addr: int) -> int:
-        addr &= 0xFFFF
-        mapped = self.cartridge.mapper.cpu_read(addr)
-        if mapped is not None:
-            return mapped & 0xFF
-
-        if addr <= 0x1FFF:
-            return self.cpu_ram[addr & 0x07FF]
-        if 0x2000 <= addr <= 0x3FFF:
-            return self.ppu.cpu_read(addr & 0x0007)
+        return self._read_table[addr >> 12](addr)
+
+    def read_bytes(self, addr: int, length: int) -> bytes:
+        """Read length bytes as the CPU sees them from addr on, wrapping at $FFFF."""
+        end = addr + length
+        if end <= 0x2000 and (addr & 0x07FF) + length <= 0x0800:
+            base = addr & 0x07FF
+            return bytes(self.cpu_ram[base : base + length])
+        if 0x6000 <= addr and end <= 0x8000:
+            prg_ram = self._mapper.prg_ram_window()
+            if prg_ram is not None and end <= 0x6000 + len(prg_ram):
+                return bytes(prg_ram[addr - 0x6000 : end - 0x6000])
+        cpu_read = self.cpu_read
+        return bytes(cpu_read((addr + i) & 0xFFFF) for i in range(length))
+
+    def _read_ram(self, addr: int) -> int:
+        return self.cpu_ram[addr & 0x07FF]
+
+    def _read_ppu(self, addr: int) -> int:
+        return self.ppu.cpu_read(addr & 0x0007)
+
+    def _read_io(self, addr: int) -> int:
         if addr == 0x4015:
             return self.apu.read(addr)
         if addr == 0x4016:
             return self.controller1.read()
         if addr == 0x4017:
             return self.controller2.read()
+        if addr >= self._cart_start:
+            return self._read_cart(addr)
+        return 0x00
+
+    def _read_cart(self, addr: int) -> int:
+        mapped = self._mapper.cpu_read(addr)
+        if mapped is not None:
+            return mapped
+        return 0x00
+
+    def _read_unmapped(self, addr: int) -> int:
         return 0x00
 
     def _dma_transfer(self, page: int) -> None:
         start = (page & 0xFF) << 8
-        block = bytes(self.cpu_read(start + i) for i in range(256))
-        self.ppu.dma_write(start, block)
+        prg_ram = self._mapper.prg_ram_window() if 0x6000 <= start < 0x8000 else None
+        # Pages are 256-byte aligned, so a RAM or PRG-RAM source never wraps inside its buffer.
+        if start < 0x2000:
+            base = start & 0x07FF
+            self.ppu.oam_dma(memoryview(self.cpu_ram)[base : base + 256])
+        elif prg_ram is not None and start - 0x6000 + 256 <= len(prg_ram):
+            base = start - 0x6000
+            self.ppu.oam_dma(memoryview(prg_ram)[base : base + 256])
+        else:
+            # oam_dma copies the page in, so the gather buffer can be reused for every DMA.
+            buffer = self._dma_buffer
+            cpu_read = self.cpu_read
+            for i in range(256):
+                buffer[i] = cpu_read(start + i)
+            self.ppu.oam_dma(buffer)
         self.cpu.stall_cycles += 513 + (self.cpu.total_cycles & 1)
 
     def cpu_write(self, addr: int, value: int) -> None:
-        addr &= 0xFFFF
-        value &= 0xFF
-        if self.cartridge.mapper.cpu_write(addr, value):
-            return
-
-        if addr <= 0x1FFF:
-            self.cpu_ram[addr & 0x07FF] = value
-            return
-        if 0x2000 <= addr <= 0x3FFF:
-            self.ppu.cpu_write(addr & 0x0007, value)
-            return
-        if 0x4000 <= addr <= 0x4013:
-            self.apu.write(addr, value)
-            return
-        if addr == 0x4014:
-            self._dma_transfer(value)
-            return
-        if addr == 0x4015:
-            self.apu.write(addr, value)
-            return
-        if addr == 0x4016:
-            self.controller1.write(value)
-            self.controller2.write(value)
-            return
-        if addr == 0x4017:
-            self.apu.write(addr, value)
-
-    def clock_cpu_cycles(self, cpu_cycles: int) -> None:
-        apu_clock = self.apu.clock
-        apu_irq_pending = self.apu.irq_pending
-        ppu = self.ppu
-        ppu_clock = ppu.clock
-        mapper_irq_pending = self.cartridge.mapper.irq_pending
-        cpu_request_nmi = self.cpu.request_nmi
-        cpu_request_irq = self.cpu.request_irq
-        system_clock_counter = self.system_clock_counter
-
-        for _ in range(cpu_cycles):
-            apu_clock()
-
-            ppu_clock()
-            if ppu.nmi:
-                ppu.nmi = False
-                cpu_request_nmi()
-            ppu_clock()
-            if ppu.nmi:
-                ppu.nmi = False
-                cpu_request_nmi()
-            ppu_clock()
-            if ppu.nmi:
-                ppu.nmi = False
-                cpu_request_nmi()
-
-            if apu_irq_pending() or mapper_irq_pending():
-                cpu_request_irq()
-            system_clock_counter += 1
-
-        self.system_clock_counter = system_clock_counter
+        self._write_table[addr >> 12](addr, value)
+
+    def _write_ram(self, addr: int, value: int) -> None:
+        self.cpu_ram[addr & 0x07FF] = value
+
+    def _write_ppu(self, addr: int, value: int) -> None:
+        self.ppu.cpu_write(addr & 0x0007, value)
+
+    def _write_io(self, addr: int, value: int) -> None:
+        if addr < 0x4020:
+            self._io_write_table[addr - 0x4000](addr, value)
+        elif addr >= self._cart_start:
+            self._mapper.cpu_write(addr, value)
+            if addr >= self._register_start:
+                self.ppu.notify_mapper_write()
+
+    def _write_oam_dma(self, addr: int, value: int) -> None:
+        self._dma_transfer(value)
+
+    def _write_strobe(self, addr: int, value: int) -> None:
+        # Same as Controller.write on both pads, without the two extra calls.
+        strobe = value & 1
+        controller1 = self.controller1
+        controller2 = self.controller2
+        controller1.strobe = strobe
+        controller2.strobe = strobe
+        if strobe:
+            controller1.shift_register = controller1.state
+            controller2.shift_register = controller2.state
+
+    def _write_unmapped(self, addr: int, value: int) -> None:
+        pass
+
+    def _write_cart(self, addr: int, value: int) -> None:
+        self._mapper.cpu_write(addr, value)
+
+    def _write_cart_checked(self, addr: int, value: int) -> None:
+        # The page that holds Mapper.register_start, when it is not page aligned.
+        self._mapper.cpu_write(addr, value)
+        if addr >= self._register_start:
+            self.ppu.notify_mapper_write()
+
+    def _write_mapper_register(self, addr: int, value: int) -> None:
+        # Writes from Mapper.register_start on are how mappers switch banks and mirroring.
+        self._mapper.cpu_write(addr, value)
+        self.ppu.notify_mapper_write()
+
+    def clock_cpu_cycles(self, cpu_cycles: int) -> bool:
+        self._apu_clock(cpu_cycles)
+        if self._ppu_clock_cpu_cycles(cpu_cycles):
+            self.cpu.request_nmi()
+        # Both IRQ sources latch until the CPU acknowledges them, so sampling once after the
+        # batch sees the same line state as sampling on every cycle. The APU only sets its
+        # flag while the frame IRQ is uninhibited, so the flag alone is the line state.
+        if self.apu.frame_irq_flag or self._mapper.irq_flag:
+            self.cpu.request_irq()
+        self.system_clock_counter += cpu_cycles
+        return self.ppu.frame_complete
 
     def step(self) -> int:
         cycles = self.cpu.step()
         self.clock_cpu_cycles(cycles)
         return cycles
 
+    def run_until_frame(
+        self, max_instructions: int, poll_every: int = 4096, poll: Callable[[], object] | None = None
+    ) -> int:
+        if poll is None:
+            return self.cpu.run(max_instructions, self.clock_cpu_cycles)
+        if poll_every <= 0:
+            raise ValueError("poll_every must be positive when a poll callback is given")
+        # poll runs between slices of poll_every instructions and stops the frame early by returning true.
+        run = self.cpu.run
+        clock = self.clock_cpu_cycles
+        ppu = self.ppu
+        executed = 0
+        while executed < max_instructions:
+            executed += run(min(poll_every, max_instructions - executed), clock)
+            if ppu.frame_complete or poll():
+                break
+        return executed
+
     def reset(self) -> None:
-        self.cpu_ram = bytearray(2048)
+        # Cleared in place: the CPU holds a reference to this buffer.
+        self.cpu_ram[:] = bytes(len(self.cpu_ram))
         self.ppu.reset()
         self.cpu.reset()
         self.system_clock_counter = 0
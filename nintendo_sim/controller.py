@@ -13,28 +13,26 @@ BUTTON_LEFT = 6
 BUTTON_RIGHT = 7
 
 
-@dataclass
+@dataclass(slots=True)
 class Controller:
     state: int = 0
     shift_register: int = 0
-    strobe: bool = False
+    strobe: int = 0
 
     def set_button(self, button: int, pressed: bool) -> None:
-        if pressed:
-            self.state |= 1 << button
-        else:
-            self.state &= ~(1 << button)
-        self.state &= 0xFF
+        mask = 1 << button
+        self.state = ((self.state & ~mask) | (-bool(pressed) & mask)) & 0xFF
 
     def write(self, value: int) -> None:
-        self.strobe = bool(value & 1)
-        if self.strobe:
+        strobe = value & 1
+        self.strobe = strobe
+        if strobe:
             self.shift_register = self.state
 
     def read(self) -> int:
         if self.strobe:
             return self.state & 1
-        result = self.shift_register & 1
-        self.shift_register = ((self.shift_register >> 1) | 0x80) & 0xFF
-        return result
-
+        # The register never exceeds 8 bits, so refilling with 1s needs no extra mask.
+        shift_register = self.shift_register
+        self.shift_register = (shift_register >> 1) | 0x80
+        return shift_register & 1
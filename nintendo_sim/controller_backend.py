@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from typing import Type
+
+from .controller import Controller as PythonController
+from .ppu_backend import VALID_BACKENDS, _load_external_extension
+
+
+def resolve_controller_class(preferred: str | None) -> tuple[Type[PythonController], str]:
+    mode = (preferred or os.getenv("NES_CONTROLLER_BACKEND", "auto")).strip().lower()
+    if mode not in VALID_BACKENDS:
+        raise ValueError(f"Unknown controller backend '{mode}'. Expected one of: {', '.join(VALID_BACKENDS)}")
+
+    if mode in ("auto", "cython"):
+        try:
+            from .controller_cython import Controller as CythonController
+        except Exception as exc:
+            fallback_cls = _load_external_extension("controller_cython", "Controller")
+            if fallback_cls is not None:
+                return fallback_cls, "cython"
+            if mode == "cython":
+                raise RuntimeError(
+                    "Cython controller backend requested but not available. "
+                    "Build/install it first with: python -m pip install ."
+                ) from exc
+        else:
+            return CythonController, "cython"
+
+    return PythonController, "python"
@@ -0,0 +1,33 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+from __future__ import annotations
+
+
+cdef class Controller:
+    cdef public int state
+    cdef public int shift_register
+    cdef public int strobe
+
+    def __init__(self, int state=0, int shift_register=0, int strobe=0):
+        self.state = state
+        self.shift_register = shift_register
+        self.strobe = strobe
+
+    def __repr__(self):
+        return f"Controller(state={self.state}, shift_register={self.shift_register}, strobe={self.strobe})"
+
+    cpdef void set_button(self, int button, bint pressed):
+        cdef int mask = 1 << button
+        self.state = ((self.state & ~mask) | (-pressed & mask)) & 0xFF
+
+    cpdef void write(self, int value):
+        self.strobe = value & 1
+        if self.strobe:
+            self.shift_register = self.state
+
+    cpdef int read(self):
+        cdef int shift_register
+        if self.strobe:
+            return self.state & 1
+        shift_register = self.shift_register
+        self.shift_register = (shift_register >> 1) | 0x80
+        return shift_register & 1
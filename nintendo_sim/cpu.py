@@ -1,7 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Callable
+from typing import Callable, ClassVar
 
 
 FLAG_C = 1 << 0
@@ -14,23 +13,235 @@ FLAG_V = 1 << 6
 FLAG_N = 1 << 7
 
 
+# Z and N bits for every 8-bit result; FLAG_N is bit 7, so N is the value's own top bit.
+_ZN_TABLE = bytes((FLAG_Z if value == 0 else 0) | (value & FLAG_N) for value in range(256))
+
+_MODE_LENGTHS = {
+    "_IMP": 1, "_ACC": 1, "_IMM": 2, "_ZP0": 2, "_ZPX": 2, "_ZPY": 2, "_IZX": 2, "_IZY": 2,
+    "_ABS": 3, "_ABX": 3, "_ABY": 3, "_IND": 3,
+}
+_BLOCK_ENDING_OPS = frozenset(
+    ("_BPL", "_BMI", "_BVC", "_BVS", "_BCC", "_BCS", "_BNE", "_BEQ", "_JMP", "_JSR", "_RTS", "_RTI", "_BRK", "_KIL")
+)
+_STORE_OPS = frozenset(
+    ("_STA", "_STX", "_STY", "_INC", "_DEC", "_ASL", "_LSR", "_ROL", "_ROR", "_SAX", "_DCP", "_ISC", "_RLA", "_RRA",
+     "_SLO", "_SRE", "_AHX", "_TAS", "_SHX", "_SHY")
+)
+_FETCH_OPS = frozenset(
+    ("_ORA", "_AND", "_EOR", "_ADC", "_SBC", "_CMP", "_CPX", "_CPY", "_BIT", "_LDA", "_LDX", "_LDY", "_LAX", "_ANC",
+     "_ALR", "_ARR", "_XAA", "_AXS", "_LAS")
+)
+_MAX_BLOCK_INSTRUCTIONS = 32
+# Translations kept per entry PC, so switching a PRG bank back in reuses its blocks.
+_MAX_BLOCK_VARIANTS = 4
+# Compiled per-opcode handler module, keyed by CPU6502._ram_end.
+_HANDLER_CODE: dict = {}
+_MODE_AWARE_OPS = frozenset(("_AHX", "_TAS", "_SHX", "_SHY"))
+
+# Addressing-mode bodies for the generated per-opcode handlers. On entry pc is the operand
+# address; each body advances self.pc and leaves the effective address in addr.
+_MODE_SOURCES = {
+    "_IMP": ("self.pc = pc", "self.fetched = self.a"),
+    "_ACC": ("self.pc = pc", "self.fetched = self.a"),
+    "_IMM": ("self.pc = (pc + 1) & 0xFFFF", "addr = self.addr_abs = pc"),
+    "_ZP0": ("addr = self.addr_abs = read(pc)", "self.pc = (pc + 1) & 0xFFFF"),
+    "_ZPX": ("addr = self.addr_abs = (read(pc) + self.x) & 0xFF", "self.pc = (pc + 1) & 0xFFFF"),
+    "_ZPY": ("addr = self.addr_abs = (read(pc) + self.y) & 0xFF", "self.pc = (pc + 1) & 0xFFFF"),
+    "_ABS": (
+        "addr = read16(pc)",
+        "self.pc = (pc + 2) & 0xFFFF",
+        "self.addr_base = self.addr_abs = addr",
+    ),
+    "_ABX": (
+        "base = read16(pc)",
+        "self.pc = (pc + 2) & 0xFFFF",
+        "addr = (base + self.x) & 0xFFFF",
+        "self.addr_base = base",
+        "self.addr_abs = addr",
+        "self.page_crossed = ((addr ^ base) >> 8) & 1",
+    ),
+    "_ABY": (
+        "base = read16(pc)",
+        "self.pc = (pc + 2) & 0xFFFF",
+        "addr = (base + self.y) & 0xFFFF",
+        "self.addr_base = base",
+        "self.addr_abs = addr",
+        "self.page_crossed = ((addr ^ base) >> 8) & 1",
+    ),
+    # The pointer's high byte never carries into the next page (the 6502 JMP ($xxFF) bug).
+    "_IND": (
+        "ptr = read16(pc)",
+        "self.pc = (pc + 2) & 0xFFFF",
+        "lo = read(ptr)",
+        "addr = self.addr_abs = lo | (read((ptr & 0xFF00) | ((ptr + 1) & 0xFF)) << 8)",
+    ),
+    "_IZX": (
+        "t = read(pc) + self.x",
+        "self.pc = (pc + 1) & 0xFFFF",
+        "lo = read_fast(t & 0xFF)",
+        "addr = self.addr_abs = lo | (read_fast((t + 1) & 0xFF) << 8)",
+    ),
+    "_IZY": (
+        "t = read(pc)",
+        "self.pc = (pc + 1) & 0xFFFF",
+        "lo = read_fast(t)",
+        "base = lo | (read_fast((t + 1) & 0xFF) << 8)",
+        "addr = (base + self.y) & 0xFFFF",
+        "self.addr_base = base",
+        "self.addr_abs = addr",
+        "self.page_crossed = ((addr ^ base) >> 8) & 1",
+    ),
+}
+
+# Operation bodies inlined into the generated handlers and blocks. value holds the memory operand
+# and addr the effective address; a "store <expr>" line expands to a write specialised for the mode.
+_ZN_TAIL = "self.p = (self.p & 0x7D) | zn[result] | 0x20"
+
+
+def _load(register: str, expr: str) -> tuple[str, ...]:
+    return (f"result = self.{register} = {expr}", _ZN_TAIL)
+
+
+def _compare(register: str) -> tuple[str, ...]:
+    return (
+        f"register = self.{register}",
+        "self.p = (self.p & 0x7C) | (register >= value) | zn[(register - value) & 0xFF] | 0x20",
+    )
+
+
+def _branch(flag: int, taken_bits: int) -> tuple[str, ...]:
+    return (
+        "pc = self.pc",
+        "offset = read(pc)",
+        "pc = (pc + 1) & 0xFFFF",
+        f"if (self.p & {flag:#04x}) != {taken_bits:#04x}:",
+        "    self.pc = pc",
+        "    extra = 0",
+        "else:",
+        "    target = (pc + offset - ((offset & 0x80) << 1)) & 0xFFFF",
+        "    self.pc = target",
+        "    extra = 2 if (pc ^ target) & 0xFF00 else 1",
+    )
+
+
+def _add(prefix: tuple[str, ...], overflow: str) -> tuple[str, ...]:
+    return prefix + (
+        "a = self.a",
+        "temp = a + value + (self.p & 0x01)",
+        "result = self.a = temp & 0xFF",
+        f"self.p = (self.p & 0x3C) | (temp >> 8) | ((({overflow}) & 0x80) >> 1) | zn[result] | 0x20",
+    )
+
+
+_OP_SOURCES = {
+    "_LDA": _load("a", "value"),
+    "_LDX": _load("x", "value"),
+    "_LDY": _load("y", "value"),
+    "_AND": _load("a", "self.a & value"),
+    "_ORA": _load("a", "self.a | value"),
+    "_EOR": _load("a", "self.a ^ value"),
+    "_TAX": _load("x", "self.a"),
+    "_TAY": _load("y", "self.a"),
+    "_TXA": _load("a", "self.x"),
+    "_TYA": _load("a", "self.y"),
+    "_TSX": _load("x", "self.sp"),
+    "_TXS": ("self.sp = self.x",),
+    "_INX": _load("x", "(self.x + 1) & 0xFF"),
+    "_INY": _load("y", "(self.y + 1) & 0xFF"),
+    "_DEX": _load("x", "(self.x - 1) & 0xFF"),
+    "_DEY": _load("y", "(self.y - 1) & 0xFF"),
+    "_ADC": _add((), "~(a ^ value) & (a ^ result)"),
+    "_SBC": _add(("value ^= 0xFF",), "(temp ^ a) & (temp ^ value)"),
+    "_CMP": _compare("a"),
+    "_CPX": _compare("x"),
+    "_CPY": _compare("y"),
+    "_BIT": ("self.p = (self.p & 0x3D) | (zn[self.a & value] & 0x02) | (value & 0xC0) | 0x20",),
+    "_STA": ("store self.a",),
+    "_STX": ("store self.x",),
+    "_STY": ("store self.y",),
+    "_SAX": ("store self.a & self.x",),
+    "_INC": ("result = (value + 1) & 0xFF", "store result", _ZN_TAIL),
+    "_DEC": ("result = (value - 1) & 0xFF", "store result", _ZN_TAIL),
+    "_CLC": ("self.p &= 0xFE",),
+    "_SEC": ("self.p |= 0x01",),
+    "_CLI": ("self.p = (self.p & 0xFB) | 0x20",),
+    "_SEI": ("self.p |= 0x24",),
+    "_CLD": ("self.p = (self.p & 0xF7) | 0x20",),
+    "_SED": ("self.p |= 0x28",),
+    "_CLV": ("self.p = (self.p & 0xBF) | 0x20",),
+    "_NOP": (),
+    "_JMP": ("self.pc = addr",),
+    "_JSR": ("ret = (self.pc - 1) & 0xFFFF", "push(ret >> 8)", "push(ret & 0xFF)", "self.pc = addr"),
+    "_RTS": ("lo = pull()", "self.pc = (((pull() << 8) | lo) + 1) & 0xFFFF"),
+    "_PHA": ("push(self.a)",),
+    "_PHP": ("push(self.p | 0x30)",),
+    "_PLA": _load("a", "pull()"),
+}
+# Flag bit and the value it must have for each conditional branch to be taken.
+_BRANCH_TESTS = {
+    "_BPL": (FLAG_N, 0), "_BMI": (FLAG_N, FLAG_N), "_BVC": (FLAG_V, 0), "_BVS": (FLAG_V, FLAG_V),
+    "_BCC": (FLAG_C, 0), "_BCS": (FLAG_C, FLAG_C), "_BNE": (FLAG_Z, 0), "_BEQ": (FLAG_Z, FLAG_Z),
+}
+_OP_SOURCES.update((name, _branch(flag, taken_bits)) for name, (flag, taken_bits) in _BRANCH_TESTS.items())
+# Inlined operations that read their operand even though the interpreter path does not pre-fetch it.
+_INLINE_RMW_OPS = frozenset(("_INC", "_DEC"))
+
+
+def _expand_op(source: tuple[str, ...], store: Callable[[str], list[str]]) -> list[str]:
+    lines = []
+    for line in source:
+        if line.startswith("store "):
+            lines.extend(store(line[6:]))
+        else:
+            lines.append(line)
+    return lines
+
 AddressMode = Callable[[], None]
-Operation = Callable[[], int]
+Operation = Callable[["CPU6502"], int]
+
+# Bits of CPU6502._pending: anything that keeps the next instruction from running normally.
+_PENDING_HALT = 1 << 0
+_PENDING_STALL = 1 << 1
+_PENDING_NMI = 1 << 2
+_PENDING_IRQ = 1 << 3
+
 
+def _pending_flag(bit: int) -> property:
+    def get(self: CPU6502) -> bool:
+        return bool(self._pending & bit)
 
-@dataclass
-class Instruction:
-    name: str
-    mode: AddressMode
-    operate: Operation
-    cycles: int
-    page_cycle: bool = False
+    def set(self: CPU6502, value: bool) -> None:
+        self._pending = self._pending | bit if value else self._pending & ~bit
+
+    return property(get, set)
 
 
 class CPU6502:
-    def __init__(self, read: Callable[[int], int], write: Callable[[int, int], None]) -> None:
+    __slots__ = (
+        "_read", "_write", "_ram", "_ram_end",
+        "a", "x", "y", "sp", "pc", "p",
+        "addr_abs", "addr_base", "fetched", "page_crossed", "current_mode",
+        "total_cycles", "_stall_cycles", "_pending",
+        "_handlers",
+        "_blocks", "_block_variants", "_rom_generation", "prg_offset", "register_start",
+    )
+
+    # Decode tables shared by every instance, filled in once at import by _build_lookup().
+    _names: ClassVar[list[str]]
+    _modes: ClassVar[list[AddressMode]]
+    _ops: ClassVar[list[Operation]]
+    _cycles: ClassVar[bytearray]
+    _page_cycles: ClassVar[bytearray]
+    _needs_fetch: ClassVar[bytes]
+
+    def __init__(
+        self, read: Callable[[int], int], write: Callable[[int, int], None], ram: bytearray | None = None
+    ) -> None:
         self._read = read
         self._write = write
+        # With the bus work RAM attached, $0000-$1FFF (2 KiB mirrored) bypasses the callbacks.
+        self._ram = ram if ram is not None else bytearray(0x0800)
+        self._ram_end = 0x2000 if ram is not None else 0
 
         self.a = 0
         self.x = 0
@@ -41,54 +252,60 @@ class CPU6502:
 
         self.addr_abs = 0
         self.addr_base = 0
-        self.addr_rel = 0
         self.fetched = 0
-        self.page_crossed = False
+        self.page_crossed = 0
         self.current_mode: AddressMode = self._IMP
-        self.halted = False
 
         self.total_cycles = 0
-        self.stall_cycles = 0
-        self.requested_nmi = False
-        self.requested_irq = False
-
-        self.lookup = [Instruction("NOP", self._IMP, self._NOP, 2) for _ in range(256)]
-        self._build_lookup()
-
-    def _clip8(self, value: int) -> int:
-        return value & 0xFF
-
-    def _clip16(self, value: int) -> int:
-        return value & 0xFFFF
+        self._stall_cycles = 0
+        self._pending = 0
+
+        self._handlers = self._build_handlers()
+        # Translated straight-line blocks in $8000-$FFFF, keyed by entry PC; see _translate_block.
+        self._blocks: dict[int, list] = {}
+        self._block_variants: dict[int, list[list]] = {}
+        self._rom_generation = 0
+        # Optional mapper hook giving the PRG ROM offset behind a $8000+ address (see Mapper.prg_offset).
+        self.prg_offset: Callable[[int], int] | None = None
+        # Lowest address of the mapper's bank registers (see Mapper.register_start).
+        self.register_start = 0x8000
 
     def _read16(self, addr: int) -> int:
-        lo = self._read(addr & 0xFFFF)
+        # A pair inside the work RAM mirrors comes straight from the buffer in one call.
+        if addr < self._ram_end - 1:
+            ram = self._ram
+            return ram[addr & 0x07FF] | (ram[(addr + 1) & 0x07FF] << 8)
+        lo = self._read(addr)
         hi = self._read((addr + 1) & 0xFFFF)
         return (hi << 8) | lo
 
+    def _read_fast(self, addr: int) -> int:
+        if addr < self._ram_end:
+            return self._ram[addr & 0x07FF]
+        return self._read(addr)
+
+    def _write_fast(self, addr: int, value: int) -> None:
+        if addr < self._ram_end:
+            self._ram[addr & 0x07FF] = value
+        else:
+            if addr >= self.register_start:
+                self._rom_generation += 1
+            self._write(addr, value)
+
     def _push(self, value: int) -> None:
-        self._write(0x0100 + self.sp, value & 0xFF)
+        addr = 0x0100 | self.sp
+        if addr < self._ram_end:
+            self._ram[addr] = value
+        else:
+            self._write(addr, value)
         self.sp = (self.sp - 1) & 0xFF
 
     def _pull(self) -> int:
         self.sp = (self.sp + 1) & 0xFF
-        return self._read(0x0100 + self.sp)
-
-    def _set_flag(self, flag: int, value: bool) -> None:
-        if value:
-            self.p |= flag
-        else:
-            self.p &= ~flag
-        self.p |= FLAG_U
-        self.p &= 0xFF
-
-    def _get_flag(self, flag: int) -> int:
-        return 1 if (self.p & flag) else 0
-
-    def _set_zn(self, value: int) -> None:
-        value &= 0xFF
-        self._set_flag(FLAG_Z, value == 0)
-        self._set_flag(FLAG_N, bool(value & 0x80))
+        addr = 0x0100 | self.sp
+        if addr < self._ram_end:
+            return self._ram[addr]
+        return self._read(addr)
 
     def reset(self) -> None:
         self.a = 0
@@ -98,24 +315,40 @@ class CPU6502:
         self.p = FLAG_U | FLAG_I
         self.addr_abs = 0
         self.addr_base = 0
-        self.addr_rel = 0
         self.fetched = 0
-        self.page_crossed = False
-        self.halted = False
-        self.stall_cycles = 0
-        self.requested_nmi = False
-        self.requested_irq = False
+        self.page_crossed = 0
+        self._stall_cycles = 0
+        self._pending = 0
         self.pc = self._read16(0xFFFC)
         self.total_cycles = 7
+        self._rom_generation += 1
+        # Decode the code at the NMI, reset and IRQ entry points up front, not on first entry.
+        for vector in (0xFFFA, 0xFFFC, 0xFFFE):
+            entry = self._read16(vector)
+            if entry >= 0x8000:
+                self._translate_block(entry)
+
+    halted = _pending_flag(_PENDING_HALT)
+    requested_nmi = _pending_flag(_PENDING_NMI)
+    requested_irq = _pending_flag(_PENDING_IRQ)
+
+    @property
+    def stall_cycles(self) -> int:
+        return self._stall_cycles
+
+    @stall_cycles.setter
+    def stall_cycles(self, value: int) -> None:
+        self._stall_cycles = value
+        self._pending = self._pending | _PENDING_STALL if value > 0 else self._pending & ~_PENDING_STALL
 
     def request_nmi(self) -> None:
-        self.requested_nmi = True
+        self._pending |= _PENDING_NMI
 
     def request_irq(self) -> None:
-        self.requested_irq = True
+        self._pending |= _PENDING_IRQ
 
     def _service_interrupt(self, vector: int, is_brk: bool = False) -> int:
-        self._push((self.pc >> 8) & 0xFF)
+        self._push(self.pc >> 8)
         self._push(self.pc & 0xFF)
         status = self.p
         status |= FLAG_U
@@ -124,49 +357,292 @@ class CPU6502:
         else:
             status &= ~FLAG_B
         self._push(status)
-        self._set_flag(FLAG_I, True)
+        self.p |= FLAG_I | FLAG_U
         self.pc = self._read16(vector)
         return 7
 
     def step(self) -> int:
-        if self.halted:
-            self.total_cycles += 1
-            return 1
-
-        if self.stall_cycles > 0:
-            self.stall_cycles -= 1
-            self.total_cycles += 1
-            return 1
-
-        if self.requested_nmi:
-            self.requested_nmi = False
-            cycles = self._service_interrupt(0xFFFA, is_brk=False)
-            self.total_cycles += cycles
-            return cycles
-
-        if self.requested_irq and not self._get_flag(FLAG_I):
-            self.requested_irq = False
-            cycles = self._service_interrupt(0xFFFE, is_brk=False)
-            self.total_cycles += cycles
-            return cycles
-        self.requested_irq = False
-
-        opcode = self._read(self.pc)
-        self.pc = (self.pc + 1) & 0xFFFF
-
-        instruction = self.lookup[opcode]
-        self.current_mode = instruction.mode
-        self.page_crossed = False
-        instruction.mode()
-        extra = instruction.operate()
-        cycles = instruction.cycles + extra + (1 if instruction.page_cycle and self.page_crossed else 0)
+        pending = self._pending
+        if pending:
+            if pending & _PENDING_HALT:
+                self.total_cycles += 1
+                return 1
+
+            if pending & _PENDING_STALL:
+                self.stall_cycles = self._stall_cycles - 1
+                self.total_cycles += 1
+                return 1
+
+            if pending & _PENDING_NMI:
+                self._pending = pending & ~_PENDING_NMI
+                cycles = self._service_interrupt(0xFFFA, is_brk=False)
+                self.total_cycles += cycles
+                return cycles
+
+            # Only the IRQ bit is left; a masked request is dropped.
+            self._pending = 0
+            if not self.p & FLAG_I:
+                cycles = self._service_interrupt(0xFFFE, is_brk=False)
+                self.total_cycles += cycles
+                return cycles
+
+        pc = self.pc
+        cycles = self._handlers[self._read(pc)]((pc + 1) & 0xFFFF)
         self.total_cycles += cycles
         return cycles
 
-    def _fetch(self) -> int:
-        if self.current_mode not in (self._IMP, self._ACC):
-            self.fetched = self._read(self.addr_abs)
-        return self.fetched
+    def run(self, max_instructions: int, clock: Callable[[int], object]) -> int:
+        """Run up to max_instructions, stopping early once clock(cycles) returns true."""
+        read = self._read
+        handlers = self._handlers
+        blocks = self._blocks
+        executed = 0
+        while executed < max_instructions:
+            if self._pending:
+                if self._pending != _PENDING_IRQ or not self.p & FLAG_I:
+                    executed += 1
+                    if clock(self.step()):
+                        break
+                    continue
+                # A masked IRQ request is dropped at the start of every instruction, as in step().
+                self._pending = 0
+            pc = self.pc
+            if pc >= 0x8000:
+                block = blocks.get(pc)
+                if block is None or block[0] != self._rom_generation:
+                    block = self._translate_block(pc)
+                if block[1] <= max_instructions - executed:
+                    done = block[2](clock)
+                    if done < 0:
+                        executed -= done
+                        break
+                    executed += done
+                    continue
+            executed += 1
+            cycles = handlers[read(pc)]((pc + 1) & 0xFFFF)
+            self.total_cycles += cycles
+            if clock(cycles):
+                break
+        return executed
+
+    def _build_handlers(self) -> list[Callable[[int], int]]:
+        # One generated function per opcode: addressing mode, operand fetch, operation call and
+        # cycle count in a single body. Called with the operand address, returns the cycles taken.
+        namespace: dict = {
+            "self": self, "read": self._read, "read16": self._read16, "read_fast": self._read_fast,
+            "write": self._write_fast, "push": self._push, "pull": self._pull, "ram": self._ram, "zn": _ZN_TABLE,
+        }
+        namespace.update((f"op_{opcode:02X}", op) for opcode, op in enumerate(self._ops))
+        # The source depends only on the shared decode tables and whether work RAM is attached,
+        # so it is compiled once per layout and executed against each instance's namespace.
+        code = _HANDLER_CODE.get(self._ram_end)
+        if code is None:
+            code = _HANDLER_CODE[self._ram_end] = compile(self._handler_source(), "<cpu handlers>", "exec")
+        exec(code, namespace)
+        return [namespace[f"handler_{opcode:02X}"] for opcode in range(256)]
+
+    def _handler_source(self) -> str:
+        ram_end = f"{self._ram_end:#06x}"
+        lines = []
+        for opcode in range(256):
+            mode_name = self._modes[opcode].__name__
+            op = self._ops[opcode]
+            inline = _OP_SOURCES.get(op.__name__)
+            lines.append(f"def handler_{opcode:02X}(pc):")
+            lines.extend(f"    {line}" for line in _MODE_SOURCES[mode_name])
+            if op.__name__ in _MODE_AWARE_OPS:
+                lines.append(f"    self.current_mode = self.{mode_name}")
+            penalty = " + self.page_crossed" if self._page_cycles[opcode] and mode_name in ("_ABX", "_ABY", "_IZY") else ""
+            if inline is None:
+                if self._needs_fetch[opcode]:
+                    lines.append(f"    self.fetched = ram[addr & 0x07FF] if addr < {ram_end} else read(addr)")
+                lines.append(f"    return {self._cycles[opcode]} + op_{opcode:02X}(self){penalty}")
+                continue
+            if self._needs_fetch[opcode] or op.__name__ in _INLINE_RMW_OPS:
+                lines.append(f"    value = ram[addr & 0x07FF] if addr < {ram_end} else read(addr)")
+            body = _expand_op(inline, lambda expr: self._store_source(expr, mode_name))
+            lines.extend(f"    {line}" for line in body)
+            if any(line.lstrip().startswith("extra = ") for line in body):
+                penalty += " + extra"
+            lines.append(f"    return {self._cycles[opcode]}{penalty}")
+        return "\n".join(lines)
+
+    def _store_source(self, expr: str, mode_name: str, target: int | None = None) -> list[str]:
+        # Write of expr to the effective address, for generated code; target is a constant address if known.
+        if target is not None:
+            if target < self._ram_end:
+                return [f"ram[{target & 0x07FF:#06x}] = {expr}"]
+            return [f"write({target:#06x}, {expr})"]
+        if mode_name in ("_ZPX", "_ZPY") and self._ram_end:
+            return [f"ram[addr] = {expr}"]
+        return [f"if addr < {self._ram_end:#06x}:", f"    ram[addr & 0x07FF] = {expr}", "else:", f"    write(addr, {expr})"]
+
+    def _translate_block(self, start: int) -> list:
+        # Blocks are cached per entry PC. A CPU write at register_start or above (a mapper register) bumps
+        # _rom_generation; cached blocks are then revalidated against the bytes they were built from.
+        # With a prg_offset hook, a block whose first and last byte still map to the same ROM
+        # offsets (it spans at most two bank windows) is known valid without rereading it.
+        read = self._read
+        prg_offset = self.prg_offset
+        variants = self._block_variants.setdefault(start, [])
+        for cached in variants:
+            end = start + len(cached[3]) - 1
+            key = (prg_offset(start), prg_offset(end)) if prg_offset is not None and end >= start else None
+            if (key is not None and key == cached[4]) or all(
+                read(start + i) == value for i, value in enumerate(cached[3])
+            ):
+                cached[0] = self._rom_generation
+                cached[4] = key
+                self._blocks[start] = cached
+                return cached
+
+        lines = ["def block(clock):"]
+        namespace: dict = {
+            "self": self, "ram": self._ram, "read": read, "write": self._write_fast, "push": self._push, "pull": self._pull,
+            "zn": _ZN_TABLE,
+        }
+        code = bytearray()
+        pc = start
+        count = 0
+        while True:
+            opcode = read(pc)
+            mode = self._modes[opcode]
+            op = self._ops[opcode]
+            mode_name = mode.__name__
+            length = _MODE_LENGTHS[mode_name]
+            if pc + length > 0x10000:
+                # This instruction wraps past $FFFF; end the block before it and let step() run it.
+                if count:
+                    lines.append(f"    self.pc = {pc:#06x}")
+                    lines.append(f"    return {count}")
+                break
+            operand = [read(pc + i) for i in range(1, length)]
+            code.append(opcode)
+            code += bytes(operand)
+            count += 1
+            namespace[f"op{count}"] = op
+            next_pc = pc + length
+            word = (operand[1] << 8) | operand[0] if length == 3 else 0
+            name = op.__name__
+            inline = _OP_SOURCES.get(name)
+            target = word if mode_name == "_ABS" else operand[0] if mode_name == "_ZP0" else None
+            body = [] if inline is None else _expand_op(inline, lambda expr: self._store_source(expr, mode_name, target))
+            # Stop after control flow, after stores that might hit a mapper register, and at the length cap.
+            last = (
+                name in _BLOCK_ENDING_OPS
+                or (
+                    name in _STORE_OPS
+                    and mode_name not in ("_ZP0", "_ZPX", "_ZPY")
+                    and not (mode_name == "_ABS" and word < self.register_start)
+                )
+                or count == _MAX_BLOCK_INSTRUCTIONS
+                or next_pc > 0xFFFF
+            )
+            # Inlined bodies work on locals, so the addressing latches are only written for called
+            # operations, and self.pc only where something can observe it.
+            latch = inline is None
+            sync_pc = last or latch or any("self.pc" in line for line in body)
+            crossed = "self.page_crossed" if latch else "crossed"
+            emit = lines.append
+            if sync_pc:
+                emit(f"    self.pc = {next_pc & 0xFFFF:#06x}")
+            if name in _MODE_AWARE_OPS:
+                namespace[f"mode{count}"] = getattr(self, mode_name)
+                emit(f"    self.current_mode = mode{count}")
+            if mode_name in ("_IMP", "_ACC"):
+                if latch:
+                    emit("    self.fetched = self.a")
+            elif mode_name == "_IMM":
+                if latch:
+                    emit(f"    self.addr_abs = {pc + 1:#06x}")
+            elif mode_name == "_ZP0":
+                if latch:
+                    emit(f"    self.addr_abs = {operand[0]:#04x}")
+            elif mode_name in ("_ZPX", "_ZPY"):
+                index = "self.x" if mode_name == "_ZPX" else "self.y"
+                emit(f"    addr = ({operand[0]:#04x} + {index}) & 0xFF")
+                if latch:
+                    emit("    self.addr_abs = addr")
+            elif mode_name == "_ABS":
+                if latch:
+                    emit(f"    self.addr_base = self.addr_abs = {word:#06x}")
+            elif mode_name in ("_ABX", "_ABY"):
+                index = "self.x" if mode_name == "_ABX" else "self.y"
+                emit(f"    addr = ({word:#06x} + {index}) & 0xFFFF")
+                if latch:
+                    emit(f"    self.addr_base = {word:#06x}")
+                    emit("    self.addr_abs = addr")
+                if latch or self._page_cycles[opcode]:
+                    emit(f"    {crossed} = ((addr ^ {word:#06x}) >> 8) & 1")
+            elif mode_name == "_IND":
+                hi_addr = (word & 0xFF00) if operand[0] == 0xFF else (word + 1) & 0xFFFF
+                emit(f"    lo = read({word:#06x})")
+                emit(f"    addr = (read({hi_addr:#06x}) << 8) | lo")
+                if latch:
+                    emit("    self.addr_abs = addr")
+            elif mode_name == "_IZX":
+                emit(f"    lo = self._read_fast(({operand[0]:#04x} + self.x) & 0xFF)")
+                emit(f"    addr = (self._read_fast(({operand[0]:#04x} + self.x + 1) & 0xFF) << 8) | lo")
+                if latch:
+                    emit("    self.addr_abs = addr")
+            else:
+                emit(f"    lo = self._read_fast({operand[0]:#04x})")
+                emit(f"    base = (self._read_fast({(operand[0] + 1) & 0xFF:#04x}) << 8) | lo")
+                emit("    addr = (base + self.y) & 0xFFFF")
+                if latch:
+                    emit("    self.addr_base = base")
+                    emit("    self.addr_abs = addr")
+                if latch or self._page_cycles[opcode]:
+                    emit(f"    {crossed} = ((addr ^ base) >> 8) & 1")
+            if self._needs_fetch[opcode] or (inline is not None and name in _INLINE_RMW_OPS):
+                dest = "self.fetched" if inline is None else "value"
+                if mode_name == "_IMM":
+                    emit(f"    {dest} = {operand[0]:#04x}")
+                elif target is not None:
+                    if target < self._ram_end:
+                        emit(f"    {dest} = ram[{target & 0x07FF:#06x}]")
+                    else:
+                        emit(f"    {dest} = read({target:#06x})")
+                else:
+                    emit(f"    {dest} = ram[addr & 0x07FF] if addr < {self._ram_end:#06x} else read(addr)")
+            penalty = f" + {crossed}" if self._page_cycles[opcode] else ""
+            if inline is None:
+                emit(f"    cycles = {self._cycles[opcode]} + op{count}(self){penalty}")
+            else:
+                if target is not None and any("addr" in line for line in body):
+                    emit(f"    addr = {target:#06x}")
+                for line in body:
+                    emit(f"    {line}")
+                if any(line.lstrip().startswith("extra = ") for line in body):
+                    penalty += " + extra"
+                emit(f"    cycles = {self._cycles[opcode]}{penalty}")
+            emit("    self.total_cycles += cycles")
+            if last:
+                emit(f"    return -{count} if clock(cycles) else {count}")
+                break
+            # Without an earlier sync, pc is only stored on the way out of the block.
+            exit_pc = "" if sync_pc else f"self.pc = {next_pc:#06x}; "
+            emit("    if clock(cycles):")
+            emit(f"        {exit_pc}return -{count}")
+            emit("    if self._pending:")
+            emit(f"        if self._pending != {_PENDING_IRQ} or not self.p & {FLAG_I}:")
+            emit(f"            {exit_pc}return {count}")
+            emit("        self._pending = 0")
+            pc = next_pc
+
+        if count == 0:
+            # The first instruction would wrap past $FFFF; leave it to the per-instruction path.
+            block = [self._rom_generation, 1 << 30, None, b"", None]
+        else:
+            exec(compile("\n".join(lines), f"<block {start:#06x}>", "exec"), namespace)
+            key = None
+            if prg_offset is not None:
+                key = (prg_offset(start), prg_offset(start + len(code) - 1))
+            block = [self._rom_generation, count, namespace["block"], bytes(code), key]
+        variants.insert(0, block)
+        del variants[_MAX_BLOCK_VARIANTS:]
+        self._blocks[start] = block
+        return block
 
     # Addressing modes
     def _IMP(self) -> None:
@@ -180,7 +656,7 @@ class CPU6502:
         self.pc = (self.pc + 1) & 0xFFFF
 
     def _ZP0(self) -> None:
-        self.addr_abs = self._read(self.pc) & 0x00FF
+        self.addr_abs = self._read(self.pc)
         self.pc = (self.pc + 1) & 0xFFFF
 
     def _ZPX(self) -> None:
@@ -191,34 +667,21 @@ class CPU6502:
         self.addr_abs = (self._read(self.pc) + self.y) & 0x00FF
         self.pc = (self.pc + 1) & 0xFFFF
 
-    def _REL(self) -> None:
-        value = self._read(self.pc)
-        self.pc = (self.pc + 1) & 0xFFFF
-        if value & 0x80:
-            value -= 0x100
-        self.addr_rel = value
-
     def _ABS(self) -> None:
-        lo = self._read(self.pc)
-        hi = self._read((self.pc + 1) & 0xFFFF)
-        self.addr_base = (hi << 8) | lo
+        self.addr_base = self._read16(self.pc)
         self.addr_abs = self.addr_base
         self.pc = (self.pc + 2) & 0xFFFF
 
     def _ABX(self) -> None:
-        lo = self._read(self.pc)
-        hi = self._read((self.pc + 1) & 0xFFFF)
-        self.addr_base = (hi << 8) | lo
+        self.addr_base = self._read16(self.pc)
         self.addr_abs = (self.addr_base + self.x) & 0xFFFF
-        self.page_crossed = (self.addr_abs & 0xFF00) != (self.addr_base & 0xFF00)
+        self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
         self.pc = (self.pc + 2) & 0xFFFF
 
     def _ABY(self) -> None:
-        lo = self._read(self.pc)
-        hi = self._read((self.pc + 1) & 0xFFFF)
-        self.addr_base = (hi << 8) | lo
+        self.addr_base = self._read16(self.pc)
         self.addr_abs = (self.addr_base + self.y) & 0xFFFF
-        self.page_crossed = (self.addr_abs & 0xFF00) != (self.addr_base & 0xFF00)
+        self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
         self.pc = (self.pc + 2) & 0xFFFF
 
     def _IND(self) -> None:
@@ -237,244 +700,254 @@ class CPU6502:
     def _IZX(self) -> None:
         t = self._read(self.pc)
         self.pc = (self.pc + 1) & 0xFFFF
-        lo = self._read((t + self.x) & 0x00FF)
-        hi = self._read((t + self.x + 1) & 0x00FF)
+        lo = self._read_fast((t + self.x) & 0x00FF)
+        hi = self._read_fast((t + self.x + 1) & 0x00FF)
         self.addr_abs = (hi << 8) | lo
 
     def _IZY(self) -> None:
         t = self._read(self.pc)
         self.pc = (self.pc + 1) & 0xFFFF
-        lo = self._read(t & 0x00FF)
-        hi = self._read((t + 1) & 0x00FF)
+        lo = self._read_fast(t)
+        hi = self._read_fast((t + 1) & 0x00FF)
         self.addr_base = (hi << 8) | lo
         self.addr_abs = (self.addr_base + self.y) & 0xFFFF
-        self.page_crossed = (self.addr_abs & 0xFF00) != (self.addr_base & 0xFF00)
+        self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
 
     # Operations
+    # Flag updates below compute C, V, Z and N together and store self.p once.
     def _ADC_value(self, value: int) -> None:
-        temp = self.a + value + self._get_flag(FLAG_C)
-        self._set_flag(FLAG_C, temp > 0xFF)
+        a = self.a
+        temp = a + value + (self.p & FLAG_C)
         result = temp & 0xFF
-        self._set_flag(FLAG_V, bool((~(self.a ^ value) & (self.a ^ result)) & 0x80))
+        overflow = (~(a ^ value) & (a ^ result)) & 0x80
         self.a = result
-        self._set_zn(self.a)
+        self.p = (self.p & 0x3C) | (temp >> 8) | (overflow >> 1) | _ZN_TABLE[result] | FLAG_U
 
     def _SBC_value(self, value: int) -> None:
         value ^= 0xFF
-        temp = self.a + value + self._get_flag(FLAG_C)
-        self._set_flag(FLAG_C, temp > 0xFF)
+        a = self.a
+        temp = a + value + (self.p & FLAG_C)
         result = temp & 0xFF
-        self._set_flag(FLAG_V, bool(((temp ^ self.a) & (temp ^ value)) & 0x80))
+        overflow = ((temp ^ a) & (temp ^ value)) & 0x80
         self.a = result
-        self._set_zn(self.a)
-
-    def _branch(self, condition: bool) -> int:
-        if not condition:
-            return 0
-        old_pc = self.pc
-        self.pc = (self.pc + self.addr_rel) & 0xFFFF
-        if (old_pc & 0xFF00) != (self.pc & 0xFF00):
-            return 2
-        return 1
+        self.p = (self.p & 0x3C) | (temp >> 8) | (overflow >> 1) | _ZN_TABLE[result] | FLAG_U
+
+    @staticmethod
+    def _make_branch(name: str) -> Operation:
+        # Fused relative addressing + flag test + page-cross penalty, installed with the no-read _IMP mode.
+        flag, taken_bits = _BRANCH_TESTS[name]
+
+        def branch(self: CPU6502) -> int:
+            pc = self.pc
+            offset = self._read(pc)
+            pc = (pc + 1) & 0xFFFF
+            if (self.p & flag) != taken_bits:
+                self.pc = pc
+                return 0
+            if offset & 0x80:
+                offset -= 0x100
+            target = (pc + offset) & 0xFFFF
+            self.pc = target
+            return 2 if (pc ^ target) & 0xFF00 else 1
+
+        branch.__name__ = name
+        return branch
 
     def _ORA(self) -> int:
-        self.a |= self._fetch()
+        self.a |= self.fetched
         self.a &= 0xFF
-        self._set_zn(self.a)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _AND(self) -> int:
-        self.a &= self._fetch()
+        self.a &= self.fetched
         self.a &= 0xFF
-        self._set_zn(self.a)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _EOR(self) -> int:
-        self.a ^= self._fetch()
+        self.a ^= self.fetched
         self.a &= 0xFF
-        self._set_zn(self.a)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _ADC(self) -> int:
-        self._ADC_value(self._fetch())
+        self._ADC_value(self.fetched)
         return 0
 
     def _SBC(self) -> int:
-        self._SBC_value(self._fetch())
+        self._SBC_value(self.fetched)
         return 0
 
     def _CMP(self) -> int:
-        value = self._fetch()
-        temp = (self.a - value) & 0x1FF
-        self._set_flag(FLAG_C, self.a >= value)
-        self._set_zn(temp & 0xFF)
+        value = self.fetched
+        register = self.a
+        self.p = (self.p & 0x7C) | (register >= value) | _ZN_TABLE[(register - value) & 0xFF] | FLAG_U
         return 0
 
     def _CPX(self) -> int:
-        value = self._fetch()
-        temp = (self.x - value) & 0x1FF
-        self._set_flag(FLAG_C, self.x >= value)
-        self._set_zn(temp & 0xFF)
+        value = self.fetched
+        register = self.x
+        self.p = (self.p & 0x7C) | (register >= value) | _ZN_TABLE[(register - value) & 0xFF] | FLAG_U
         return 0
 
     def _CPY(self) -> int:
-        value = self._fetch()
-        temp = (self.y - value) & 0x1FF
-        self._set_flag(FLAG_C, self.y >= value)
-        self._set_zn(temp & 0xFF)
+        value = self.fetched
+        register = self.y
+        self.p = (self.p & 0x7C) | (register >= value) | _ZN_TABLE[(register - value) & 0xFF] | FLAG_U
         return 0
 
     def _BIT(self) -> int:
-        value = self._fetch()
-        self._set_flag(FLAG_Z, (self.a & value) == 0)
-        self._set_flag(FLAG_N, bool(value & 0x80))
-        self._set_flag(FLAG_V, bool(value & 0x40))
+        value = self.fetched
+        self.p = (self.p & 0x3D) | (_ZN_TABLE[self.a & value] & FLAG_Z) | (value & 0xC0) | FLAG_U
+        return 0
+
+    def _ASL_ACC(self) -> int:
+        value = self.a
+        result = (value << 1) & 0xFF
+        self.a = result
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[result] | FLAG_U
         return 0
 
     def _ASL(self) -> int:
-        if self.current_mode == self._ACC:
-            value = self.a
-            self._set_flag(FLAG_C, bool(value & 0x80))
-            self.a = (value << 1) & 0xFF
-            self._set_zn(self.a)
-            return 0
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x80))
-        value = (value << 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        value = self._read_fast(self.addr_abs)
+        result = (value << 1) & 0xFF
+        self._write_fast(self.addr_abs, result)
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[result] | FLAG_U
+        return 0
+
+    def _LSR_ACC(self) -> int:
+        value = self.a
+        result = value >> 1
+        self.a = result
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[result] | FLAG_U
         return 0
 
     def _LSR(self) -> int:
-        if self.current_mode == self._ACC:
-            value = self.a
-            self._set_flag(FLAG_C, bool(value & 0x01))
-            self.a = (value >> 1) & 0xFF
-            self._set_zn(self.a)
-            return 0
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x01))
-        value = (value >> 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        value = self._read_fast(self.addr_abs)
+        result = value >> 1
+        self._write_fast(self.addr_abs, result)
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[result] | FLAG_U
+        return 0
+
+    def _ROL_ACC(self) -> int:
+        carry = self.p & FLAG_C
+        value = self.a
+        result = ((value << 1) | carry) & 0xFF
+        self.a = result
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[result] | FLAG_U
         return 0
 
     def _ROL(self) -> int:
-        carry = self._get_flag(FLAG_C)
-        if self.current_mode == self._ACC:
-            value = self.a
-            self._set_flag(FLAG_C, bool(value & 0x80))
-            self.a = ((value << 1) | carry) & 0xFF
-            self._set_zn(self.a)
-            return 0
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x80))
-        value = ((value << 1) | carry) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        carry = self.p & FLAG_C
+        value = self._read_fast(self.addr_abs)
+        result = ((value << 1) | carry) & 0xFF
+        self._write_fast(self.addr_abs, result)
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[result] | FLAG_U
+        return 0
+
+    def _ROR_ACC(self) -> int:
+        carry = self.p & FLAG_C
+        value = self.a
+        result = (carry << 7) | (value >> 1)
+        self.a = result
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[result] | FLAG_U
         return 0
 
     def _ROR(self) -> int:
-        carry = self._get_flag(FLAG_C)
-        if self.current_mode == self._ACC:
-            value = self.a
-            self._set_flag(FLAG_C, bool(value & 0x01))
-            self.a = ((carry << 7) | (value >> 1)) & 0xFF
-            self._set_zn(self.a)
-            return 0
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x01))
-        value = ((carry << 7) | (value >> 1)) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        carry = self.p & FLAG_C
+        value = self._read_fast(self.addr_abs)
+        result = (carry << 7) | (value >> 1)
+        self._write_fast(self.addr_abs, result)
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[result] | FLAG_U
         return 0
 
     def _INC(self) -> int:
-        value = (self._read(self.addr_abs) + 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        value = (self._read_fast(self.addr_abs) + 1) & 0xFF
+        self._write_fast(self.addr_abs, value)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[value] | FLAG_U
         return 0
 
     def _DEC(self) -> int:
-        value = (self._read(self.addr_abs) - 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self._set_zn(value)
+        value = (self._read_fast(self.addr_abs) - 1) & 0xFF
+        self._write_fast(self.addr_abs, value)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[value] | FLAG_U
         return 0
 
     def _LDA(self) -> int:
-        self.a = self._fetch() & 0xFF
-        self._set_zn(self.a)
+        self.a = self.fetched
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _LDX(self) -> int:
-        self.x = self._fetch() & 0xFF
-        self._set_zn(self.x)
+        self.x = self.fetched
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _LDY(self) -> int:
-        self.y = self._fetch() & 0xFF
-        self._set_zn(self.y)
+        self.y = self.fetched
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.y] | FLAG_U
         return 0
 
     def _STA(self) -> int:
-        self._write(self.addr_abs, self.a)
+        self._write_fast(self.addr_abs, self.a)
         return 0
 
     def _STX(self) -> int:
-        self._write(self.addr_abs, self.x)
+        self._write_fast(self.addr_abs, self.x)
         return 0
 
     def _STY(self) -> int:
-        self._write(self.addr_abs, self.y)
+        self._write_fast(self.addr_abs, self.y)
         return 0
 
     def _TAX(self) -> int:
-        self.x = self.a & 0xFF
-        self._set_zn(self.x)
+        self.x = self.a
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _TAY(self) -> int:
-        self.y = self.a & 0xFF
-        self._set_zn(self.y)
+        self.y = self.a
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.y] | FLAG_U
         return 0
 
     def _TXA(self) -> int:
-        self.a = self.x & 0xFF
-        self._set_zn(self.a)
+        self.a = self.x
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _TYA(self) -> int:
-        self.a = self.y & 0xFF
-        self._set_zn(self.a)
+        self.a = self.y
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _TSX(self) -> int:
-        self.x = self.sp & 0xFF
-        self._set_zn(self.x)
+        self.x = self.sp
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _TXS(self) -> int:
-        self.sp = self.x & 0xFF
+        self.sp = self.x
         return 0
 
     def _INX(self) -> int:
         self.x = (self.x + 1) & 0xFF
-        self._set_zn(self.x)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _INY(self) -> int:
         self.y = (self.y + 1) & 0xFF
-        self._set_zn(self.y)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.y] | FLAG_U
         return 0
 
     def _DEX(self) -> int:
         self.x = (self.x - 1) & 0xFF
-        self._set_zn(self.x)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _DEY(self) -> int:
         self.y = (self.y - 1) & 0xFF
-        self._set_zn(self.y)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.y] | FLAG_U
         return 0
 
     def _PHA(self) -> int:
@@ -487,7 +960,7 @@ class CPU6502:
 
     def _PLA(self) -> int:
         self.a = self._pull()
-        self._set_zn(self.a)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _PLP(self) -> int:
@@ -500,7 +973,7 @@ class CPU6502:
 
     def _JSR(self) -> int:
         return_addr = (self.pc - 1) & 0xFFFF
-        self._push((return_addr >> 8) & 0xFF)
+        self._push(return_addr >> 8)
         self._push(return_addr & 0xFF)
         self.pc = self.addr_abs
         return 0
@@ -523,174 +996,137 @@ class CPU6502:
         self._service_interrupt(0xFFFE, is_brk=True)
         return 0
 
-    def _BCC(self) -> int:
-        return self._branch(not self._get_flag(FLAG_C))
-
-    def _BCS(self) -> int:
-        return self._branch(bool(self._get_flag(FLAG_C)))
-
-    def _BEQ(self) -> int:
-        return self._branch(bool(self._get_flag(FLAG_Z)))
-
-    def _BMI(self) -> int:
-        return self._branch(bool(self._get_flag(FLAG_N)))
-
-    def _BNE(self) -> int:
-        return self._branch(not self._get_flag(FLAG_Z))
-
-    def _BPL(self) -> int:
-        return self._branch(not self._get_flag(FLAG_N))
-
-    def _BVC(self) -> int:
-        return self._branch(not self._get_flag(FLAG_V))
-
-    def _BVS(self) -> int:
-        return self._branch(bool(self._get_flag(FLAG_V)))
-
     def _CLC(self) -> int:
-        self._set_flag(FLAG_C, False)
+        self.p &= ~FLAG_C
         return 0
 
     def _CLD(self) -> int:
-        self._set_flag(FLAG_D, False)
+        self.p = (self.p & ~FLAG_D) | FLAG_U
         return 0
 
     def _CLI(self) -> int:
-        self._set_flag(FLAG_I, False)
+        self.p = (self.p & ~FLAG_I) | FLAG_U
         return 0
 
     def _CLV(self) -> int:
-        self._set_flag(FLAG_V, False)
+        self.p = (self.p & ~FLAG_V) | FLAG_U
         return 0
 
     def _SEC(self) -> int:
-        self._set_flag(FLAG_C, True)
+        self.p |= FLAG_C
         return 0
 
     def _SED(self) -> int:
-        self._set_flag(FLAG_D, True)
+        self.p |= FLAG_D | FLAG_U
         return 0
 
     def _SEI(self) -> int:
-        self._set_flag(FLAG_I, True)
+        self.p |= FLAG_I | FLAG_U
         return 0
 
     def _NOP(self) -> int:
         return 0
 
     def _KIL(self) -> int:
-        self.halted = True
+        self._pending |= _PENDING_HALT
         return 0
 
     # Undocumented operations
     def _LAX(self) -> int:
-        value = self._fetch()
+        value = self.fetched
         self.a = value
         self.x = value
-        self._set_zn(value)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[value] | FLAG_U
         return 0
 
     def _SAX(self) -> int:
-        self._write(self.addr_abs, self.a & self.x)
+        self._write_fast(self.addr_abs, self.a & self.x)
         return 0
 
     def _DCP(self) -> int:
-        value = (self._read(self.addr_abs) - 1) & 0xFF
-        self._write(self.addr_abs, value)
-        temp = (self.a - value) & 0x1FF
-        self._set_flag(FLAG_C, self.a >= value)
-        self._set_zn(temp & 0xFF)
+        value = (self._read_fast(self.addr_abs) - 1) & 0xFF
+        self._write_fast(self.addr_abs, value)
+        a = self.a
+        self.p = (self.p & 0x7C) | (a >= value) | _ZN_TABLE[(a - value) & 0xFF] | FLAG_U
         return 0
 
     def _ISC(self) -> int:
-        value = (self._read(self.addr_abs) + 1) & 0xFF
-        self._write(self.addr_abs, value)
+        value = (self._read_fast(self.addr_abs) + 1) & 0xFF
+        self._write_fast(self.addr_abs, value)
         self._SBC_value(value)
         return 0
 
     def _RLA(self) -> int:
-        value = self._read(self.addr_abs)
-        carry = self._get_flag(FLAG_C)
-        self._set_flag(FLAG_C, bool(value & 0x80))
-        value = ((value << 1) | carry) & 0xFF
-        self._write(self.addr_abs, value)
-        self.a &= value
-        self.a &= 0xFF
-        self._set_zn(self.a)
+        value = self._read_fast(self.addr_abs)
+        result = ((value << 1) | (self.p & FLAG_C)) & 0xFF
+        self._write_fast(self.addr_abs, result)
+        self.a &= result
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _RRA(self) -> int:
-        value = self._read(self.addr_abs)
-        carry = self._get_flag(FLAG_C)
-        self._set_flag(FLAG_C, bool(value & 0x01))
-        value = ((carry << 7) | (value >> 1)) & 0xFF
-        self._write(self.addr_abs, value)
+        value = self._read_fast(self.addr_abs)
+        carry = self.p & FLAG_C
+        self.p = (self.p & ~FLAG_C) | (value & 0x01)
+        value = (carry << 7) | (value >> 1)
+        self._write_fast(self.addr_abs, value)
         self._ADC_value(value)
         return 0
 
     def _SLO(self) -> int:
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x80))
-        value = (value << 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self.a |= value
-        self.a &= 0xFF
-        self._set_zn(self.a)
+        value = self._read_fast(self.addr_abs)
+        result = (value << 1) & 0xFF
+        self._write_fast(self.addr_abs, result)
+        self.a |= result
+        self.p = (self.p & 0x7C) | (value >> 7) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _SRE(self) -> int:
-        value = self._read(self.addr_abs)
-        self._set_flag(FLAG_C, bool(value & 0x01))
-        value = (value >> 1) & 0xFF
-        self._write(self.addr_abs, value)
-        self.a ^= value
-        self.a &= 0xFF
-        self._set_zn(self.a)
+        value = self._read_fast(self.addr_abs)
+        result = value >> 1
+        self._write_fast(self.addr_abs, result)
+        self.a ^= result
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _ANC(self) -> int:
-        self.a &= self._fetch()
-        self.a &= 0xFF
-        self._set_zn(self.a)
-        self._set_flag(FLAG_C, bool(self.a & 0x80))
+        self.a &= self.fetched
+        self.p = (self.p & 0x7C) | (self.a >> 7) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _ALR(self) -> int:
-        self.a &= self._fetch()
-        self._set_flag(FLAG_C, bool(self.a & 0x01))
-        self.a = (self.a >> 1) & 0xFF
-        self._set_zn(self.a)
+        value = self.a & self.fetched
+        self.a = value >> 1
+        self.p = (self.p & 0x7C) | (value & 0x01) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _ARR(self) -> int:
-        self.a &= self._fetch()
-        self.a = ((self._get_flag(FLAG_C) << 7) | (self.a >> 1)) & 0xFF
-        self._set_zn(self.a)
+        self.a &= self.fetched
+        self.a = ((self.p & FLAG_C) << 7) | (self.a >> 1)
         bit5 = (self.a >> 5) & 1
         bit6 = (self.a >> 6) & 1
-        self._set_flag(FLAG_C, bool(bit6))
-        self._set_flag(FLAG_V, bool(bit5 ^ bit6))
+        self.p = (self.p & 0x3C) | bit6 | ((bit5 ^ bit6) << 6) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _XAA(self) -> int:
-        self.a = (self.x & self._fetch()) & 0xFF
-        self._set_zn(self.a)
+        self.a = self.x & self.fetched
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.a] | FLAG_U
         return 0
 
     def _AXS(self) -> int:
-        value = self._fetch()
+        value = self.fetched
         temp = (self.a & self.x) - value
-        self._set_flag(FLAG_C, temp >= 0)
+        self.p = (self.p & ~FLAG_C) | (temp >= 0)
         self.x = temp & 0xFF
-        self._set_zn(self.x)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[self.x] | FLAG_U
         return 0
 
     def _LAS(self) -> int:
-        value = self._fetch() & self.sp
+        value = self.fetched & self.sp
         self.a = value
         self.x = value
         self.sp = value
-        self._set_zn(value)
+        self.p = (self.p & 0x7D) | _ZN_TABLE[value] | FLAG_U
         return 0
 
     def _AHX(self) -> int:
@@ -699,7 +1135,7 @@ class CPU6502:
         if self.current_mode in (self._ABY, self._IZY):
             addr = (self.addr_base & 0xFF00) | (self.addr_abs & 0x00FF)
         value = self.a & self.x & high
-        self._write(addr, value)
+        self._write_fast(addr, value)
         return 0
 
     def _TAS(self) -> int:
@@ -709,7 +1145,7 @@ class CPU6502:
         if self.current_mode == self._ABY:
             addr = (self.addr_base & 0xFF00) | (self.addr_abs & 0x00FF)
         value = self.sp & high
-        self._write(addr, value)
+        self._write_fast(addr, value)
         return 0
 
     def _SHX(self) -> int:
@@ -718,7 +1154,7 @@ class CPU6502:
         if self.current_mode == self._ABY:
             addr = (self.addr_base & 0xFF00) | (self.addr_abs & 0x00FF)
         value = self.x & high
-        self._write(addr, value)
+        self._write_fast(addr, value)
         return 0
 
     def _SHY(self) -> int:
@@ -727,269 +1163,292 @@ class CPU6502:
         if self.current_mode == self._ABX:
             addr = (self.addr_base & 0xFF00) | (self.addr_abs & 0x00FF)
         value = self.y & high
-        self._write(addr, value)
-        return 0
+        self._write_fast(addr, value)
+        return 0
+
+    @classmethod
+    def _set(
+        cls, opcode: int, name: str, mode: AddressMode, op: Callable[..., int], cycles: int, page_cycle: bool = False
+    ) -> None:
+        cls._names[opcode] = name
+        cls._modes[opcode] = mode
+        cls._ops[opcode] = op
+        cls._cycles[opcode] = cycles
+        cls._page_cycles[opcode] = page_cycle
+
+    @classmethod
+    def _build_lookup(cls) -> None:
+        # Per-opcode decode tables, one per field, shared by every instance; unlisted opcodes
+        # decode as a 2-cycle NOP. Modes and operations are stored as plain functions.
+        cls._names = ["NOP"] * 256
+        cls._modes = [cls._IMP] * 256
+        cls._ops = [cls._NOP] * 256
+        cls._cycles = bytearray([2] * 256)
+        cls._page_cycles = bytearray(256)
 
-    def _set(self, opcode: int, name: str, mode: AddressMode, op: Operation, cycles: int, page_cycle: bool = False) -> None:
-        self.lookup[opcode] = Instruction(name, mode, op, cycles, page_cycle)
-
-    def _build_lookup(self) -> None:
         # Official opcodes
-        self._set(0x00, "BRK", self._IMP, self._BRK, 7)
-        self._set(0x01, "ORA", self._IZX, self._ORA, 6)
-        self._set(0x05, "ORA", self._ZP0, self._ORA, 3)
-        self._set(0x06, "ASL", self._ZP0, self._ASL, 5)
-        self._set(0x08, "PHP", self._IMP, self._PHP, 3)
-        self._set(0x09, "ORA", self._IMM, self._ORA, 2)
-        self._set(0x0A, "ASL", self._ACC, self._ASL, 2)
-        self._set(0x0D, "ORA", self._ABS, self._ORA, 4)
-        self._set(0x0E, "ASL", self._ABS, self._ASL, 6)
-        self._set(0x10, "BPL", self._REL, self._BPL, 2)
-        self._set(0x11, "ORA", self._IZY, self._ORA, 5, True)
-        self._set(0x15, "ORA", self._ZPX, self._ORA, 4)
-        self._set(0x16, "ASL", self._ZPX, self._ASL, 6)
-        self._set(0x18, "CLC", self._IMP, self._CLC, 2)
-        self._set(0x19, "ORA", self._ABY, self._ORA, 4, True)
-        self._set(0x1D, "ORA", self._ABX, self._ORA, 4, True)
-        self._set(0x1E, "ASL", self._ABX, self._ASL, 7)
-        self._set(0x20, "JSR", self._ABS, self._JSR, 6)
-        self._set(0x21, "AND", self._IZX, self._AND, 6)
-        self._set(0x24, "BIT", self._ZP0, self._BIT, 3)
-        self._set(0x25, "AND", self._ZP0, self._AND, 3)
-        self._set(0x26, "ROL", self._ZP0, self._ROL, 5)
-        self._set(0x28, "PLP", self._IMP, self._PLP, 4)
-        self._set(0x29, "AND", self._IMM, self._AND, 2)
-        self._set(0x2A, "ROL", self._ACC, self._ROL, 2)
-        self._set(0x2C, "BIT", self._ABS, self._BIT, 4)
-        self._set(0x2D, "AND", self._ABS, self._AND, 4)
-        self._set(0x2E, "ROL", self._ABS, self._ROL, 6)
-        self._set(0x30, "BMI", self._REL, self._BMI, 2)
-        self._set(0x31, "AND", self._IZY, self._AND, 5, True)
-        self._set(0x35, "AND", self._ZPX, self._AND, 4)
-        self._set(0x36, "ROL", self._ZPX, self._ROL, 6)
-        self._set(0x38, "SEC", self._IMP, self._SEC, 2)
-        self._set(0x39, "AND", self._ABY, self._AND, 4, True)
-        self._set(0x3D, "AND", self._ABX, self._AND, 4, True)
-        self._set(0x3E, "ROL", self._ABX, self._ROL, 7)
-        self._set(0x40, "RTI", self._IMP, self._RTI, 6)
-        self._set(0x41, "EOR", self._IZX, self._EOR, 6)
-        self._set(0x45, "EOR", self._ZP0, self._EOR, 3)
-        self._set(0x46, "LSR", self._ZP0, self._LSR, 5)
-        self._set(0x48, "PHA", self._IMP, self._PHA, 3)
-        self._set(0x49, "EOR", self._IMM, self._EOR, 2)
-        self._set(0x4A, "LSR", self._ACC, self._LSR, 2)
-        self._set(0x4C, "JMP", self._ABS, self._JMP, 3)
-        self._set(0x4D, "EOR", self._ABS, self._EOR, 4)
-        self._set(0x4E, "LSR", self._ABS, self._LSR, 6)
-        self._set(0x50, "BVC", self._REL, self._BVC, 2)
-        self._set(0x51, "EOR", self._IZY, self._EOR, 5, True)
-        self._set(0x55, "EOR", self._ZPX, self._EOR, 4)
-        self._set(0x56, "LSR", self._ZPX, self._LSR, 6)
-        self._set(0x58, "CLI", self._IMP, self._CLI, 2)
-        self._set(0x59, "EOR", self._ABY, self._EOR, 4, True)
-        self._set(0x5D, "EOR", self._ABX, self._EOR, 4, True)
-        self._set(0x5E, "LSR", self._ABX, self._LSR, 7)
-        self._set(0x60, "RTS", self._IMP, self._RTS, 6)
-        self._set(0x61, "ADC", self._IZX, self._ADC, 6)
-        self._set(0x65, "ADC", self._ZP0, self._ADC, 3)
-        self._set(0x66, "ROR", self._ZP0, self._ROR, 5)
-        self._set(0x68, "PLA", self._IMP, self._PLA, 4)
-        self._set(0x69, "ADC", self._IMM, self._ADC, 2)
-        self._set(0x6A, "ROR", self._ACC, self._ROR, 2)
-        self._set(0x6C, "JMP", self._IND, self._JMP, 5)
-        self._set(0x6D, "ADC", self._ABS, self._ADC, 4)
-        self._set(0x6E, "ROR", self._ABS, self._ROR, 6)
-        self._set(0x70, "BVS", self._REL, self._BVS, 2)
-        self._set(0x71, "ADC", self._IZY, self._ADC, 5, True)
-        self._set(0x75, "ADC", self._ZPX, self._ADC, 4)
-        self._set(0x76, "ROR", self._ZPX, self._ROR, 6)
-        self._set(0x78, "SEI", self._IMP, self._SEI, 2)
-        self._set(0x79, "ADC", self._ABY, self._ADC, 4, True)
-        self._set(0x7D, "ADC", self._ABX, self._ADC, 4, True)
-        self._set(0x7E, "ROR", self._ABX, self._ROR, 7)
-        self._set(0x81, "STA", self._IZX, self._STA, 6)
-        self._set(0x84, "STY", self._ZP0, self._STY, 3)
-        self._set(0x85, "STA", self._ZP0, self._STA, 3)
-        self._set(0x86, "STX", self._ZP0, self._STX, 3)
-        self._set(0x88, "DEY", self._IMP, self._DEY, 2)
-        self._set(0x8A, "TXA", self._IMP, self._TXA, 2)
-        self._set(0x8C, "STY", self._ABS, self._STY, 4)
-        self._set(0x8D, "STA", self._ABS, self._STA, 4)
-        self._set(0x8E, "STX", self._ABS, self._STX, 4)
-        self._set(0x90, "BCC", self._REL, self._BCC, 2)
-        self._set(0x91, "STA", self._IZY, self._STA, 6)
-        self._set(0x94, "STY", self._ZPX, self._STY, 4)
-        self._set(0x95, "STA", self._ZPX, self._STA, 4)
-        self._set(0x96, "STX", self._ZPY, self._STX, 4)
-        self._set(0x98, "TYA", self._IMP, self._TYA, 2)
-        self._set(0x99, "STA", self._ABY, self._STA, 5)
-        self._set(0x9A, "TXS", self._IMP, self._TXS, 2)
-        self._set(0x9D, "STA", self._ABX, self._STA, 5)
-        self._set(0xA0, "LDY", self._IMM, self._LDY, 2)
-        self._set(0xA1, "LDA", self._IZX, self._LDA, 6)
-        self._set(0xA2, "LDX", self._IMM, self._LDX, 2)
-        self._set(0xA4, "LDY", self._ZP0, self._LDY, 3)
-        self._set(0xA5, "LDA", self._ZP0, self._LDA, 3)
-        self._set(0xA6, "LDX", self._ZP0, self._LDX, 3)
-        self._set(0xA8, "TAY", self._IMP, self._TAY, 2)
-        self._set(0xA9, "LDA", self._IMM, self._LDA, 2)
-        self._set(0xAA, "TAX", self._IMP, self._TAX, 2)
-        self._set(0xAC, "LDY", self._ABS, self._LDY, 4)
-        self._set(0xAD, "LDA", self._ABS, self._LDA, 4)
-        self._set(0xAE, "LDX", self._ABS, self._LDX, 4)
-        self._set(0xB0, "BCS", self._REL, self._BCS, 2)
-        self._set(0xB1, "LDA", self._IZY, self._LDA, 5, True)
-        self._set(0xB4, "LDY", self._ZPX, self._LDY, 4)
-        self._set(0xB5, "LDA", self._ZPX, self._LDA, 4)
-        self._set(0xB6, "LDX", self._ZPY, self._LDX, 4)
-        self._set(0xB8, "CLV", self._IMP, self._CLV, 2)
-        self._set(0xB9, "LDA", self._ABY, self._LDA, 4, True)
-        self._set(0xBA, "TSX", self._IMP, self._TSX, 2)
-        self._set(0xBC, "LDY", self._ABX, self._LDY, 4, True)
-        self._set(0xBD, "LDA", self._ABX, self._LDA, 4, True)
-        self._set(0xBE, "LDX", self._ABY, self._LDX, 4, True)
-        self._set(0xC0, "CPY", self._IMM, self._CPY, 2)
-        self._set(0xC1, "CMP", self._IZX, self._CMP, 6)
-        self._set(0xC4, "CPY", self._ZP0, self._CPY, 3)
-        self._set(0xC5, "CMP", self._ZP0, self._CMP, 3)
-        self._set(0xC6, "DEC", self._ZP0, self._DEC, 5)
-        self._set(0xC8, "INY", self._IMP, self._INY, 2)
-        self._set(0xC9, "CMP", self._IMM, self._CMP, 2)
-        self._set(0xCA, "DEX", self._IMP, self._DEX, 2)
-        self._set(0xCC, "CPY", self._ABS, self._CPY, 4)
-        self._set(0xCD, "CMP", self._ABS, self._CMP, 4)
-        self._set(0xCE, "DEC", self._ABS, self._DEC, 6)
-        self._set(0xD0, "BNE", self._REL, self._BNE, 2)
-        self._set(0xD1, "CMP", self._IZY, self._CMP, 5, True)
-        self._set(0xD5, "CMP", self._ZPX, self._CMP, 4)
-        self._set(0xD6, "DEC", self._ZPX, self._DEC, 6)
-        self._set(0xD8, "CLD", self._IMP, self._CLD, 2)
-        self._set(0xD9, "CMP", self._ABY, self._CMP, 4, True)
-        self._set(0xDD, "CMP", self._ABX, self._CMP, 4, True)
-        self._set(0xDE, "DEC", self._ABX, self._DEC, 7)
-        self._set(0xE0, "CPX", self._IMM, self._CPX, 2)
-        self._set(0xE1, "SBC", self._IZX, self._SBC, 6)
-        self._set(0xE4, "CPX", self._ZP0, self._CPX, 3)
-        self._set(0xE5, "SBC", self._ZP0, self._SBC, 3)
-        self._set(0xE6, "INC", self._ZP0, self._INC, 5)
-        self._set(0xE8, "INX", self._IMP, self._INX, 2)
-        self._set(0xE9, "SBC", self._IMM, self._SBC, 2)
-        self._set(0xEA, "NOP", self._IMP, self._NOP, 2)
-        self._set(0xEC, "CPX", self._ABS, self._CPX, 4)
-        self._set(0xED, "SBC", self._ABS, self._SBC, 4)
-        self._set(0xEE, "INC", self._ABS, self._INC, 6)
-        self._set(0xF0, "BEQ", self._REL, self._BEQ, 2)
-        self._set(0xF1, "SBC", self._IZY, self._SBC, 5, True)
-        self._set(0xF5, "SBC", self._ZPX, self._SBC, 4)
-        self._set(0xF6, "INC", self._ZPX, self._INC, 6)
-        self._set(0xF8, "SED", self._IMP, self._SED, 2)
-        self._set(0xF9, "SBC", self._ABY, self._SBC, 4, True)
-        self._set(0xFD, "SBC", self._ABX, self._SBC, 4, True)
-        self._set(0xFE, "INC", self._ABX, self._INC, 7)
+        cls._set(0x00, "BRK", cls._IMP, cls._BRK, 7)
+        cls._set(0x01, "ORA", cls._IZX, cls._ORA, 6)
+        cls._set(0x05, "ORA", cls._ZP0, cls._ORA, 3)
+        cls._set(0x06, "ASL", cls._ZP0, cls._ASL, 5)
+        cls._set(0x08, "PHP", cls._IMP, cls._PHP, 3)
+        cls._set(0x09, "ORA", cls._IMM, cls._ORA, 2)
+        cls._set(0x0A, "ASL", cls._ACC, cls._ASL_ACC, 2)
+        cls._set(0x0D, "ORA", cls._ABS, cls._ORA, 4)
+        cls._set(0x0E, "ASL", cls._ABS, cls._ASL, 6)
+        cls._set(0x10, "BPL", cls._IMP, cls._make_branch("_BPL"), 2)
+        cls._set(0x11, "ORA", cls._IZY, cls._ORA, 5, True)
+        cls._set(0x15, "ORA", cls._ZPX, cls._ORA, 4)
+        cls._set(0x16, "ASL", cls._ZPX, cls._ASL, 6)
+        cls._set(0x18, "CLC", cls._IMP, cls._CLC, 2)
+        cls._set(0x19, "ORA", cls._ABY, cls._ORA, 4, True)
+        cls._set(0x1D, "ORA", cls._ABX, cls._ORA, 4, True)
+        cls._set(0x1E, "ASL", cls._ABX, cls._ASL, 7)
+        cls._set(0x20, "JSR", cls._ABS, cls._JSR, 6)
+        cls._set(0x21, "AND", cls._IZX, cls._AND, 6)
+        cls._set(0x24, "BIT", cls._ZP0, cls._BIT, 3)
+        cls._set(0x25, "AND", cls._ZP0, cls._AND, 3)
+        cls._set(0x26, "ROL", cls._ZP0, cls._ROL, 5)
+        cls._set(0x28, "PLP", cls._IMP, cls._PLP, 4)
+        cls._set(0x29, "AND", cls._IMM, cls._AND, 2)
+        cls._set(0x2A, "ROL", cls._ACC, cls._ROL_ACC, 2)
+        cls._set(0x2C, "BIT", cls._ABS, cls._BIT, 4)
+        cls._set(0x2D, "AND", cls._ABS, cls._AND, 4)
+        cls._set(0x2E, "ROL", cls._ABS, cls._ROL, 6)
+        cls._set(0x30, "BMI", cls._IMP, cls._make_branch("_BMI"), 2)
+        cls._set(0x31, "AND", cls._IZY, cls._AND, 5, True)
+        cls._set(0x35, "AND", cls._ZPX, cls._AND, 4)
+        cls._set(0x36, "ROL", cls._ZPX, cls._ROL, 6)
+        cls._set(0x38, "SEC", cls._IMP, cls._SEC, 2)
+        cls._set(0x39, "AND", cls._ABY, cls._AND, 4, True)
+        cls._set(0x3D, "AND", cls._ABX, cls._AND, 4, True)
+        cls._set(0x3E, "ROL", cls._ABX, cls._ROL, 7)
+        cls._set(0x40, "RTI", cls._IMP, cls._RTI, 6)
+        cls._set(0x41, "EOR", cls._IZX, cls._EOR, 6)
+        cls._set(0x45, "EOR", cls._ZP0, cls._EOR, 3)
+        cls._set(0x46, "LSR", cls._ZP0, cls._LSR, 5)
+        cls._set(0x48, "PHA", cls._IMP, cls._PHA, 3)
+        cls._set(0x49, "EOR", cls._IMM, cls._EOR, 2)
+        cls._set(0x4A, "LSR", cls._ACC, cls._LSR_ACC, 2)
+        cls._set(0x4C, "JMP", cls._ABS, cls._JMP, 3)
+        cls._set(0x4D, "EOR", cls._ABS, cls._EOR, 4)
+        cls._set(0x4E, "LSR", cls._ABS, cls._LSR, 6)
+        cls._set(0x50, "BVC", cls._IMP, cls._make_branch("_BVC"), 2)
+        cls._set(0x51, "EOR", cls._IZY, cls._EOR, 5, True)
+        cls._set(0x55, "EOR", cls._ZPX, cls._EOR, 4)
+        cls._set(0x56, "LSR", cls._ZPX, cls._LSR, 6)
+        cls._set(0x58, "CLI", cls._IMP, cls._CLI, 2)
+        cls._set(0x59, "EOR", cls._ABY, cls._EOR, 4, True)
+        cls._set(0x5D, "EOR", cls._ABX, cls._EOR, 4, True)
+        cls._set(0x5E, "LSR", cls._ABX, cls._LSR, 7)
+        cls._set(0x60, "RTS", cls._IMP, cls._RTS, 6)
+        cls._set(0x61, "ADC", cls._IZX, cls._ADC, 6)
+        cls._set(0x65, "ADC", cls._ZP0, cls._ADC, 3)
+        cls._set(0x66, "ROR", cls._ZP0, cls._ROR, 5)
+        cls._set(0x68, "PLA", cls._IMP, cls._PLA, 4)
+        cls._set(0x69, "ADC", cls._IMM, cls._ADC, 2)
+        cls._set(0x6A, "ROR", cls._ACC, cls._ROR_ACC, 2)
+        cls._set(0x6C, "JMP", cls._IND, cls._JMP, 5)
+        cls._set(0x6D, "ADC", cls._ABS, cls._ADC, 4)
+        cls._set(0x6E, "ROR", cls._ABS, cls._ROR, 6)
+        cls._set(0x70, "BVS", cls._IMP, cls._make_branch("_BVS"), 2)
+        cls._set(0x71, "ADC", cls._IZY, cls._ADC, 5, True)
+        cls._set(0x75, "ADC", cls._ZPX, cls._ADC, 4)
+        cls._set(0x76, "ROR", cls._ZPX, cls._ROR, 6)
+        cls._set(0x78, "SEI", cls._IMP, cls._SEI, 2)
+        cls._set(0x79, "ADC", cls._ABY, cls._ADC, 4, True)
+        cls._set(0x7D, "ADC", cls._ABX, cls._ADC, 4, True)
+        cls._set(0x7E, "ROR", cls._ABX, cls._ROR, 7)
+        cls._set(0x81, "STA", cls._IZX, cls._STA, 6)
+        cls._set(0x84, "STY", cls._ZP0, cls._STY, 3)
+        cls._set(0x85, "STA", cls._ZP0, cls._STA, 3)
+        cls._set(0x86, "STX", cls._ZP0, cls._STX, 3)
+        cls._set(0x88, "DEY", cls._IMP, cls._DEY, 2)
+        cls._set(0x8A, "TXA", cls._IMP, cls._TXA, 2)
+        cls._set(0x8C, "STY", cls._ABS, cls._STY, 4)
+        cls._set(0x8D, "STA", cls._ABS, cls._STA, 4)
+        cls._set(0x8E, "STX", cls._ABS, cls._STX, 4)
+        cls._set(0x90, "BCC", cls._IMP, cls._make_branch("_BCC"), 2)
+        cls._set(0x91, "STA", cls._IZY, cls._STA, 6)
+        cls._set(0x94, "STY", cls._ZPX, cls._STY, 4)
+        cls._set(0x95, "STA", cls._ZPX, cls._STA, 4)
+        cls._set(0x96, "STX", cls._ZPY, cls._STX, 4)
+        cls._set(0x98, "TYA", cls._IMP, cls._TYA, 2)
+        cls._set(0x99, "STA", cls._ABY, cls._STA, 5)
+        cls._set(0x9A, "TXS", cls._IMP, cls._TXS, 2)
+        cls._set(0x9D, "STA", cls._ABX, cls._STA, 5)
+        cls._set(0xA0, "LDY", cls._IMM, cls._LDY, 2)
+        cls._set(0xA1, "LDA", cls._IZX, cls._LDA, 6)
+        cls._set(0xA2, "LDX", cls._IMM, cls._LDX, 2)
+        cls._set(0xA4, "LDY", cls._ZP0, cls._LDY, 3)
+        cls._set(0xA5, "LDA", cls._ZP0, cls._LDA, 3)
+        cls._set(0xA6, "LDX", cls._ZP0, cls._LDX, 3)
+        cls._set(0xA8, "TAY", cls._IMP, cls._TAY, 2)
+        cls._set(0xA9, "LDA", cls._IMM, cls._LDA, 2)
+        cls._set(0xAA, "TAX", cls._IMP, cls._TAX, 2)
+        cls._set(0xAC, "LDY", cls._ABS, cls._LDY, 4)
+        cls._set(0xAD, "LDA", cls._ABS, cls._LDA, 4)
+        cls._set(0xAE, "LDX", cls._ABS, cls._LDX, 4)
+        cls._set(0xB0, "BCS", cls._IMP, cls._make_branch("_BCS"), 2)
+        cls._set(0xB1, "LDA", cls._IZY, cls._LDA, 5, True)
+        cls._set(0xB4, "LDY", cls._ZPX, cls._LDY, 4)
+        cls._set(0xB5, "LDA", cls._ZPX, cls._LDA, 4)
+        cls._set(0xB6, "LDX", cls._ZPY, cls._LDX, 4)
+        cls._set(0xB8, "CLV", cls._IMP, cls._CLV, 2)
+        cls._set(0xB9, "LDA", cls._ABY, cls._LDA, 4, True)
+        cls._set(0xBA, "TSX", cls._IMP, cls._TSX, 2)
+        cls._set(0xBC, "LDY", cls._ABX, cls._LDY, 4, True)
+        cls._set(0xBD, "LDA", cls._ABX, cls._LDA, 4, True)
+        cls._set(0xBE, "LDX", cls._ABY, cls._LDX, 4, True)
+        cls._set(0xC0, "CPY", cls._IMM, cls._CPY, 2)
+        cls._set(0xC1, "CMP", cls._IZX, cls._CMP, 6)
+        cls._set(0xC4, "CPY", cls._ZP0, cls._CPY, 3)
+        cls._set(0xC5, "CMP", cls._ZP0, cls._CMP, 3)
+        cls._set(0xC6, "DEC", cls._ZP0, cls._DEC, 5)
+        cls._set(0xC8, "INY", cls._IMP, cls._INY, 2)
+        cls._set(0xC9, "CMP", cls._IMM, cls._CMP, 2)
+        cls._set(0xCA, "DEX", cls._IMP, cls._DEX, 2)
+        cls._set(0xCC, "CPY", cls._ABS, cls._CPY, 4)
+        cls._set(0xCD, "CMP", cls._ABS, cls._CMP, 4)
+        cls._set(0xCE, "DEC", cls._ABS, cls._DEC, 6)
+        cls._set(0xD0, "BNE", cls._IMP, cls._make_branch("_BNE"), 2)
+        cls._set(0xD1, "CMP", cls._IZY, cls._CMP, 5, True)
+        cls._set(0xD5, "CMP", cls._ZPX, cls._CMP, 4)
+        cls._set(0xD6, "DEC", cls._ZPX, cls._DEC, 6)
+        cls._set(0xD8, "CLD", cls._IMP, cls._CLD, 2)
+        cls._set(0xD9, "CMP", cls._ABY, cls._CMP, 4, True)
+        cls._set(0xDD, "CMP", cls._ABX, cls._CMP, 4, True)
+        cls._set(0xDE, "DEC", cls._ABX, cls._DEC, 7)
+        cls._set(0xE0, "CPX", cls._IMM, cls._CPX, 2)
+        cls._set(0xE1, "SBC", cls._IZX, cls._SBC, 6)
+        cls._set(0xE4, "CPX", cls._ZP0, cls._CPX, 3)
+        cls._set(0xE5, "SBC", cls._ZP0, cls._SBC, 3)
+        cls._set(0xE6, "INC", cls._ZP0, cls._INC, 5)
+        cls._set(0xE8, "INX", cls._IMP, cls._INX, 2)
+        cls._set(0xE9, "SBC", cls._IMM, cls._SBC, 2)
+        cls._set(0xEA, "NOP", cls._IMP, cls._NOP, 2)
+        cls._set(0xEC, "CPX", cls._ABS, cls._CPX, 4)
+        cls._set(0xED, "SBC", cls._ABS, cls._SBC, 4)
+        cls._set(0xEE, "INC", cls._ABS, cls._INC, 6)
+        cls._set(0xF0, "BEQ", cls._IMP, cls._make_branch("_BEQ"), 2)
+        cls._set(0xF1, "SBC", cls._IZY, cls._SBC, 5, True)
+        cls._set(0xF5, "SBC", cls._ZPX, cls._SBC, 4)
+        cls._set(0xF6, "INC", cls._ZPX, cls._INC, 6)
+        cls._set(0xF8, "SED", cls._IMP, cls._SED, 2)
+        cls._set(0xF9, "SBC", cls._ABY, cls._SBC, 4, True)
+        cls._set(0xFD, "SBC", cls._ABX, cls._SBC, 4, True)
+        cls._set(0xFE, "INC", cls._ABX, cls._INC, 7)
 
         # Unofficial NOPs
         for opcode, mode, cycles, page_cycle in [
-            (0x1A, self._IMP, 2, False),
-            (0x3A, self._IMP, 2, False),
-            (0x5A, self._IMP, 2, False),
-            (0x7A, self._IMP, 2, False),
-            (0xDA, self._IMP, 2, False),
-            (0xFA, self._IMP, 2, False),
-            (0x80, self._IMM, 2, False),
-            (0x82, self._IMM, 2, False),
-            (0x89, self._IMM, 2, False),
-            (0xC2, self._IMM, 2, False),
-            (0xE2, self._IMM, 2, False),
-            (0x04, self._ZP0, 3, False),
-            (0x44, self._ZP0, 3, False),
-            (0x64, self._ZP0, 3, False),
-            (0x14, self._ZPX, 4, False),
-            (0x34, self._ZPX, 4, False),
-            (0x54, self._ZPX, 4, False),
-            (0x74, self._ZPX, 4, False),
-            (0xD4, self._ZPX, 4, False),
-            (0xF4, self._ZPX, 4, False),
-            (0x0C, self._ABS, 4, False),
-            (0x1C, self._ABX, 4, True),
-            (0x3C, self._ABX, 4, True),
-            (0x5C, self._ABX, 4, True),
-            (0x7C, self._ABX, 4, True),
-            (0xDC, self._ABX, 4, True),
-            (0xFC, self._ABX, 4, True),
+            (0x1A, cls._IMP, 2, False),
+            (0x3A, cls._IMP, 2, False),
+            (0x5A, cls._IMP, 2, False),
+            (0x7A, cls._IMP, 2, False),
+            (0xDA, cls._IMP, 2, False),
+            (0xFA, cls._IMP, 2, False),
+            (0x80, cls._IMM, 2, False),
+            (0x82, cls._IMM, 2, False),
+            (0x89, cls._IMM, 2, False),
+            (0xC2, cls._IMM, 2, False),
+            (0xE2, cls._IMM, 2, False),
+            (0x04, cls._ZP0, 3, False),
+            (0x44, cls._ZP0, 3, False),
+            (0x64, cls._ZP0, 3, False),
+            (0x14, cls._ZPX, 4, False),
+            (0x34, cls._ZPX, 4, False),
+            (0x54, cls._ZPX, 4, False),
+            (0x74, cls._ZPX, 4, False),
+            (0xD4, cls._ZPX, 4, False),
+            (0xF4, cls._ZPX, 4, False),
+            (0x0C, cls._ABS, 4, False),
+            (0x1C, cls._ABX, 4, True),
+            (0x3C, cls._ABX, 4, True),
+            (0x5C, cls._ABX, 4, True),
+            (0x7C, cls._ABX, 4, True),
+            (0xDC, cls._ABX, 4, True),
+            (0xFC, cls._ABX, 4, True),
         ]:
-            self._set(opcode, "NOP", mode, self._NOP, cycles, page_cycle)
+            cls._set(opcode, "NOP", mode, cls._NOP, cycles, page_cycle)
 
         # KIL / JAM opcodes
         for opcode in [0x02, 0x12, 0x22, 0x32, 0x42, 0x52, 0x62, 0x72, 0x92, 0xB2, 0xD2, 0xF2]:
-            self._set(opcode, "KIL", self._IMP, self._KIL, 2)
+            cls._set(opcode, "KIL", cls._IMP, cls._KIL, 2)
 
         # Unofficial ALU and memory opcodes
         for opcode, mode, op, cycles, page_cycle in [
-            (0x03, self._IZX, self._SLO, 8, False),
-            (0x07, self._ZP0, self._SLO, 5, False),
-            (0x0F, self._ABS, self._SLO, 6, False),
-            (0x13, self._IZY, self._SLO, 8, False),
-            (0x17, self._ZPX, self._SLO, 6, False),
-            (0x1B, self._ABY, self._SLO, 7, False),
-            (0x1F, self._ABX, self._SLO, 7, False),
-            (0x23, self._IZX, self._RLA, 8, False),
-            (0x27, self._ZP0, self._RLA, 5, False),
-            (0x2F, self._ABS, self._RLA, 6, False),
-            (0x33, self._IZY, self._RLA, 8, False),
-            (0x37, self._ZPX, self._RLA, 6, False),
-            (0x3B, self._ABY, self._RLA, 7, False),
-            (0x3F, self._ABX, self._RLA, 7, False),
-            (0x43, self._IZX, self._SRE, 8, False),
-            (0x47, self._ZP0, self._SRE, 5, False),
-            (0x4F, self._ABS, self._SRE, 6, False),
-            (0x53, self._IZY, self._SRE, 8, False),
-            (0x57, self._ZPX, self._SRE, 6, False),
-            (0x5B, self._ABY, self._SRE, 7, False),
-            (0x5F, self._ABX, self._SRE, 7, False),
-            (0x63, self._IZX, self._RRA, 8, False),
-            (0x67, self._ZP0, self._RRA, 5, False),
-            (0x6F, self._ABS, self._RRA, 6, False),
-            (0x73, self._IZY, self._RRA, 8, False),
-            (0x77, self._ZPX, self._RRA, 6, False),
-            (0x7B, self._ABY, self._RRA, 7, False),
-            (0x7F, self._ABX, self._RRA, 7, False),
-            (0x83, self._IZX, self._SAX, 6, False),
-            (0x87, self._ZP0, self._SAX, 3, False),
-            (0x8F, self._ABS, self._SAX, 4, False),
-            (0x97, self._ZPY, self._SAX, 4, False),
-            (0xA3, self._IZX, self._LAX, 6, False),
-            (0xA7, self._ZP0, self._LAX, 3, False),
-            (0xAB, self._IMM, self._LAX, 2, False),
-            (0xAF, self._ABS, self._LAX, 4, False),
-            (0xB3, self._IZY, self._LAX, 5, True),
-            (0xB7, self._ZPY, self._LAX, 4, False),
-            (0xBF, self._ABY, self._LAX, 4, True),
-            (0xC3, self._IZX, self._DCP, 8, False),
-            (0xC7, self._ZP0, self._DCP, 5, False),
-            (0xCF, self._ABS, self._DCP, 6, False),
-            (0xD3, self._IZY, self._DCP, 8, False),
-            (0xD7, self._ZPX, self._DCP, 6, False),
-            (0xDB, self._ABY, self._DCP, 7, False),
-            (0xDF, self._ABX, self._DCP, 7, False),
-            (0xE3, self._IZX, self._ISC, 8, False),
-            (0xE7, self._ZP0, self._ISC, 5, False),
-            (0xEB, self._IMM, self._SBC, 2, False),
-            (0xEF, self._ABS, self._ISC, 6, False),
-            (0xF3, self._IZY, self._ISC, 8, False),
-            (0xF7, self._ZPX, self._ISC, 6, False),
-            (0xFB, self._ABY, self._ISC, 7, False),
-            (0xFF, self._ABX, self._ISC, 7, False),
-            (0x0B, self._IMM, self._ANC, 2, False),
-            (0x2B, self._IMM, self._ANC, 2, False),
-            (0x4B, self._IMM, self._ALR, 2, False),
-            (0x6B, self._IMM, self._ARR, 2, False),
-            (0x8B, self._IMM, self._XAA, 2, False),
-            (0xCB, self._IMM, self._AXS, 2, False),
-            (0x9B, self._ABY, self._TAS, 5, False),
-            (0x93, self._IZY, self._AHX, 6, False),
-            (0x9F, self._ABY, self._AHX, 5, False),
-            (0x9E, self._ABY, self._SHX, 5, False),
-            (0x9C, self._ABX, self._SHY, 5, False),
-            (0xBB, self._ABY, self._LAS, 4, True),
+            (0x03, cls._IZX, cls._SLO, 8, False),
+            (0x07, cls._ZP0, cls._SLO, 5, False),
+            (0x0F, cls._ABS, cls._SLO, 6, False),
+            (0x13, cls._IZY, cls._SLO, 8, False),
+            (0x17, cls._ZPX, cls._SLO, 6, False),
+            (0x1B, cls._ABY, cls._SLO, 7, False),
+            (0x1F, cls._ABX, cls._SLO, 7, False),
+            (0x23, cls._IZX, cls._RLA, 8, False),
+            (0x27, cls._ZP0, cls._RLA, 5, False),
+            (0x2F, cls._ABS, cls._RLA, 6, False),
+            (0x33, cls._IZY, cls._RLA, 8, False),
+            (0x37, cls._ZPX, cls._RLA, 6, False),
+            (0x3B, cls._ABY, cls._RLA, 7, False),
+            (0x3F, cls._ABX, cls._RLA, 7, False),
+            (0x43, cls._IZX, cls._SRE, 8, False),
+            (0x47, cls._ZP0, cls._SRE, 5, False),
+            (0x4F, cls._ABS, cls._SRE, 6, False),
+            (0x53, cls._IZY, cls._SRE, 8, False),
+            (0x57, cls._ZPX, cls._SRE, 6, False),
+            (0x5B, cls._ABY, cls._SRE, 7, False),
+            (0x5F, cls._ABX, cls._SRE, 7, False),
+            (0x63, cls._IZX, cls._RRA, 8, False),
+            (0x67, cls._ZP0, cls._RRA, 5, False),
+            (0x6F, cls._ABS, cls._RRA, 6, False),
+            (0x73, cls._IZY, cls._RRA, 8, False),
+            (0x77, cls._ZPX, cls._RRA, 6, False),
+            (0x7B, cls._ABY, cls._RRA, 7, False),
+            (0x7F, cls._ABX, cls._RRA, 7, False),
+            (0x83, cls._IZX, cls._SAX, 6, False),
+            (0x87, cls._ZP0, cls._SAX, 3, False),
+            (0x8F, cls._ABS, cls._SAX, 4, False),
+            (0x97, cls._ZPY, cls._SAX, 4, False),
+            (0xA3, cls._IZX, cls._LAX, 6, False),
+            (0xA7, cls._ZP0, cls._LAX, 3, False),
+            (0xAB, cls._IMM, cls._LAX, 2, False),
+            (0xAF, cls._ABS, cls._LAX, 4, False),
+            (0xB3, cls._IZY, cls._LAX, 5, True),
+            (0xB7, cls._ZPY, cls._LAX, 4, False),
+            (0xBF, cls._ABY, cls._LAX, 4, True),
+            (0xC3, cls._IZX, cls._DCP, 8, False),
+            (0xC7, cls._ZP0, cls._DCP, 5, False),
+            (0xCF, cls._ABS, cls._DCP, 6, False),
+            (0xD3, cls._IZY, cls._DCP, 8, False),
+            (0xD7, cls._ZPX, cls._DCP, 6, False),
+            (0xDB, cls._ABY, cls._DCP, 7, False),
+            (0xDF, cls._ABX, cls._DCP, 7, False),
+            (0xE3, cls._IZX, cls._ISC, 8, False),
+            (0xE7, cls._ZP0, cls._ISC, 5, False),
+            (0xEB, cls._IMM, cls._SBC, 2, False),
+            (0xEF, cls._ABS, cls._ISC, 6, False),
+            (0xF3, cls._IZY, cls._ISC, 8, False),
+            (0xF7, cls._ZPX, cls._ISC, 6, False),
+            (0xFB, cls._ABY, cls._ISC, 7, False),
+            (0xFF, cls._ABX, cls._ISC, 7, False),
+            (0x0B, cls._IMM, cls._ANC, 2, False),
+            (0x2B, cls._IMM, cls._ANC, 2, False),
+            (0x4B, cls._IMM, cls._ALR, 2, False),
+            (0x6B, cls._IMM, cls._ARR, 2, False),
+            (0x8B, cls._IMM, cls._XAA, 2, False),
+            (0xCB, cls._IMM, cls._AXS, 2, False),
+            (0x9B, cls._ABY, cls._TAS, 5, False),
+            (0x93, cls._IZY, cls._AHX, 6, False),
+            (0x9F, cls._ABY, cls._AHX, 5, False),
+            (0x9E, cls._ABY, cls._SHX, 5, False),
+            (0x9C, cls._ABX, cls._SHY, 5, False),
+            (0xBB, cls._ABY, cls._LAS, 4, True),
         ]:
-            self._set(opcode, "UND", mode, op, cycles, page_cycle)
+            cls._set(opcode, "UND", mode, op, cycles, page_cycle)
+        # Opcodes whose operation consumes a memory operand; step() loads it into fetched up front.
+        cls._needs_fetch = bytes(
+            op.__name__ in _FETCH_OPS and mode.__name__ not in ("_IMP", "_ACC") for mode, op in zip(cls._modes, cls._ops)
+        )
+
+
+CPU6502._build_lookup()
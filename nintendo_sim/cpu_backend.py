@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+import os
+from typing import Type
+
+from .cpu import CPU6502 as PythonCPU
+from .ppu_backend import VALID_BACKENDS, _load_external_extension
+
+
+def resolve_cpu_class(preferred: str | None) -> tuple[Type[PythonCPU], str]:
+    mode = (preferred or os.getenv("NES_CPU_BACKEND", "auto")).strip().lower()
+    if mode not in VALID_BACKENDS:
+        raise ValueError(f"Unknown CPU backend '{mode}'. Expected one of: {', '.join(VALID_BACKENDS)}")
+
+    if mode in ("auto", "cython"):
+        try:
+            from .cpu_cython import CPU6502 as CythonCPU
+        except Exception as exc:
+            fallback_cls = _load_external_extension("cpu_cython", "CPU6502")
+            if fallback_cls is not None:
+                return fallback_cls, "cython"
+            if mode == "cython":
+                raise RuntimeError(
+                    "Cython CPU backend requested but not available. "
+                    "Build/install it first with: python -m pip install ."
+                ) from exc
+        else:
+            return CythonCPU, "cython"
+
+    return PythonCPU, "python"
@@ -0,0 +1,822 @@
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+from __future__ import annotations
+
+from libc.string cimport memset
+
+from .cpu import CPU6502 as _PythonCPU
+
+
+cdef enum:
+    FLAG_C = 1 << 0
+    FLAG_Z = 1 << 1
+    FLAG_I = 1 << 2
+    FLAG_D = 1 << 3
+    FLAG_B = 1 << 4
+    FLAG_U = 1 << 5
+    FLAG_V = 1 << 6
+    FLAG_N = 1 << 7
+
+cdef enum:
+    M_IMP
+    M_ACC
+    M_IMM
+    M_ZP0
+    M_ZPX
+    M_ZPY
+    M_ABS
+    M_ABX
+    M_ABY
+    M_IND
+    M_IZX
+    M_IZY
+
+cdef enum:
+    O_ADC
+    O_AND
+    O_ASL
+    O_BCC
+    O_BCS
+    O_BEQ
+    O_BIT
+    O_BMI
+    O_BNE
+    O_BPL
+    O_BRK
+    O_BVC
+    O_BVS
+    O_CLC
+    O_CLD
+    O_CLI
+    O_CLV
+    O_CMP
+    O_CPX
+    O_CPY
+    O_DEC
+    O_DEX
+    O_DEY
+    O_EOR
+    O_INC
+    O_INX
+    O_INY
+    O_JMP
+    O_JSR
+    O_LDA
+    O_LDX
+    O_LDY
+    O_LSR
+    O_NOP
+    O_ORA
+    O_PHA
+    O_PHP
+    O_PLA
+    O_PLP
+    O_ROL
+    O_ROR
+    O_RTI
+    O_RTS
+    O_SBC
+    O_SEC
+    O_SED
+    O_SEI
+    O_STA
+    O_STX
+    O_STY
+    O_TAX
+    O_TAY
+    O_TSX
+    O_TXA
+    O_TXS
+    O_TYA
+    O_KIL
+    O_LAX
+    O_SAX
+    O_DCP
+    O_ISC
+    O_RLA
+    O_RRA
+    O_SLO
+    O_SRE
+    O_ANC
+    O_ALR
+    O_ARR
+    O_XAA
+    O_AXS
+    O_LAS
+    O_AHX
+    O_TAS
+    O_SHX
+    O_SHY
+
+
+MODE_IDS = {
+    "_IMP": M_IMP,
+    "_ACC": M_ACC,
+    "_IMM": M_IMM,
+    "_ZP0": M_ZP0,
+    "_ZPX": M_ZPX,
+    "_ZPY": M_ZPY,
+    "_ABS": M_ABS,
+    "_ABX": M_ABX,
+    "_ABY": M_ABY,
+    "_IND": M_IND,
+    "_IZX": M_IZX,
+    "_IZY": M_IZY,
+}
+
+OP_IDS = {
+    "_ADC": O_ADC,
+    "_AND": O_AND,
+    "_ASL": O_ASL,
+    "_ASL_ACC": O_ASL,
+    "_BCC": O_BCC,
+    "_BCS": O_BCS,
+    "_BEQ": O_BEQ,
+    "_BIT": O_BIT,
+    "_BMI": O_BMI,
+    "_BNE": O_BNE,
+    "_BPL": O_BPL,
+    "_BRK": O_BRK,
+    "_BVC": O_BVC,
+    "_BVS": O_BVS,
+    "_CLC": O_CLC,
+    "_CLD": O_CLD,
+    "_CLI": O_CLI,
+    "_CLV": O_CLV,
+    "_CMP": O_CMP,
+    "_CPX": O_CPX,
+    "_CPY": O_CPY,
+    "_DEC": O_DEC,
+    "_DEX": O_DEX,
+    "_DEY": O_DEY,
+    "_EOR": O_EOR,
+    "_INC": O_INC,
+    "_INX": O_INX,
+    "_INY": O_INY,
+    "_JMP": O_JMP,
+    "_JSR": O_JSR,
+    "_LDA": O_LDA,
+    "_LDX": O_LDX,
+    "_LDY": O_LDY,
+    "_LSR": O_LSR,
+    "_LSR_ACC": O_LSR,
+    "_NOP": O_NOP,
+    "_ORA": O_ORA,
+    "_PHA": O_PHA,
+    "_PHP": O_PHP,
+    "_PLA": O_PLA,
+    "_PLP": O_PLP,
+    "_ROL": O_ROL,
+    "_ROL_ACC": O_ROL,
+    "_ROR": O_ROR,
+    "_ROR_ACC": O_ROR,
+    "_RTI": O_RTI,
+    "_RTS": O_RTS,
+    "_SBC": O_SBC,
+    "_SEC": O_SEC,
+    "_SED": O_SED,
+    "_SEI": O_SEI,
+    "_STA": O_STA,
+    "_STX": O_STX,
+    "_STY": O_STY,
+    "_TAX": O_TAX,
+    "_TAY": O_TAY,
+    "_TSX": O_TSX,
+    "_TXA": O_TXA,
+    "_TXS": O_TXS,
+    "_TYA": O_TYA,
+    "_KIL": O_KIL,
+    "_LAX": O_LAX,
+    "_SAX": O_SAX,
+    "_DCP": O_DCP,
+    "_ISC": O_ISC,
+    "_RLA": O_RLA,
+    "_RRA": O_RRA,
+    "_SLO": O_SLO,
+    "_SRE": O_SRE,
+    "_ANC": O_ANC,
+    "_ALR": O_ALR,
+    "_ARR": O_ARR,
+    "_XAA": O_XAA,
+    "_AXS": O_AXS,
+    "_LAS": O_LAS,
+    "_AHX": O_AHX,
+    "_TAS": O_TAS,
+    "_SHX": O_SHX,
+    "_SHY": O_SHY,
+}
+
+
+cdef unsigned char MODE_TABLE[256]
+cdef unsigned char OP_TABLE[256]
+cdef unsigned char CYCLE_TABLE[256]
+cdef unsigned char PAGE_CYCLE_TABLE[256]
+
+
+def _build_tables():
+    # The pure-Python CPU is the single source of truth for decoding; mirror its class-level tables.
+    cdef int opcode
+    for opcode in range(256):
+        MODE_TABLE[opcode] = MODE_IDS[_PythonCPU._modes[opcode].__name__]
+        OP_TABLE[opcode] = OP_IDS[_PythonCPU._ops[opcode].__name__]
+        CYCLE_TABLE[opcode] = _PythonCPU._cycles[opcode]
+        PAGE_CYCLE_TABLE[opcode] = _PythonCPU._page_cycles[opcode]
+
+
+_build_tables()
+
+
+cdef class CPU6502:
+    cdef object _read
+    cdef object _write
+    cdef unsigned char[:] _ram
+    cdef bint _ram_mapped
+    # $8000-$FFFF as last read through the bus. A byte is current while its tag matches
+    # _rom_generation, which every CPU write at register_start or above (a mapper register) advances.
+    cdef unsigned char _rom[0x8000]
+    cdef unsigned int _rom_tag[0x8000]
+    cdef unsigned int _rom_generation
+    cdef public int register_start
+
+    cdef public int a
+    cdef public int x
+    cdef public int y
+    cdef public int sp
+    cdef public int pc
+    cdef public int p
+
+    cdef public int addr_abs
+    cdef public int addr_base
+    cdef public int fetched
+    cdef public int page_crossed
+    cdef int current_mode
+    cdef public bint halted
+
+    cdef public long long total_cycles
+    cdef public int stall_cycles
+    cdef public bint requested_nmi
+    cdef public bint requested_irq
+
+    def __init__(self, read, write, ram=None):
+        self._read = read
+        self._write = write
+        # With the bus work RAM attached, $0000-$1FFF (2 KiB mirrored) bypasses the callbacks.
+        self._ram_mapped = ram is not None
+        if self._ram_mapped:
+            self._ram = ram
+        self._rom_generation = 1
+        self.register_start = 0x8000
+
+        self.a = 0
+        self.x = 0
+        self.y = 0
+        self.sp = 0xFD
+        self.pc = 0
+        self.p = FLAG_U | FLAG_I
+
+        self.addr_abs = 0
+        self.addr_base = 0
+        self.fetched = 0
+        self.page_crossed = 0
+        self.current_mode = M_IMP
+        self.halted = False
+
+        self.total_cycles = 0
+        self.stall_cycles = 0
+        self.requested_nmi = False
+        self.requested_irq = False
+
+    cdef inline int _rd(self, int addr):
+        cdef int index
+        if self._ram_mapped and addr < 0x2000:
+            return self._ram[addr & 0x07FF]
+        if addr >= 0x8000:
+            index = addr - 0x8000
+            if self._rom_tag[index] != self._rom_generation:
+                self._rom[index] = self._read(addr)
+                self._rom_tag[index] = self._rom_generation
+            return self._rom[index]
+        return self._read(addr)
+
+    cdef inline void _wr(self, int addr, int value):
+        if self._ram_mapped and addr < 0x2000:
+            self._ram[addr & 0x07FF] = value
+            return
+        if addr >= self.register_start:
+            self._invalidate_rom()
+        self._write(addr, value)
+
+    cdef void _invalidate_rom(self):
+        self._rom_generation += 1
+        if self._rom_generation == 0:
+            memset(self._rom_tag, 0, sizeof(self._rom_tag))
+            self._rom_generation = 1
+
+    cdef inline int _read16(self, int addr):
+        cdef int lo = self._rd(addr & 0xFFFF)
+        cdef int hi = self._rd((addr + 1) & 0xFFFF)
+        return (hi << 8) | lo
+
+    cdef inline void _push(self, int value):
+        self._wr(0x0100 + self.sp, value & 0xFF)
+        self.sp = (self.sp - 1) & 0xFF
+
+    cdef inline int _pull(self):
+        self.sp = (self.sp + 1) & 0xFF
+        return self._rd(0x0100 + self.sp)
+
+    cdef inline void _set_flag(self, int flag, bint value):
+        # A bint argument is not normalised to 0/1; -(value != 0) is all ones or zero, so the flag
+        # is merged without a branch.
+        self.p = ((self.p & ~flag) | (flag & -(value != 0)) | FLAG_U) & 0xFF
+
+    cdef inline void _set_zn(self, int value):
+        value &= 0xFF
+        self.p = ((self.p & ~(FLAG_Z | FLAG_N)) | (FLAG_Z if value == 0 else 0) | (value & FLAG_N) | FLAG_U) & 0xFF
+
+    def reset(self):
+        self.a = 0
+        self.x = 0
+        self.y = 0
+        self.sp = 0xFD
+        self.p = FLAG_U | FLAG_I
+        self.addr_abs = 0
+        self.addr_base = 0
+        self.fetched = 0
+        self.page_crossed = 0
+        self.halted = False
+        self.stall_cycles = 0
+        self.requested_nmi = False
+        self.requested_irq = False
+        self._invalidate_rom()
+        self.pc = self._read16(0xFFFC)
+        self.total_cycles = 7
+
+    cpdef void request_nmi(self):
+        self.requested_nmi = True
+
+    cpdef void request_irq(self):
+        self.requested_irq = True
+
+    cdef int _service_interrupt(self, int vector, bint is_brk):
+        cdef int status
+        self._push((self.pc >> 8) & 0xFF)
+        self._push(self.pc & 0xFF)
+        status = self.p | FLAG_U
+        if is_brk:
+            status |= FLAG_B
+        else:
+            status &= ~FLAG_B
+        self._push(status)
+        self._set_flag(FLAG_I, True)
+        self.pc = self._read16(vector)
+        return 7
+
+    cpdef int step(self):
+        cdef int opcode
+        cdef int cycles
+        if self.halted:
+            self.total_cycles += 1
+            return 1
+
+        if self.stall_cycles > 0:
+            self.stall_cycles -= 1
+            self.total_cycles += 1
+            return 1
+
+        if self.requested_nmi:
+            self.requested_nmi = False
+            cycles = self._service_interrupt(0xFFFA, False)
+            self.total_cycles += cycles
+            return cycles
+
+        if self.requested_irq and not (self.p & FLAG_I):
+            self.requested_irq = False
+            cycles = self._service_interrupt(0xFFFE, False)
+            self.total_cycles += cycles
+            return cycles
+        self.requested_irq = False
+
+        opcode = self._rd(self.pc)
+        self.pc = (self.pc + 1) & 0xFFFF
+
+        self.current_mode = MODE_TABLE[opcode]
+        self.page_crossed = 0
+        self._address(self.current_mode)
+        cycles = CYCLE_TABLE[opcode] + self._operate(OP_TABLE[opcode]) + (PAGE_CYCLE_TABLE[opcode] & self.page_crossed)
+        self.total_cycles += cycles
+        return cycles
+
+    def run(self, int max_instructions, clock):
+        """Run up to max_instructions, stopping early once clock(cycles) returns true."""
+        cdef int executed = 0
+        while executed < max_instructions:
+            executed += 1
+            if clock(self.step()):
+                break
+        return executed
+
+    cdef inline int _fetch(self):
+        if self.current_mode != M_IMP and self.current_mode != M_ACC:
+            self.fetched = self._rd(self.addr_abs)
+        return self.fetched
+
+    cdef void _address(self, int mode):
+        cdef int lo
+        cdef int hi
+        cdef int value
+        cdef int ptr_lo
+        cdef int ptr_hi
+        cdef int ptr
+        cdef int t
+        if mode == M_IMP or mode == M_ACC:
+            self.fetched = self.a
+        elif mode == M_IMM:
+            self.addr_abs = self.pc
+            self.pc = (self.pc + 1) & 0xFFFF
+        elif mode == M_ZP0:
+            self.addr_abs = self._rd(self.pc) & 0x00FF
+            self.pc = (self.pc + 1) & 0xFFFF
+        elif mode == M_ZPX:
+            self.addr_abs = (self._rd(self.pc) + self.x) & 0x00FF
+            self.pc = (self.pc + 1) & 0xFFFF
+        elif mode == M_ZPY:
+            self.addr_abs = (self._rd(self.pc) + self.y) & 0x00FF
+            self.pc = (self.pc + 1) & 0xFFFF
+        elif mode == M_ABS:
+            lo = self._rd(self.pc)
+            hi = self._rd((self.pc + 1) & 0xFFFF)
+            self.addr_base = (hi << 8) | lo
+            self.addr_abs = self.addr_base
+            self.pc = (self.pc + 2) & 0xFFFF
+        elif mode == M_ABX:
+            lo = self._rd(self.pc)
+            hi = self._rd((self.pc + 1) & 0xFFFF)
+            self.addr_base = (hi << 8) | lo
+            self.addr_abs = (self.addr_base + self.x) & 0xFFFF
+            self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
+            self.pc = (self.pc + 2) & 0xFFFF
+        elif mode == M_ABY:
+            lo = self._rd(self.pc)
+            hi = self._rd((self.pc + 1) & 0xFFFF)
+            self.addr_base = (hi << 8) | lo
+            self.addr_abs = (self.addr_base + self.y) & 0xFFFF
+            self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
+            self.pc = (self.pc + 2) & 0xFFFF
+        elif mode == M_IND:
+            ptr_lo = self._rd(self.pc)
+            ptr_hi = self._rd((self.pc + 1) & 0xFFFF)
+            self.pc = (self.pc + 2) & 0xFFFF
+            ptr = (ptr_hi << 8) | ptr_lo
+            if ptr_lo == 0xFF:
+                lo = self._rd(ptr)
+                hi = self._rd(ptr & 0xFF00)
+            else:
+                lo = self._rd(ptr)
+                hi = self._rd((ptr + 1) & 0xFFFF)
+            self.addr_abs = (hi << 8) | lo
+        elif mode == M_IZX:
+            t = self._rd(self.pc)
+            self.pc = (self.pc + 1) & 0xFFFF
+            lo = self._rd((t + self.x) & 0x00FF)
+            hi = self._rd((t + self.x + 1) & 0x00FF)
+            self.addr_abs = (hi << 8) | lo
+        elif mode == M_IZY:
+            t = self._rd(self.pc)
+            self.pc = (self.pc + 1) & 0xFFFF
+            lo = self._rd(t & 0x00FF)
+            hi = self._rd((t + 1) & 0x00FF)
+            self.addr_base = (hi << 8) | lo
+            self.addr_abs = (self.addr_base + self.y) & 0xFFFF
+            self.page_crossed = ((self.addr_abs ^ self.addr_base) >> 8) & 1
+
+    cdef inline void _adc_value(self, int value):
+        cdef int temp = self.a + value + (self.p & FLAG_C)
+        cdef int result = temp & 0xFF
+        self._set_flag(FLAG_C, temp > 0xFF)
+        self._set_flag(FLAG_V, (~(self.a ^ value) & (self.a ^ result)) & 0x80)
+        self.a = result
+        self._set_zn(self.a)
+
+    cdef inline void _sbc_value(self, int value):
+        cdef int temp
+        value ^= 0xFF
+        temp = self.a + value + (self.p & FLAG_C)
+        self._set_flag(FLAG_C, temp > 0xFF)
+        self._set_flag(FLAG_V, ((temp ^ self.a) & (temp ^ value)) & 0x80)
+        self.a = temp & 0xFF
+        self._set_zn(self.a)
+
+    cdef inline void _compare(self, int register, int value):
+        self._set_flag(FLAG_C, register >= value)
+        self._set_zn((register - value) & 0xFF)
+
+    cdef inline int _branch(self, bint condition):
+        cdef int pc = self.pc
+        cdef int offset = self._rd(pc)
+        cdef int target
+        pc = (pc + 1) & 0xFFFF
+        if not condition:
+            self.pc = pc
+            return 0
+        if offset & 0x80:
+            offset -= 0x100
+        target = (pc + offset) & 0xFFFF
+        self.pc = target
+        return 2 if (pc ^ target) & 0xFF00 else 1
+
+    cdef inline int _unstable_store_addr(self, bint use_base_page):
+        if use_base_page:
+            return (self.addr_base & 0xFF00) | (self.addr_abs & 0x00FF)
+        return self.addr_abs
+
+    cdef int _operate(self, int op):
+        cdef int value
+        cdef int carry
+        cdef int temp
+        cdef int high
+        cdef int addr
+        cdef int lo
+        cdef int hi
+        cdef int bit5
+        cdef int bit6
+        if op == O_LDA:
+            self.a = self._fetch() & 0xFF
+            self._set_zn(self.a)
+        elif op == O_STA:
+            self._wr(self.addr_abs, self.a)
+        elif op == O_BNE:
+            return self._branch(not (self.p & FLAG_Z))
+        elif op == O_BEQ:
+            return self._branch(self.p & FLAG_Z)
+        elif op == O_BPL:
+            return self._branch(not (self.p & FLAG_N))
+        elif op == O_BMI:
+            return self._branch(self.p & FLAG_N)
+        elif op == O_BCC:
+            return self._branch(not (self.p & FLAG_C))
+        elif op == O_BCS:
+            return self._branch(self.p & FLAG_C)
+        elif op == O_BVC:
+            return self._branch(not (self.p & FLAG_V))
+        elif op == O_BVS:
+            return self._branch(self.p & FLAG_V)
+        elif op == O_LDX:
+            self.x = self._fetch() & 0xFF
+            self._set_zn(self.x)
+        elif op == O_LDY:
+            self.y = self._fetch() & 0xFF
+            self._set_zn(self.y)
+        elif op == O_STX:
+            self._wr(self.addr_abs, self.x)
+        elif op == O_STY:
+            self._wr(self.addr_abs, self.y)
+        elif op == O_CMP:
+            self._compare(self.a, self._fetch())
+        elif op == O_CPX:
+            self._compare(self.x, self._fetch())
+        elif op == O_CPY:
+            self._compare(self.y, self._fetch())
+        elif op == O_AND:
+            self.a = (self.a & self._fetch()) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_ORA:
+            self.a = (self.a | self._fetch()) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_EOR:
+            self.a = (self.a ^ self._fetch()) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_ADC:
+            self._adc_value(self._fetch())
+        elif op == O_SBC:
+            self._sbc_value(self._fetch())
+        elif op == O_BIT:
+            value = self._fetch()
+            # Z from the AND, N and V straight from operand bits 7 and 6, merged in one store.
+            self.p = (self.p & 0x3D) | (((self.a & value) == 0) << 1) | (value & 0xC0) | FLAG_U
+        elif op == O_INX:
+            self.x = (self.x + 1) & 0xFF
+            self._set_zn(self.x)
+        elif op == O_INY:
+            self.y = (self.y + 1) & 0xFF
+            self._set_zn(self.y)
+        elif op == O_DEX:
+            self.x = (self.x - 1) & 0xFF
+            self._set_zn(self.x)
+        elif op == O_DEY:
+            self.y = (self.y - 1) & 0xFF
+            self._set_zn(self.y)
+        elif op == O_INC:
+            value = (self._rd(self.addr_abs) + 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self._set_zn(value)
+        elif op == O_DEC:
+            value = (self._rd(self.addr_abs) - 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self._set_zn(value)
+        elif op == O_ASL:
+            if self.current_mode == M_ACC:
+                value = self.a
+                self._set_flag(FLAG_C, value & 0x80)
+                self.a = (value << 1) & 0xFF
+                self._set_zn(self.a)
+            else:
+                value = self._rd(self.addr_abs)
+                self._set_flag(FLAG_C, value & 0x80)
+                value = (value << 1) & 0xFF
+                self._wr(self.addr_abs, value)
+                self._set_zn(value)
+        elif op == O_LSR:
+            if self.current_mode == M_ACC:
+                value = self.a
+                self._set_flag(FLAG_C, value & 0x01)
+                self.a = (value >> 1) & 0xFF
+                self._set_zn(self.a)
+            else:
+                value = self._rd(self.addr_abs)
+                self._set_flag(FLAG_C, value & 0x01)
+                value = (value >> 1) & 0xFF
+                self._wr(self.addr_abs, value)
+                self._set_zn(value)
+        elif op == O_ROL:
+            carry = self.p & FLAG_C
+            if self.current_mode == M_ACC:
+                value = self.a
+                self._set_flag(FLAG_C, value & 0x80)
+                self.a = ((value << 1) | carry) & 0xFF
+                self._set_zn(self.a)
+            else:
+                value = self._rd(self.addr_abs)
+                self._set_flag(FLAG_C, value & 0x80)
+                value = ((value << 1) | carry) & 0xFF
+                self._wr(self.addr_abs, value)
+                self._set_zn(value)
+        elif op == O_ROR:
+            carry = self.p & FLAG_C
+            if self.current_mode == M_ACC:
+                value = self.a
+                self._set_flag(FLAG_C, value & 0x01)
+                self.a = ((carry << 7) | (value >> 1)) & 0xFF
+                self._set_zn(self.a)
+            else:
+                value = self._rd(self.addr_abs)
+                self._set_flag(FLAG_C, value & 0x01)
+                value = ((carry << 7) | (value >> 1)) & 0xFF
+                self._wr(self.addr_abs, value)
+                self._set_zn(value)
+        elif op == O_JMP:
+            self.pc = self.addr_abs
+        elif op == O_JSR:
+            temp = (self.pc - 1) & 0xFFFF
+            self._push((temp >> 8) & 0xFF)
+            self._push(temp & 0xFF)
+            self.pc = self.addr_abs
+        elif op == O_RTS:
+            lo = self._pull()
+            hi = self._pull()
+            self.pc = (((hi << 8) | lo) + 1) & 0xFFFF
+        elif op == O_RTI:
+            self.p = (self._pull() | FLAG_U) & ~FLAG_B
+            lo = self._pull()
+            hi = self._pull()
+            self.pc = (hi << 8) | lo
+        elif op == O_PHA:
+            self._push(self.a)
+        elif op == O_PHP:
+            self._push(self.p | FLAG_B | FLAG_U)
+        elif op == O_PLA:
+            self.a = self._pull()
+            self._set_zn(self.a)
+        elif op == O_PLP:
+            self.p = (self._pull() | FLAG_U) & ~FLAG_B
+        elif op == O_TAX:
+            self.x = self.a & 0xFF
+            self._set_zn(self.x)
+        elif op == O_TAY:
+            self.y = self.a & 0xFF
+            self._set_zn(self.y)
+        elif op == O_TXA:
+            self.a = self.x & 0xFF
+            self._set_zn(self.a)
+        elif op == O_TYA:
+            self.a = self.y & 0xFF
+            self._set_zn(self.a)
+        elif op == O_TSX:
+            self.x = self.sp & 0xFF
+            self._set_zn(self.x)
+        elif op == O_TXS:
+            self.sp = self.x & 0xFF
+        elif op == O_CLC:
+            self._set_flag(FLAG_C, False)
+        elif op == O_SEC:
+            self._set_flag(FLAG_C, True)
+        elif op == O_CLI:
+            self._set_flag(FLAG_I, False)
+        elif op == O_SEI:
+            self._set_flag(FLAG_I, True)
+        elif op == O_CLD:
+            self._set_flag(FLAG_D, False)
+        elif op == O_SED:
+            self._set_flag(FLAG_D, True)
+        elif op == O_CLV:
+            self._set_flag(FLAG_V, False)
+        elif op == O_NOP:
+            pass
+        elif op == O_BRK:
+            self.pc = (self.pc + 1) & 0xFFFF
+            self._service_interrupt(0xFFFE, True)
+        elif op == O_KIL:
+            self.halted = True
+        elif op == O_LAX:
+            value = self._fetch()
+            self.a = value
+            self.x = value
+            self._set_zn(value)
+        elif op == O_SAX:
+            self._wr(self.addr_abs, self.a & self.x)
+        elif op == O_DCP:
+            value = (self._rd(self.addr_abs) - 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self._compare(self.a, value)
+        elif op == O_ISC:
+            value = (self._rd(self.addr_abs) + 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self._sbc_value(value)
+        elif op == O_RLA:
+            value = self._rd(self.addr_abs)
+            carry = self.p & FLAG_C
+            self._set_flag(FLAG_C, value & 0x80)
+            value = ((value << 1) | carry) & 0xFF
+            self._wr(self.addr_abs, value)
+            self.a = (self.a & value) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_RRA:
+            value = self._rd(self.addr_abs)
+            carry = self.p & FLAG_C
+            self._set_flag(FLAG_C, value & 0x01)
+            value = ((carry << 7) | (value >> 1)) & 0xFF
+            self._wr(self.addr_abs, value)
+            self._adc_value(value)
+        elif op == O_SLO:
+            value = self._rd(self.addr_abs)
+            self._set_flag(FLAG_C, value & 0x80)
+            value = (value << 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self.a = (self.a | value) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_SRE:
+            value = self._rd(self.addr_abs)
+            self._set_flag(FLAG_C, value & 0x01)
+            value = (value >> 1) & 0xFF
+            self._wr(self.addr_abs, value)
+            self.a = (self.a ^ value) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_ANC:
+            self.a = (self.a & self._fetch()) & 0xFF
+            self._set_zn(self.a)
+            self._set_flag(FLAG_C, self.a & 0x80)
+        elif op == O_ALR:
+            self.a &= self._fetch()
+            self._set_flag(FLAG_C, self.a & 0x01)
+            self.a = (self.a >> 1) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_ARR:
+            self.a &= self._fetch()
+            self.a = (((self.p & FLAG_C) << 7) | (self.a >> 1)) & 0xFF
+            self._set_zn(self.a)
+            bit5 = (self.a >> 5) & 1
+            bit6 = (self.a >> 6) & 1
+            self._set_flag(FLAG_C, bit6)
+            self._set_flag(FLAG_V, bit5 ^ bit6)
+        elif op == O_XAA:
+            self.a = (self.x & self._fetch()) & 0xFF
+            self._set_zn(self.a)
+        elif op == O_AXS:
+            value = self._fetch()
+            temp = (self.a & self.x) - value
+            self._set_flag(FLAG_C, temp >= 0)
+            self.x = temp & 0xFF
+            self._set_zn(self.x)
+        elif op == O_LAS:
+            value = self._fetch() & self.sp
+            self.a = value
+            self.x = value
+            self.sp = value
+            self._set_zn(value)
+        elif op == O_AHX:
+            high = ((self.addr_base >> 8) + 1) & 0xFF
+            addr = self._unstable_store_addr(self.current_mode == M_ABY or self.current_mode == M_IZY)
+            self._wr(addr, self.a & self.x & high)
+        elif op == O_TAS:
+            self.sp = self.a & self.x
+            high = ((self.addr_base >> 8) + 1) & 0xFF
+            addr = self._unstable_store_addr(self.current_mode == M_ABY)
+            self._wr(addr, self.sp & high)
+        elif op == O_SHX:
+            high = ((self.addr_base >> 8) + 1) & 0xFF
+            addr = self._unstable_store_addr(self.current_mode == M_ABY)
+            self._wr(addr, self.x & high)
+        elif op == O_SHY:
+            high = ((self.addr_base >> 8) + 1) & 0xFF
+            addr = self._unstable_store_addr(self.current_mode == M_ABX)
+            self._wr(addr, self.y & high)
+        return 0
@@ -1,7 +1,7 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, field
+from typing import ClassVar, Optional
 
 
 MIRROR_HORIZONTAL = "horizontal"
@@ -10,21 +10,36 @@ MIRROR_FOUR_SCREEN = "four_screen"
 MIRROR_SINGLE0 = "single0"
 MIRROR_SINGLE1 = "single1"
 
+# Physical nametable backing each of the four logical ones at $2000/$2400/$2800/$2C00.
+NAMETABLE_MAPS = {
+    MIRROR_HORIZONTAL: b"\x00\x00\x01\x01",
+    MIRROR_VERTICAL: b"\x00\x01\x00\x01",
+    MIRROR_FOUR_SCREEN: b"\x00\x01\x02\x03",
+    MIRROR_SINGLE0: b"\x00\x00\x00\x00",
+    MIRROR_SINGLE1: b"\x01\x01\x01\x01",
+}
 
-def _clip8(value: int) -> int:
-    return value & 0xFF
+# MMC1 control register bits 0-1.
+_MMC1_MIRRORING = (MIRROR_SINGLE0, MIRROR_SINGLE1, MIRROR_VERTICAL, MIRROR_HORIZONTAL)
 
 
-def _clip16(value: int) -> int:
-    return value & 0xFFFF
-
-
-@dataclass
+@dataclass(slots=True)
 class Mapper:
+    # Lowest CPU address the mapper decodes; the bus does not consult it below this.
+    cpu_map_start: ClassVar[int] = 0x6000
+    # Lowest CPU address whose writes can switch banks or mirroring.
+    register_start: ClassVar[int] = 0x8000
+    # Whether banking can show one physical CHR byte at more than one PPU address.
+    chr_aliasing: ClassVar[bool] = True
+
     prg_rom: bytes
     chr_data: bytearray
     prg_ram: bytearray
     has_chr_ram: bool
+    # The IRQ line: the bus polls this flag after each CPU batch and raises an IRQ while it is set.
+    irq_flag: bool = False
+    # NAMETABLE_MAPS entry for mirroring(), kept in step by mappers that switch it; None when fixed by the header.
+    nt_map: Optional[bytes] = field(default=None, init=False, repr=False)
 
     def cpu_read(self, addr: int) -> Optional[int]:
         raise NotImplementedError
@@ -38,90 +53,138 @@ class Mapper:
     def ppu_write(self, addr: int, value: int) -> bool:
         raise NotImplementedError
 
+    def prg_offset(self, addr: int) -> int:
+        # Index into prg_rom that the CPU reads at addr ($8000-$FFFF) under the current banking.
+        # Optional: the bus only hands it to the CPU when a subclass overrides it.
+        raise NotImplementedError
+
+    def prg_ram_window(self) -> Optional[bytearray]:
+        # The buffer the CPU currently sees at $6000, or None when $6000-$7FFF must be read through cpu_read.
+        return None
+
+    def ppu_read_tile(self, addr: int) -> bytes | bytearray:
+        # The 16 pattern bytes (both planes) of the tile containing addr.
+        base = addr & 0x1FF0
+        ppu_read = self.ppu_read
+        return bytes(ppu_read(base + i) for i in range(16))
+
     def mirroring(self) -> Optional[str]:
         return None
 
     def clock_scanline(self) -> None:
         pass
 
-    def irq_pending(self) -> bool:
-        return False
 
-    def clear_irq(self) -> None:
-        pass
+@dataclass(slots=True)
+class Mapper0(Mapper):
+    # CHR is one fixed 8 KiB window.
+    chr_aliasing: ClassVar[bool] = False
 
+    _prg_mask: int = field(default=0x7FFF, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # A 16 KiB NROM-128 image is mirrored into both halves of $8000-$FFFF.
+        self._prg_mask = 0x3FFF if len(self.prg_rom) == 0x4000 else 0x7FFF
 
-@dataclass
-class Mapper0(Mapper):
     def cpu_read(self, addr: int) -> Optional[int]:
-        addr = _clip16(addr)
+        addr &= 0xFFFF
         if 0x6000 <= addr <= 0x7FFF:
             return self.prg_ram[addr - 0x6000]
         if addr < 0x8000:
             return None
-        if len(self.prg_rom) == 0x4000:
-            return self.prg_rom[(addr - 0x8000) & 0x3FFF]
-        return self.prg_rom[addr - 0x8000]
+        return self.prg_rom[addr & self._prg_mask]
+
+    def prg_offset(self, addr: int) -> int:
+        return addr & self._prg_mask
+
+    def prg_ram_window(self) -> Optional[bytearray]:
+        return self.prg_ram
 
     def cpu_write(self, addr: int, value: int) -> bool:
-        addr = _clip16(addr)
-        value = _clip8(value)
+        addr &= 0xFFFF
+        value &= 0xFF
         if 0x6000 <= addr <= 0x7FFF:
             self.prg_ram[addr - 0x6000] = value
             return True
         return False
 
     def ppu_read(self, addr: int) -> int:
-        return self.chr_data[_clip16(addr) & 0x1FFF]
+        return self.chr_data[addr & 0x1FFF]
+
+    def ppu_read_tile(self, addr: int) -> bytes | bytearray:
+        base = addr & 0x1FF0
+        return self.chr_data[base : base + 16]
 
     def ppu_write(self, addr: int, value: int) -> bool:
         if not self.has_chr_ram:
             return False
-        self.chr_data[_clip16(addr) & 0x1FFF] = _clip8(value)
+        self.chr_data[addr & 0x1FFF] = value & 0xFF
         return True
 
 
-@dataclass
+@dataclass(slots=True)
 class Mapper2(Mapper):
+    # CHR is one fixed 8 KiB window.
+    chr_aliasing: ClassVar[bool] = False
+
     prg_bank_select: int = 0
+    _bank_count: int = field(default=1, init=False, repr=False)
+    _prg_offset_8000: int = field(default=0, init=False, repr=False)
+    _prg_offset_c000: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        self._bank_count = max(1, len(self.prg_rom) // 0x4000)
+        self._prg_offset_c000 = (self._bank_count - 1) * 0x4000
+        self._select_prg_bank(self.prg_bank_select)
+
+    def _select_prg_bank(self, value: int) -> None:
+        self.prg_bank_select = value
+        self._prg_offset_8000 = (value % self._bank_count) * 0x4000
 
     def cpu_read(self, addr: int) -> Optional[int]:
-        addr = _clip16(addr)
+        addr &= 0xFFFF
         if 0x6000 <= addr <= 0x7FFF:
             return self.prg_ram[addr - 0x6000]
         if addr < 0x8000:
             return None
-        bank_count = max(1, len(self.prg_rom) // 0x4000)
         if addr < 0xC000:
-            bank = self.prg_bank_select % bank_count
-            offset = bank * 0x4000 + (addr - 0x8000)
-        else:
-            bank = bank_count - 1
-            offset = bank * 0x4000 + (addr - 0xC000)
-        return self.prg_rom[offset % len(self.prg_rom)]
+            return self.prg_rom[self._prg_offset_8000 + (addr - 0x8000)]
+        return self.prg_rom[self._prg_offset_c000 + (addr - 0xC000)]
+
+    def prg_offset(self, addr: int) -> int:
+        if addr < 0xC000:
+            return self._prg_offset_8000 + (addr - 0x8000)
+        return self._prg_offset_c000 + (addr - 0xC000)
+
+    def prg_ram_window(self) -> Optional[bytearray]:
+        return self.prg_ram
 
     def cpu_write(self, addr: int, value: int) -> bool:
-        addr = _clip16(addr)
-        value = _clip8(value)
+        addr &= 0xFFFF
+        value &= 0xFF
         if 0x6000 <= addr <= 0x7FFF:
             self.prg_ram[addr - 0x6000] = value
             return True
         if addr >= 0x8000:
-            self.prg_bank_select = value & 0x0F
+            self._select_prg_bank(value & 0x0F)
             return True
         return False
 
     def ppu_read(self, addr: int) -> int:
-        return self.chr_data[_clip16(addr) & 0x1FFF]
+        return self.chr_data[addr & 0x1FFF]
+
+    def ppu_read_tile(self, addr: int) -> bytes | bytearray:
+        base = addr & 0x1FF0
+        return self.chr_data[base : base + 16]
 
     def ppu_write(self, addr: int, value: int) -> bool:
         if not self.has_chr_ram:
             return False
-        self.chr_data[_clip16(addr) & 0x1FFF] = _clip8(value)
+        self.chr_data[addr & 0x1FFF] = value & 0xFF
         return True
 
 
-@dataclass
+@dataclass(slots=True)
 class Mapper1(Mapper):
     shift_register: int = 0x10
     control: int = 0x0C
@@ -130,13 +193,39 @@ class Mapper1(Mapper):
     prg_bank: int = 0
     ram_disable: bool = False
 
+    _prg_offset_8000: int = field(default=0, init=False, repr=False)
+    _prg_offset_c000: int = field(default=0, init=False, repr=False)
+    _chr_offset_0000: int = field(default=0, init=False, repr=False)
+    _chr_offset_1000: int = field(default=0, init=False, repr=False)
+    _prg_bank_offsets: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _chr_bank_offsets_4k: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _chr_bank_offsets_8k: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _mirroring: str = field(default=MIRROR_HORIZONTAL, init=False, repr=False)
+    _prg_last: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        # Byte offset of every register-selectable bank, so bank switches never divide by the ROM size.
+        prg_count = self._prg_bank_count()
+        chr_count = self._chr_bank_count_4k()
+        chr_pairs = max(1, chr_count // 2)
+        self._prg_bank_offsets = [(bank % prg_count) * 0x4000 for bank in range(0x10)]
+        self._prg_last = (prg_count - 1) * 0x4000
+        self._chr_bank_offsets_4k = [(bank % chr_count) * 0x1000 for bank in range(0x20)]
+        self._chr_bank_offsets_8k = [(bank % chr_pairs) * 0x2000 for bank in range(0x20)]
+        self._mirroring = _MMC1_MIRRORING[self.control & 0x03]
+        self.nt_map = NAMETABLE_MAPS[self._mirroring]
+        self._rebuild_luts()
+
     def _reset_shift(self) -> None:
         self.shift_register = 0x10
         self.control |= 0x0C
+        self._rebuild_luts()
 
     def _commit(self, target: int, value: int) -> None:
         if target == 0:
             self.control = value & 0x1F
+            self._mirroring = _MMC1_MIRRORING[value & 0x03]
+            self.nt_map = NAMETABLE_MAPS[self._mirroring]
         elif target == 1:
             self.chr_bank_0 = value & 0x1F
         elif target == 2:
@@ -144,6 +233,7 @@ class Mapper1(Mapper):
         else:
             self.prg_bank = value & 0x0F
             self.ram_disable = bool(value & 0x10)
+        self._rebuild_luts()
 
     def _prg_bank_count(self) -> int:
         return max(1, len(self.prg_rom) // 0x4000)
@@ -151,47 +241,59 @@ class Mapper1(Mapper):
     def _chr_bank_count_4k(self) -> int:
         return max(1, len(self.chr_data) // 0x1000)
 
-    def _map_prg(self, addr: int) -> int:
-        bank_count = self._prg_bank_count()
+    def _rebuild_luts(self) -> None:
+        # Offsets of the two 16 KiB PRG windows and the two 4 KiB CHR windows for the current registers.
+        prg_offsets = self._prg_bank_offsets
         mode = (self.control >> 2) & 0x03
         bank = self.prg_bank & 0x0F
         if mode in (0, 1):
-            bank &= 0x0E
-            return ((bank * 0x4000) + (addr - 0x8000)) % len(self.prg_rom)
-        if mode == 2:
-            if addr < 0xC000:
-                return addr - 0x8000
-            return ((bank % bank_count) * 0x4000 + (addr - 0xC000)) % len(self.prg_rom)
+            self._prg_offset_8000 = prg_offsets[bank & 0x0E]
+            self._prg_offset_c000 = prg_offsets[bank | 0x01]
+        elif mode == 2:
+            self._prg_offset_8000 = 0
+            self._prg_offset_c000 = prg_offsets[bank]
+        else:
+            self._prg_offset_8000 = prg_offsets[bank]
+            self._prg_offset_c000 = self._prg_last
+
+        if (self.control >> 4) & 0x01:
+            self._chr_offset_0000 = self._chr_bank_offsets_4k[self.chr_bank_0 & 0x1F]
+            self._chr_offset_1000 = self._chr_bank_offsets_4k[self.chr_bank_1 & 0x1F]
+        else:
+            self._chr_offset_0000 = self._chr_bank_offsets_8k[self.chr_bank_0 & 0x1E]
+            self._chr_offset_1000 = self._chr_offset_0000 + 0x1000
+
+    def _map_prg(self, addr: int) -> int:
         if addr < 0xC000:
-            return ((bank % bank_count) * 0x4000 + (addr - 0x8000)) % len(self.prg_rom)
-        return ((bank_count - 1) * 0x4000 + (addr - 0xC000)) % len(self.prg_rom)
+            return self._prg_offset_8000 + (addr & 0x3FFF)
+        return self._prg_offset_c000 + (addr & 0x3FFF)
 
     def _map_chr(self, addr: int) -> int:
-        addr &= 0x1FFF
-        mode = (self.control >> 4) & 0x01
-        chr_count = self._chr_bank_count_4k()
-        if mode == 0:
-            bank = (self.chr_bank_0 & 0x1E) % max(1, chr_count // 2)
-            return ((bank * 0x2000) + addr) % len(self.chr_data)
-        if addr < 0x1000:
-            bank = self.chr_bank_0 % chr_count
-            return (bank * 0x1000 + addr) % len(self.chr_data)
-        bank = self.chr_bank_1 % chr_count
-        return (bank * 0x1000 + (addr - 0x1000)) % len(self.chr_data)
+        if addr & 0x1000:
+            return self._chr_offset_1000 + (addr & 0x0FFF)
+        return self._chr_offset_0000 + (addr & 0x0FFF)
 
     def cpu_read(self, addr: int) -> Optional[int]:
-        addr = _clip16(addr)
+        addr &= 0xFFFF
         if 0x6000 <= addr <= 0x7FFF:
             if self.ram_disable:
                 return 0x00
             return self.prg_ram[addr - 0x6000]
         if addr < 0x8000:
             return None
-        return self.prg_rom[self._map_prg(addr)]
+        if addr < 0xC000:
+            return self.prg_rom[self._prg_offset_8000 + (addr - 0x8000)]
+        return self.prg_rom[self._prg_offset_c000 + (addr - 0xC000)]
+
+    def prg_offset(self, addr: int) -> int:
+        return self._map_prg(addr)
+
+    def prg_ram_window(self) -> Optional[bytearray]:
+        return None if self.ram_disable else self.prg_ram
 
     def cpu_write(self, addr: int, value: int) -> bool:
-        addr = _clip16(addr)
-        value = _clip8(value)
+        addr &= 0xFFFF
+        value &= 0xFF
         if 0x6000 <= addr <= 0x7FFF:
             if not self.ram_disable:
                 self.prg_ram[addr - 0x6000] = value
@@ -213,29 +315,27 @@ class Mapper1(Mapper):
     def ppu_read(self, addr: int) -> int:
         return self.chr_data[self._map_chr(addr)]
 
+    def ppu_read_tile(self, addr: int) -> bytes | bytearray:
+        # A 16-byte aligned tile never straddles a 4 KiB window.
+        base = self._map_chr(addr & 0x1FF0)
+        return self.chr_data[base : base + 16]
+
     def ppu_write(self, addr: int, value: int) -> bool:
         if not self.has_chr_ram:
             return False
-        self.chr_data[self._map_chr(addr)] = _clip8(value)
+        self.chr_data[self._map_chr(addr)] = value & 0xFF
         return True
 
     def mirroring(self) -> Optional[str]:
-        mode = self.control & 0x03
-        if mode == 0:
-            return MIRROR_SINGLE0
-        if mode == 1:
-            return MIRROR_SINGLE1
-        if mode == 2:
-            return MIRROR_VERTICAL
-        return MIRROR_HORIZONTAL
+        return self._mirroring
 
 
-@dataclass
+@dataclass(slots=True)
 class Mapper4(Mapper):
     """Partial MMC3 implementation focused on IRQ + bank switching."""
 
     bank_select: int = 0
-    bank_registers: list[int] = None  # type: ignore[assignment]
+    bank_registers: bytearray = None  # type: ignore[assignment]
     prg_mode: int = 0
     chr_mode: int = 0
     mirroring_mode: str = MIRROR_VERTICAL
@@ -243,11 +343,26 @@ class Mapper4(Mapper):
     irq_counter: int = 0
     irq_reload: bool = False
     irq_enable: bool = False
-    irq_flag: bool = False
+
+    _prg_slot_offset: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _chr_slot_offset: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _prg_bank_offsets: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _chr_bank_offsets: list[int] = field(default=None, init=False, repr=False)  # type: ignore[assignment]
+    _prg_last: int = field(default=0, init=False, repr=False)
+    _prg_second_last: int = field(default=0, init=False, repr=False)
 
     def __post_init__(self) -> None:
         if self.bank_registers is None:
-            self.bank_registers = [0] * 8
+            self.bank_registers = bytearray(8)
+        prg_count = self._prg_bank_count_8k()
+        chr_count = self._chr_bank_count_1k()
+        self._prg_bank_offsets = [(bank % prg_count) * 0x2000 for bank in range(0x100)]
+        self._chr_bank_offsets = [(bank % chr_count) * 0x0400 for bank in range(0x100)]
+        self._prg_last = (prg_count - 1) * 0x2000
+        self._prg_second_last = max(0, prg_count - 2) * 0x2000
+        self.nt_map = NAMETABLE_MAPS[self.mirroring_mode]
+        self._update_prg_offsets()
+        self._update_chr_offsets()
 
     def _prg_bank_count_8k(self) -> int:
         return max(1, len(self.prg_rom) // 0x2000)
@@ -255,45 +370,27 @@ class Mapper4(Mapper):
     def _chr_bank_count_1k(self) -> int:
         return max(1, len(self.chr_data) // 0x0400)
 
-    def _map_prg_bank(self, slot: int) -> int:
-        count = self._prg_bank_count_8k()
-        last = count - 1
-        second_last = max(0, count - 2)
-        r6 = self.bank_registers[6] % count
-        r7 = self.bank_registers[7] % count
+    def _update_prg_offsets(self) -> None:
+        # Byte offset of each 8 KiB PRG slot for the current R6/R7 and PRG mode.
+        prg_offsets = self._prg_bank_offsets
+        r6 = prg_offsets[self.bank_registers[6]]
+        r7 = prg_offsets[self.bank_registers[7]]
         if self.prg_mode == 0:
-            table = [r6, r7, second_last, last]
+            self._prg_slot_offset = [r6, r7, self._prg_second_last, self._prg_last]
         else:
-            table = [second_last, r7, r6, last]
-        return table[slot]
+            self._prg_slot_offset = [self._prg_second_last, r7, r6, self._prg_last]
 
-    def _map_chr_bank(self, addr: int) -> int:
-        count = self._chr_bank_count_1k()
+    def _update_chr_offsets(self) -> None:
+        # Byte offset of each 1 KiB CHR slot for the current R0-R5 and CHR mode.
         r = self.bank_registers
-        if self.chr_mode == 0:
-            table = [
-                (r[0] & 0xFE),
-                (r[0] | 0x01),
-                (r[1] & 0xFE),
-                (r[1] | 0x01),
-                r[2],
-                r[3],
-                r[4],
-                r[5],
-            ]
-        else:
-            table = [
-                r[2],
-                r[3],
-                r[4],
-                r[5],
-                (r[0] & 0xFE),
-                (r[0] | 0x01),
-                (r[1] & 0xFE),
-                (r[1] | 0x01),
-            ]
-        bank_1k = table[(addr & 0x1FFF) // 0x0400] % count
-        return bank_1k * 0x0400 + (addr & 0x03FF)
+        chr_offsets = self._chr_bank_offsets
+        banks = [r[0] & 0xFE, r[0] | 0x01, r[1] & 0xFE, r[1] | 0x01, r[2], r[3], r[4], r[5]]
+        if self.chr_mode:
+            banks = banks[4:] + banks[:4]
+        self._chr_slot_offset = [chr_offsets[bank] for bank in banks]
+
+    def _map_chr_bank(self, addr: int) -> int:
+        return self._chr_slot_offset[(addr >> 10) & 7] | (addr & 0x03FF)
 
     def cpu_read(self, addr: int) -> Optional[int]:
         addr &= 0xFFFF
@@ -301,10 +398,13 @@ class Mapper4(Mapper):
             return self.prg_ram[addr - 0x6000]
         if addr < 0x8000:
             return None
-        slot = (addr - 0x8000) // 0x2000
-        bank = self._map_prg_bank(slot)
-        offset = bank * 0x2000 + (addr & 0x1FFF)
-        return self.prg_rom[offset % len(self.prg_rom)]
+        return self.prg_rom[self._prg_slot_offset[(addr >> 13) & 3] | (addr & 0x1FFF)]
+
+    def prg_offset(self, addr: int) -> int:
+        return self._prg_slot_offset[(addr >> 13) & 3] | (addr & 0x1FFF)
+
+    def prg_ram_window(self) -> Optional[bytearray]:
+        return self.prg_ram
 
     def cpu_write(self, addr: int, value: int) -> bool:
         addr &= 0xFFFF
@@ -317,12 +417,23 @@ class Mapper4(Mapper):
         reg = addr & 0xE001
         if reg == 0x8000:
             self.bank_select = value & 0x07
-            self.prg_mode = (value >> 6) & 1
-            self.chr_mode = (value >> 7) & 1
+            prg_mode = (value >> 6) & 1
+            chr_mode = (value >> 7) & 1
+            if prg_mode != self.prg_mode:
+                self.prg_mode = prg_mode
+                self._update_prg_offsets()
+            if chr_mode != self.chr_mode:
+                self.chr_mode = chr_mode
+                self._update_chr_offsets()
         elif reg == 0x8001:
             self.bank_registers[self.bank_select] = value
+            if self.bank_select >= 6:
+                self._update_prg_offsets()
+            else:
+                self._update_chr_offsets()
         elif reg == 0xA000:
             self.mirroring_mode = MIRROR_HORIZONTAL if (value & 1) else MIRROR_VERTICAL
+            self.nt_map = NAMETABLE_MAPS[self.mirroring_mode]
         elif reg == 0xC000:
             self.irq_latch = value
         elif reg == 0xC001:
@@ -335,7 +446,12 @@ class Mapper4(Mapper):
         return True
 
     def ppu_read(self, addr: int) -> int:
-        return self.chr_data[self._map_chr_bank(addr)]
+        return self.chr_data[self._chr_slot_offset[(addr >> 10) & 7] | (addr & 0x03FF)]
+
+    def ppu_read_tile(self, addr: int) -> bytes | bytearray:
+        # A 16-byte aligned tile never straddles a 1 KiB slot.
+        base = self._chr_slot_offset[(addr >> 10) & 7] | (addr & 0x03F0)
+        return self.chr_data[base : base + 16]
 
     def ppu_write(self, addr: int, value: int) -> bool:
         if not self.has_chr_ram:
@@ -352,12 +468,6 @@ class Mapper4(Mapper):
         if self.irq_counter == 0 and self.irq_enable:
             self.irq_flag = True
 
-    def irq_pending(self) -> bool:
-        return self.irq_flag
-
-    def clear_irq(self) -> None:
-        self.irq_flag = False
-
     def mirroring(self) -> Optional[str]:
         return self.mirroring_mode
 
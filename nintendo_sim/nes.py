@@ -1,6 +1,6 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
 
 from .bus import Bus
@@ -17,19 +17,45 @@ from .controller import (
 from .rom import Cartridge, load_ines
 
 
-@dataclass
+@dataclass(slots=True)
 class NES:
     cartridge: Cartridge
     ppu_backend: str = "auto"
+    cpu_backend: str = "auto"
+    controller_backend: str = "auto"
+    render: bool = True
+
+    bus: Bus = field(init=False, repr=False)
 
     def __post_init__(self) -> None:
-        self.bus = Bus(self.cartridge, ppu_backend=self.ppu_backend)
+        self.bus = Bus(
+            self.cartridge,
+            ppu_backend=self.ppu_backend,
+            cpu_backend=self.cpu_backend,
+            controller_backend=self.controller_backend,
+        )
         self.ppu_backend = self.bus.ppu_backend
+        self.cpu_backend = self.bus.cpu_backend
+        self.controller_backend = self.bus.controller_backend
+        self.bus.ppu.render = self.render
         self.bus.reset()
 
     @classmethod
-    def from_rom(cls, rom_path: str | Path, ppu_backend: str = "auto") -> "NES":
-        return cls(load_ines(rom_path), ppu_backend=ppu_backend)
+    def from_rom(
+        cls,
+        rom_path: str | Path,
+        ppu_backend: str = "auto",
+        cpu_backend: str = "auto",
+        render: bool = True,
+        controller_backend: str = "auto",
+    ) -> "NES":
+        return cls(
+            load_ines(rom_path),
+            ppu_backend=ppu_backend,
+            cpu_backend=cpu_backend,
+            controller_backend=controller_backend,
+            render=render,
+        )
 
     def reset(self) -> None:
         self.bus.reset()
@@ -39,22 +65,29 @@ class NES:
 
     def step_frame(self, max_cpu_instructions: int = 1000000, copy_frame: bool = True) -> bytes | bytearray:
         ppu = self.bus.ppu
-        step = self.bus.step
         ppu.frame_complete = False
-        executed = 0
-        while not ppu.frame_complete:
-            step()
-            executed += 1
-            if executed >= max_cpu_instructions:
-                raise RuntimeError("Frame execution exceeded instruction limit")
+        self.bus.run_until_frame(max_cpu_instructions)
+        if not ppu.frame_complete:
+            raise RuntimeError("Frame execution exceeded instruction limit")
         ppu.frame_complete = False
         if copy_frame:
             return bytes(ppu.frame_rgb)
         return ppu.frame_rgb
 
-    def run_frames(self, count: int) -> None:
+    @property
+    def frame_buffer(self) -> bytearray:
+        """The PPU's live 256x240 RGB buffer, rewritten in place every frame."""
+        return self.bus.ppu.frame_rgb
+
+    def run_frames(self, count: int, max_cpu_instructions: int = 1000000) -> None:
+        ppu = self.bus.ppu
+        run_until_frame = self.bus.run_until_frame
         for _ in range(count):
-            self.step_frame(copy_frame=False)
+            ppu.frame_complete = False
+            run_until_frame(max_cpu_instructions)
+            if not ppu.frame_complete:
+                raise RuntimeError("Frame execution exceeded instruction limit")
+        ppu.frame_complete = False
 
     def set_button(self, button: int, pressed: bool, controller: int = 1) -> None:
         target = self.bus.controller1 if controller == 1 else self.bus.controller2
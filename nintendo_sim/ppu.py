@@ -1,14 +1,9 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
+from typing import Callable
 
-from .mapper import (
-    MIRROR_FOUR_SCREEN,
-    MIRROR_HORIZONTAL,
-    MIRROR_SINGLE0,
-    MIRROR_SINGLE1,
-    MIRROR_VERTICAL,
-)
+from .mapper import MIRROR_HORIZONTAL, MIRROR_VERTICAL, NAMETABLE_MAPS
 from .palette import NES_RGB_PALETTE
 from .rom import Cartridge
 
@@ -20,6 +15,45 @@ def _reverse_bits(byte: int) -> int:
     return byte & 0xFF
 
 
+# Bit-reversed bytes, for horizontally flipped sprite rows.
+_BITREV = bytes(_reverse_bits(byte) for byte in range(256))
+
+
+def _build_unrolled_clocks(max_cpu_cycles: int) -> tuple:
+    # Straight-line bodies for the instruction lengths the CPU actually returns, so the
+    # per-instruction dot loop avoids range() and loop bytecode.
+    handlers = [None]
+    for cpu_cycles in range(1, max_cpu_cycles + 1):
+        body = "; ".join(["clock()"] * (cpu_cycles * 3))
+        namespace: dict = {}
+        exec(f"def clock_{cpu_cycles}(clock):\n    {body}\n", namespace)
+        handlers.append(namespace[f"clock_{cpu_cycles}"])
+    return tuple(handlers)
+
+
+_MAX_UNROLLED_CPU_CYCLES = 8
+_UNROLLED_CLOCKS = _build_unrolled_clocks(_MAX_UNROLLED_CPU_CYCLES)
+_NO_SPRITES = bytes(32)
+_NO_TILES = (None,) * 512
+# Background fetch step (0-7) for each dot of a rendering line; dots 338 and 340 only refetch a
+# nametable byte, and 0xFF marks dots with no fetch.
+_DOT_EXTRA_NAMETABLE_FETCH = 8
+_DOT_FETCH_PHASE = bytes(
+    (cycle - 1) % 8 if (2 <= cycle < 258) or (321 <= cycle < 338)
+    else _DOT_EXTRA_NAMETABLE_FETCH if cycle in (338, 340)
+    else 0xFF
+    for cycle in range(341)
+)
+# $3F10/$3F14/$3F18/$3F1C mirror the backdrop entries below them.
+_PALETTE_MIRROR = bytes(i - 0x10 if i in (0x10, 0x14, 0x18, 0x1C) else i for i in range(32))
+# Low byte of each attribute plane, by the tile's 2-bit palette number.
+_ATTR_FILL = (0x00000000, 0x000000FF, 0x00FF0000, 0x00FF00FF)
+# Each byte's bits moved to the even positions of a 16-bit word, for interleaving two pattern planes.
+_SPREAD_BITS = tuple(sum(((byte >> bit) & 1) << (bit * 2) for bit in range(8)) for byte in range(256))
+# Packed RGB triple per palette index; a finished scanline is joined from these in one pass.
+_PALETTE_RGB_BYTES = tuple(bytes(rgb) for rgb in NES_RGB_PALETTE)
+
+
 POWER_UP_PALETTE = (
     0x09,
     0x01,
@@ -70,6 +104,9 @@ class PPU:
     rendering_enabled: bool = False
     dynamic_mirroring: bool = False
     cached_mirroring: str = MIRROR_HORIZONTAL
+    static_nt_map: bytes = NAMETABLE_MAPS[MIRROR_HORIZONTAL]
+    # Mirroring map in effect; only a mapper register write can change it.
+    _nt_map: bytes = field(default=NAMETABLE_MAPS[MIRROR_HORIZONTAL], init=False, repr=False)
 
     vram_addr: int = 0
     tram_addr: int = 0
@@ -81,7 +118,12 @@ class PPU:
     cycle: int = 0
     odd_frame: bool = False
     frame_complete: bool = False
+    # Set whenever a scanline changes frame_rgb; the presenter clears it once it has shown the frame.
+    frame_dirty: bool = True
+    # When false, pixels are still composited (sprite 0 hits) but never written to frame_rgb.
+    render: bool = True
     nmi: bool = False
+    nmi_raised: bool = False
     nmi_occurred: bool = False
     nmi_output: bool = False
     nmi_previous: bool = False
@@ -96,18 +138,18 @@ class PPU:
     bg_next_tile_lsb: int = 0
     bg_next_tile_msb: int = 0
 
-    bg_shifter_pattern_lo: int = 0
-    bg_shifter_pattern_hi: int = 0
-    bg_shifter_attr_lo: int = 0
-    bg_shifter_attr_hi: int = 0
+    # Each pairs a high plane in bits 16-31 with a low plane in bits 0-15, so one shift moves both.
+    bg_shifter_pattern: int = 0
+    bg_shifter_attr: int = 0
 
-    sprite_scanline: list[list[int]] = field(default_factory=lambda: [[0, 0, 0, 0] for _ in range(8)])
+    # Up to 8 sprites as flat (y, tile, attr, x) quadruples; slot i starts at i * 4.
+    sprite_scanline: bytearray = field(default_factory=lambda: bytearray(32))
     sprite_count: int = 0
-    sprite_shifter_pattern_lo: list[int] = field(default_factory=lambda: [0] * 8)
-    sprite_shifter_pattern_hi: list[int] = field(default_factory=lambda: [0] * 8)
+    # Both pattern planes per sprite, interleaved so the next pixel is always the top two bits.
+    sprite_shifter_pattern: list[int] = field(default_factory=lambda: [0] * 8)
     sprite_zero_hit_possible: bool = False
     sprite_zero_being_rendered: bool = False
-    eval_sprite_scanline: list[list[int]] = field(default_factory=lambda: [[0, 0, 0, 0] for _ in range(8)])
+    eval_sprite_scanline: bytearray = field(default_factory=lambda: bytearray(32))
     eval_sprite_count: int = 0
     eval_sprite_zero_possible: bool = False
     eval_oam_n: int = 0
@@ -115,8 +157,42 @@ class PPU:
     eval_read_byte: int = 0
     eval_overflow_mode: bool = False
     eval_done: bool = True
+    # Set while this line's evaluation has not been stepped yet; see _finish_sprite_evaluation.
+    _eval_deferred: bool = field(default=False, init=False, repr=False)
 
     frame_rgb: bytearray = field(default_factory=lambda: bytearray(256 * 240 * 3))
+    # Palette indices of the scanline being drawn, copied into frame_rgb at its last dot.
+    _line_colors: bytearray = field(default_factory=lambda: bytearray(256), init=False, repr=False)
+    # $2000-$2007 handlers, indexed by register number.
+    _register_reads: list = field(init=False, repr=False)
+    _register_writes: list = field(init=False, repr=False)
+    # The cartridge's mapper hooks, bound once; the mapper never changes after construction.
+    _mapper_read: Callable[[int], int] = field(init=False, repr=False)
+    _mapper_write: Callable[[int, int], bool] = field(init=False, repr=False)
+    _mapper_clock_scanline: Callable[[], None] = field(init=False, repr=False)
+    _mapper_read_tile: Callable[[int], bytes | bytearray] = field(init=False, repr=False)
+    # Pattern bytes of each of the 512 tiles as last fetched, or None; cleared whenever CHR may change.
+    _tile_cache: list = field(default_factory=lambda: [None] * 512, init=False, repr=False)
+    _chr_aliasing: bool = field(default=True, init=False, repr=False)
+    # Zero-copy view of the Y byte of each OAM entry; tracks writes to oam.
+    _oam_y: memoryview = field(init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        mapper = self.cartridge.mapper
+        self._mapper_read = mapper.ppu_read
+        self._mapper_write = mapper.ppu_write
+        self._mapper_clock_scanline = mapper.clock_scanline
+        self._mapper_read_tile = mapper.ppu_read_tile
+        self._chr_aliasing = type(mapper).chr_aliasing
+        self._oam_y = memoryview(self.oam)[::4]
+        open_bus = self._read_open_bus
+        self._register_reads = [
+            open_bus, open_bus, self._read_status, open_bus, self._read_oam_data, open_bus, open_bus, self._read_data,
+        ]
+        self._register_writes = [
+            self._write_ctrl, self._write_mask, self._write_ignored, self._write_oam_addr,
+            self._write_oam_data, self._write_scroll, self._write_addr, self._write_data,
+        ]
 
     def _nmi_change(self) -> None:
         nmi_line = self.nmi_output and self.nmi_occurred
@@ -134,6 +210,12 @@ class PPU:
         self.nmi_occurred = active
         self._nmi_change()
 
+    def notify_mapper_write(self) -> None:
+        # Called after a CPU write to a mapper register, which may have switched CHR banks.
+        self._tile_cache[:] = _NO_TILES
+        if self.dynamic_mirroring:
+            self._nt_map = self.cartridge.mapper.nt_map
+
     def reset(self) -> None:
         self.ctrl = 0
         self.mask = 0
@@ -147,6 +229,9 @@ class PPU:
         else:
             self.dynamic_mirroring = True
             self.cached_mirroring = mapper_mirroring
+        # Unknown header values behave as vertical mirroring.
+        self.static_nt_map = NAMETABLE_MAPS.get(self.cached_mirroring, NAMETABLE_MAPS[MIRROR_VERTICAL])
+        self._nt_map = self.cartridge.mapper.nt_map if self.dynamic_mirroring else self.static_nt_map
         self.vram_addr = 0
         self.tram_addr = 0
         self.fine_x = 0
@@ -157,6 +242,7 @@ class PPU:
         self.odd_frame = False
         self.frame_complete = False
         self.nmi = False
+        self.nmi_raised = False
         self.nmi_occurred = False
         self.nmi_output = False
         self.nmi_previous = False
@@ -169,14 +255,12 @@ class PPU:
         self.bg_next_tile_attr = 0
         self.bg_next_tile_lsb = 0
         self.bg_next_tile_msb = 0
-        self.bg_shifter_pattern_lo = 0
-        self.bg_shifter_pattern_hi = 0
-        self.bg_shifter_attr_lo = 0
-        self.bg_shifter_attr_hi = 0
+        self.bg_shifter_pattern = 0
+        self.bg_shifter_attr = 0
         self.sprite_count = 0
         self.sprite_zero_hit_possible = False
         self.sprite_zero_being_rendered = False
-        self.eval_sprite_scanline = [[0, 0, 0, 0] for _ in range(8)]
+        self.eval_sprite_scanline[:] = _NO_SPRITES
         self.eval_sprite_count = 0
         self.eval_sprite_zero_possible = False
         self.eval_oam_n = 0
@@ -184,18 +268,10 @@ class PPU:
         self.eval_read_byte = 0
         self.eval_overflow_mode = False
         self.eval_done = True
+        self._eval_deferred = False
         for i, value in enumerate(POWER_UP_PALETTE):
             self.palette_ram[i] = value
 
-    def _increment_scroll_x(self) -> None:
-        if not self.rendering_enabled:
-            return
-        if (self.vram_addr & 0x001F) == 31:
-            self.vram_addr &= ~0x001F
-            self.vram_addr ^= 0x0400
-        else:
-            self.vram_addr = (self.vram_addr + 1) & 0x7FFF
-
     def _increment_scroll_y(self) -> None:
         if not self.rendering_enabled:
             return
@@ -214,167 +290,160 @@ class PPU:
             self.vram_addr = (self.vram_addr & ~0x03E0) | (y << 5)
         self.vram_addr &= 0x7FFF
 
-    def _transfer_address_x(self) -> None:
-        if not self.rendering_enabled:
-            return
-        self.vram_addr = (self.vram_addr & ~0x041F) | (self.tram_addr & 0x041F)
-
-    def _transfer_address_y(self) -> None:
-        if not self.rendering_enabled:
-            return
-        self.vram_addr = (self.vram_addr & ~0x7BE0) | (self.tram_addr & 0x7BE0)
-
     def _load_background_shifters(self) -> None:
-        self.bg_shifter_pattern_lo = (self.bg_shifter_pattern_lo & 0xFF00) | self.bg_next_tile_lsb
-        self.bg_shifter_pattern_hi = (self.bg_shifter_pattern_hi & 0xFF00) | self.bg_next_tile_msb
-        attr_lo = 0xFF if (self.bg_next_tile_attr & 0x01) else 0x00
-        attr_hi = 0xFF if (self.bg_next_tile_attr & 0x02) else 0x00
-        self.bg_shifter_attr_lo = (self.bg_shifter_attr_lo & 0xFF00) | attr_lo
-        self.bg_shifter_attr_hi = (self.bg_shifter_attr_hi & 0xFF00) | attr_hi
+        self.bg_shifter_pattern = (
+            (self.bg_shifter_pattern & 0xFF00FF00) | (self.bg_next_tile_msb << 16) | self.bg_next_tile_lsb
+        )
+        self.bg_shifter_attr = (self.bg_shifter_attr & 0xFF00FF00) | _ATTR_FILL[self.bg_next_tile_attr & 0x03]
 
     def _update_shifters(self) -> None:
         if self.mask & 0x08:
-            self.bg_shifter_pattern_lo = (self.bg_shifter_pattern_lo << 1) & 0xFFFF
-            self.bg_shifter_pattern_hi = (self.bg_shifter_pattern_hi << 1) & 0xFFFF
-            self.bg_shifter_attr_lo = (self.bg_shifter_attr_lo << 1) & 0xFFFF
-            self.bg_shifter_attr_hi = (self.bg_shifter_attr_hi << 1) & 0xFFFF
+            # The mask drops the bit carried from the low plane into the high one.
+            self.bg_shifter_pattern = (self.bg_shifter_pattern << 1) & 0xFFFEFFFE
+            self.bg_shifter_attr = (self.bg_shifter_attr << 1) & 0xFFFEFFFE
         # Sprite shifters/counters advance only on visible dots.
-        if (self.mask & 0x10) and (0 <= self.scanline < 240) and (2 <= self.cycle <= 256):
+        if self.sprite_count and (self.mask & 0x10) and (0 <= self.scanline < 240) and (2 <= self.cycle <= 256):
+            sprite_scanline = self.sprite_scanline
             for i in range(self.sprite_count):
-                if self.sprite_scanline[i][3] > 0:
-                    self.sprite_scanline[i][3] -= 1
+                if sprite_scanline[i * 4 + 3] > 0:
+                    sprite_scanline[i * 4 + 3] -= 1
                 else:
-                    self.sprite_shifter_pattern_lo[i] = (self.sprite_shifter_pattern_lo[i] << 1) & 0xFF
-                    self.sprite_shifter_pattern_hi[i] = (self.sprite_shifter_pattern_hi[i] << 1) & 0xFF
-
-    def _resolve_mirroring(self) -> str:
-        if not self.dynamic_mirroring:
-            return self.cached_mirroring
-        mapper_mirroring = self.cartridge.mapper.mirroring()
-        if mapper_mirroring is not None:
-            self.cached_mirroring = mapper_mirroring
-        return self.cached_mirroring
-
-    def _map_nametable_addr(self, addr: int) -> tuple[int, int]:
-        addr &= 0x0FFF
-        table = (addr // 0x400) & 0x03
-        index = addr & 0x03FF
-        mirroring = self._resolve_mirroring()
-        if mirroring == MIRROR_FOUR_SCREEN:
-            return table, index
-        if mirroring == MIRROR_VERTICAL:
-            return table & 0x01, index
-        if mirroring == MIRROR_HORIZONTAL:
-            return 0 if table in (0, 1) else 1, index
-        if mirroring == MIRROR_SINGLE0:
-            return 0, index
-        if mirroring == MIRROR_SINGLE1:
-            return 1, index
-        return table & 0x01, index
+                    self.sprite_shifter_pattern[i] = (self.sprite_shifter_pattern[i] << 2) & 0xFFFF
 
     def ppu_read(self, addr: int) -> int:
         addr &= 0x3FFF
         if addr <= 0x1FFF:
-            return self.cartridge.mapper.ppu_read(addr)
+            return self._mapper_read(addr)
         if addr <= 0x3EFF:
-            table, index = self._map_nametable_addr(addr - 0x2000)
-            return self.nametable[table][index]
-        palette_addr = addr & 0x001F
-        if palette_addr in (0x10, 0x14, 0x18, 0x1C):
-            palette_addr -= 0x10
+            # The mirroring map routes each 1 KiB quadrant straight to its physical table.
+            return self.nametable[self._nt_map[(addr >> 10) & 0x03]][addr & 0x03FF]
+        palette_addr = _PALETTE_MIRROR[addr & 0x001F]
         return self.palette_ram[palette_addr] & 0x3F
 
     def ppu_write(self, addr: int, value: int) -> None:
         addr &= 0x3FFF
         value &= 0xFF
         if addr <= 0x1FFF:
-            self.cartridge.mapper.ppu_write(addr, value)
+            # CHR ROM ignores the write, so only CHR RAM cartridges need the mapper call.
+            if self.cartridge.has_chr_ram:
+                self._mapper_write(addr, value)
+                if self._chr_aliasing:
+                    # The tile may also be visible through another CHR window, so every cached tile is dropped.
+                    self._tile_cache[:] = _NO_TILES
+                else:
+                    self._tile_cache[addr >> 4] = None
             return
         if addr <= 0x3EFF:
-            table, index = self._map_nametable_addr(addr - 0x2000)
-            self.nametable[table][index] = value
+            self.nametable[self._nt_map[(addr >> 10) & 0x03]][addr & 0x03FF] = value
             return
-        palette_addr = addr & 0x001F
-        if palette_addr in (0x10, 0x14, 0x18, 0x1C):
-            palette_addr -= 0x10
+        palette_addr = _PALETTE_MIRROR[addr & 0x001F]
         self.palette_ram[palette_addr] = value & 0x3F
 
     def cpu_read(self, addr: int) -> int:
-        reg = addr & 0x0007
-        if reg == 0x0002:
-            data = (self.status & 0xE0) | (self.ppu_data_buffer & 0x1F)
-            if self.scanline == 241 and self.cycle == 1:
-                self.suppress_vblank = True
-                self.suppress_nmi = True
-            elif self.scanline == 241 and self.cycle in (2, 3):
-                self.suppress_nmi = True
-                self.nmi_delay = 0
-                self.nmi_hold = 0
-                self.nmi = False
-            self._set_vblank(False)
-            self.address_latch = 0
-            return data
-        if reg == 0x0004:
-            return self.oam[self.oam_addr]
-        if reg == 0x0007:
-            addr = self.vram_addr & 0x3FFF
-            if addr >= 0x3F00:
-                # Palette reads are unbuffered, but still perform a hidden read that updates
-                # the buffer from the underlying nametable space.
-                data = self.ppu_read(addr)
-                self.ppu_data_buffer = self.ppu_read((addr - 0x1000) & 0x3FFF)
-            else:
-                data = self.ppu_data_buffer
-                self.ppu_data_buffer = self.ppu_read(addr)
-            increment = 32 if (self.ctrl & 0x04) else 1
-            self.vram_addr = (self.vram_addr + increment) & 0x7FFF
-            return data
+        return self._register_reads[addr & 0x0007]()
+
+    def _read_open_bus(self) -> int:
         return 0x00
 
+    def _read_status(self) -> int:
+        self._sync_sprite_evaluation()
+        data = (self.status & 0xE0) | (self.ppu_data_buffer & 0x1F)
+        if self.scanline == 241 and self.cycle == 1:
+            self.suppress_vblank = True
+            self.suppress_nmi = True
+        elif self.scanline == 241 and self.cycle in (2, 3):
+            self.suppress_nmi = True
+            self.nmi_delay = 0
+            self.nmi_hold = 0
+            self.nmi = False
+        self._set_vblank(False)
+        self.address_latch = 0
+        return data
+
+    def _read_oam_data(self) -> int:
+        return self.oam[self.oam_addr]
+
+    def _read_data(self) -> int:
+        addr = self.vram_addr & 0x3FFF
+        if addr >= 0x3F00:
+            # Palette reads are unbuffered, but still perform a hidden read that updates
+            # the buffer from the underlying nametable space.
+            data = self.ppu_read(addr)
+            self.ppu_data_buffer = self.ppu_read((addr - 0x1000) & 0x3FFF)
+        else:
+            data = self.ppu_data_buffer
+            self.ppu_data_buffer = self.ppu_read(addr)
+        increment = 32 if (self.ctrl & 0x04) else 1
+        self.vram_addr = (self.vram_addr + increment) & 0x7FFF
+        return data
+
     def cpu_write(self, addr: int, value: int) -> None:
-        reg = addr & 0x0007
-        value &= 0xFF
-        if reg == 0x0000:
-            self.ctrl = value
-            self.nmi_output = bool(self.ctrl & 0x80)
-            self._nmi_change()
-            self.tram_addr = (self.tram_addr & 0xF3FF) | ((value & 0x03) << 10)
-        elif reg == 0x0001:
-            self.mask = value
-            self.rendering_enabled = bool(value & 0x18)
-        elif reg == 0x0003:
-            self.oam_addr = value
-        elif reg == 0x0004:
-            self.oam[self.oam_addr] = value
-            self.oam_addr = (self.oam_addr + 1) & 0xFF
-        elif reg == 0x0005:
-            if self.address_latch == 0:
-                self.fine_x = value & 0x07
-                self.tram_addr = (self.tram_addr & 0xFFE0) | (value >> 3)
-                self.address_latch = 1
-            else:
-                self.tram_addr = (self.tram_addr & 0x8FFF) | ((value & 0x07) << 12)
-                self.tram_addr = (self.tram_addr & 0xFC1F) | ((value & 0xF8) << 2)
-                self.address_latch = 0
-        elif reg == 0x0006:
-            if self.address_latch == 0:
-                self.tram_addr = (self.tram_addr & 0x00FF) | ((value & 0x3F) << 8)
-                self.address_latch = 1
-            else:
-                self.tram_addr = (self.tram_addr & 0xFF00) | value
-                self.vram_addr = self.tram_addr
-                self.address_latch = 0
-        elif reg == 0x0007:
-            self.ppu_write(self.vram_addr, value)
-            increment = 32 if (self.ctrl & 0x04) else 1
-            self.vram_addr = (self.vram_addr + increment) & 0x7FFF
+        self._register_writes[addr & 0x0007](value & 0xFF)
+
+    def _write_ignored(self, value: int) -> None:
+        pass
+
+    def _write_ctrl(self, value: int) -> None:
+        self._sync_sprite_evaluation()
+        self.ctrl = value
+        self.nmi_output = bool(self.ctrl & 0x80)
+        self._nmi_change()
+        self.tram_addr = (self.tram_addr & 0xF3FF) | ((value & 0x03) << 10)
+
+    def _write_mask(self, value: int) -> None:
+        self._sync_sprite_evaluation()
+        self.mask = value
+        self.rendering_enabled = bool(value & 0x18)
+
+    def _write_oam_addr(self, value: int) -> None:
+        self.oam_addr = value
+
+    def _write_oam_data(self, value: int) -> None:
+        self._sync_sprite_evaluation()
+        self.oam[self.oam_addr] = value
+        self.oam_addr = (self.oam_addr + 1) & 0xFF
+
+    def _write_scroll(self, value: int) -> None:
+        if self.address_latch == 0:
+            self.fine_x = value & 0x07
+            self.tram_addr = (self.tram_addr & 0xFFE0) | (value >> 3)
+            self.address_latch = 1
+        else:
+            self.tram_addr = (self.tram_addr & 0x8FFF) | ((value & 0x07) << 12)
+            self.tram_addr = (self.tram_addr & 0xFC1F) | ((value & 0xF8) << 2)
+            self.address_latch = 0
+
+    def _write_addr(self, value: int) -> None:
+        if self.address_latch == 0:
+            self.tram_addr = (self.tram_addr & 0x00FF) | ((value & 0x3F) << 8)
+            self.address_latch = 1
+        else:
+            self.tram_addr = (self.tram_addr & 0xFF00) | value
+            self.vram_addr = self.tram_addr
+            self.address_latch = 0
+
+    def _write_data(self, value: int) -> None:
+        self.ppu_write(self.vram_addr, value)
+        increment = 32 if (self.ctrl & 0x04) else 1
+        self.vram_addr = (self.vram_addr + increment) & 0x7FFF
 
     def dma_write(self, start_addr: int, values: bytes) -> None:
+        if len(values) == 256:
+            self.oam_dma(values)
+            return
+        self._sync_sprite_evaluation()
         for index, value in enumerate(values):
             self.oam[(self.oam_addr + index) & 0xFF] = value
 
+    def oam_dma(self, page) -> None:
+        self._sync_sprite_evaluation()
+        # A DMA page is exactly 256 bytes, so it covers OAM once, wrapping at oam_addr.
+        split = 256 - self.oam_addr
+        self.oam[self.oam_addr :] = page[:split]
+        self.oam[: self.oam_addr] = page[split:]
+
     def _begin_sprite_evaluation(self) -> None:
-        self.eval_sprite_scanline = [[0, 0, 0, 0] for _ in range(8)]
+        self.eval_sprite_scanline[:] = _NO_SPRITES
         self.eval_sprite_count = 0
         self.eval_sprite_zero_possible = False
         self.eval_oam_n = 0
@@ -382,8 +451,41 @@ class PPU:
         self.eval_read_byte = 0
         self.eval_overflow_mode = False
         self.eval_done = False
+        self._eval_deferred = True
+
+    def _sync_sprite_evaluation(self) -> None:
+        # Called before a register access that could change or observe the evaluation: the dots
+        # already passed are stepped with the state they saw, then stepping goes on per dot.
+        if self._eval_deferred:
+            self._eval_deferred = False
+            if self.rendering_enabled:
+                for cycle in range(65, min(self.cycle, 257)):
+                    self._clock_sprite_evaluation(cycle)
+
+    def _finish_sprite_evaluation(self) -> None:
+        # Nothing touched OAM, ctrl or mask since dot 65, so with rendering on the whole window was
+        # stepped against the same state. Fewer than 8 hits never reach the overflow search, and the
+        # result is just the first hits in OAM order; otherwise the dots are stepped as usual.
+        self._eval_deferred = False
+        if not self.rendering_enabled:
+            return
+        oam = self.oam
+        scanline = self.scanline
+        sprite_height = 16 if (self.ctrl & 0x20) else 8
+        hits = [n << 2 for n, y in enumerate(self._oam_y) if 0 <= scanline - y < sprite_height]
+        if len(hits) >= 8:
+            for cycle in range(65, 257):
+                self._clock_sprite_evaluation(cycle)
+            return
+        for slot, n in enumerate(hits):
+            self.eval_sprite_scanline[slot * 4 : slot * 4 + 4] = oam[n : n + 4]
+        self.eval_sprite_count = len(hits)
+        self.eval_sprite_zero_possible = bool(hits) and hits[0] == 0
+        self.eval_oam_n = 64
+        self.eval_read_byte = oam[255] if hits and hits[-1] == 252 else oam[252]
+        self.eval_done = True
 
-    def _clock_sprite_evaluation(self) -> None:
+    def _clock_sprite_evaluation(self, cycle: int) -> None:
         if self.eval_done:
             return
         if self.eval_oam_n >= 64:
@@ -391,7 +493,7 @@ class PPU:
             return
 
         # Odd cycle: read primary OAM byte.
-        if self.cycle & 1:
+        if cycle & 1:
             addr = (self.eval_oam_n * 4 + self.eval_oam_m) & 0xFF
             self.eval_read_byte = self.oam[addr]
             return
@@ -404,7 +506,7 @@ class PPU:
                 if 0 <= diff < sprite_height:
                     if self.eval_sprite_count < 8:
                         slot = self.eval_sprite_count
-                        self.eval_sprite_scanline[slot][0] = self.eval_read_byte
+                        self.eval_sprite_scanline[slot * 4] = self.eval_read_byte
                         if self.eval_oam_n == 0:
                             self.eval_sprite_zero_possible = True
                         self.eval_oam_m = 1
@@ -416,7 +518,7 @@ class PPU:
                         self.eval_done = True
             else:
                 slot = self.eval_sprite_count
-                self.eval_sprite_scanline[slot][self.eval_oam_m] = self.eval_read_byte
+                self.eval_sprite_scanline[slot * 4 + self.eval_oam_m] = self.eval_read_byte
                 self.eval_oam_m += 1
                 if self.eval_oam_m == 4:
                     self.eval_oam_m = 0
@@ -444,38 +546,60 @@ class PPU:
         self.nmi = False
         return True
 
-    def clock(self) -> None:
-        if self.nmi_delay > 0:
-            nmi_line = self.nmi_output and self.nmi_occurred
-            if self.nmi_hold > 0:
-                if nmi_line:
-                    self.nmi_hold -= 1
-                else:
-                    self.nmi_delay = 0
-                    self.nmi_hold = 0
-            if self.nmi_delay == 0:
-                self.nmi = False
+    def clock_cpu_cycles(self, cpu_cycles: int) -> bool:
+        if 0 < cpu_cycles <= _MAX_UNROLLED_CPU_CYCLES:
+            _UNROLLED_CLOCKS[cpu_cycles](self.clock)
+        else:
+            clock = self.clock
+            for _ in range(cpu_cycles * 3):
+                clock()
+        if not self.nmi_raised:
+            return False
+        self.nmi_raised = False
+        self.nmi = False
+        return True
+
+    def _tick_nmi(self) -> None:
+        # Counts down a pending NMI; clock only calls this while nmi_delay is non-zero.
+        nmi_line = self.nmi_output and self.nmi_occurred
+        if self.nmi_hold > 0:
+            if nmi_line:
+                self.nmi_hold -= 1
             else:
-                self.nmi_delay -= 1
-                if self.nmi_delay == 0:
-                    self.nmi = True
-
-        if self.scanline == -1 and self.cycle == 1:
-            self._set_vblank(False)
-            self.status &= ~0x40
-            self.status &= ~0x20
-            self.suppress_nmi = False
-            self.odd_skip_latch = False
-
-        if -1 <= self.scanline < 240:
-            if self.scanline >= 0 and self.cycle == 65:
+                self.nmi_delay = 0
+                self.nmi_hold = 0
+        if self.nmi_delay == 0:
+            self.nmi = False
+        else:
+            self.nmi_delay -= 1
+            if self.nmi_delay == 0:
+                self.nmi = True
+                self.nmi_raised = True
+
+    def clock(self) -> None:
+        # Neither changes until the dot advances at the end, so both are read once.
+        cycle = self.cycle
+        scanline = self.scanline
+        if self.nmi_delay:
+            self._tick_nmi()
+
+        # Post-render and vblank lines only latch vblank; everything else happens on lines -1 to 239.
+        if scanline < 240:
+            if scanline == -1 and cycle == 1:
+                self._set_vblank(False)
+                self.status &= ~0x40
+                self.status &= ~0x20
+                self.suppress_nmi = False
+                self.odd_skip_latch = False
+
+            if scanline >= 0 and cycle == 65:
                 self._begin_sprite_evaluation()
-            if self.scanline >= 0 and 65 <= self.cycle <= 256 and self.rendering_enabled:
-                self._clock_sprite_evaluation()
+            if scanline >= 0 and 65 <= cycle <= 256 and self.rendering_enabled and not self._eval_deferred:
+                self._clock_sprite_evaluation(cycle)
 
-            if (2 <= self.cycle < 258) or (321 <= self.cycle < 338):
+            phase = _DOT_FETCH_PHASE[cycle]
+            if phase < 8:
                 self._update_shifters()
-                phase = (self.cycle - 1) % 8
                 if phase == 0:
                     self._load_background_shifters()
                     self.bg_next_tile_id = self.ppu_read(0x2000 | (self.vram_addr & 0x0FFF))
@@ -490,69 +614,153 @@ class PPU:
                         attr >>= 2
                     self.bg_next_tile_attr = attr & 0x03
                 elif phase == 4:
-                    table = 0x1000 if (self.ctrl & 0x10) else 0x0000
-                    fine_y = (self.vram_addr >> 12) & 0x07
-                    self.bg_next_tile_lsb = self.ppu_read(table + self.bg_next_tile_id * 16 + fine_y)
+                    # Pattern fetches stay below $2000, so they are served from the tile cache.
+                    tile = (0x100 if (self.ctrl & 0x10) else 0x000) | self.bg_next_tile_id
+                    pattern = self._tile_cache[tile]
+                    if pattern is None:
+                        pattern = self._tile_cache[tile] = self._mapper_read_tile(tile << 4)
+                    self.bg_next_tile_lsb = pattern[(self.vram_addr >> 12) & 0x07]
                 elif phase == 6:
-                    table = 0x1000 if (self.ctrl & 0x10) else 0x0000
-                    fine_y = (self.vram_addr >> 12) & 0x07
-                    self.bg_next_tile_msb = self.ppu_read(table + self.bg_next_tile_id * 16 + fine_y + 8)
-                elif phase == 7:
-                    self._increment_scroll_x()
+                    tile = (0x100 if (self.ctrl & 0x10) else 0x000) | self.bg_next_tile_id
+                    pattern = self._tile_cache[tile]
+                    if pattern is None:
+                        pattern = self._tile_cache[tile] = self._mapper_read_tile(tile << 4)
+                    self.bg_next_tile_msb = pattern[((self.vram_addr >> 12) & 0x07) + 8]
+                elif phase == 7 and self.rendering_enabled:
+                    # Coarse X increment, wrapping into the horizontally adjacent nametable.
+                    if (self.vram_addr & 0x001F) == 31:
+                        self.vram_addr = (self.vram_addr & ~0x001F) ^ 0x0400
+                    else:
+                        self.vram_addr = (self.vram_addr + 1) & 0x7FFF
+            elif phase == _DOT_EXTRA_NAMETABLE_FETCH:
+                self.bg_next_tile_id = self.ppu_read(0x2000 | (self.vram_addr & 0x0FFF))
 
-            if self.cycle == 256:
+            if cycle == 256:
                 self._increment_scroll_y()
-            if self.cycle == 257:
+            if cycle == 257:
                 self._load_background_shifters()
-                self._transfer_address_x()
-
-            if self.cycle in (338, 340):
-                self.bg_next_tile_id = self.ppu_read(0x2000 | (self.vram_addr & 0x0FFF))
+                if self.rendering_enabled:
+                    self.vram_addr = (self.vram_addr & ~0x041F) | (self.tram_addr & 0x041F)
 
-            if self.scanline == -1 and 280 <= self.cycle < 305:
-                self._transfer_address_y()
+            if scanline == -1 and 280 <= cycle < 305 and self.rendering_enabled:
+                self.vram_addr = (self.vram_addr & ~0x7BE0) | (self.tram_addr & 0x7BE0)
 
-            if self.cycle == 257 and self.scanline >= 0:
-                self.sprite_scanline = [[0, 0, 0, 0] for _ in range(8)]
+            if cycle == 257 and scanline >= 0:
+                if self._eval_deferred:
+                    self._finish_sprite_evaluation()
+                self.sprite_scanline[:] = _NO_SPRITES
                 self.sprite_count = 0
                 self.sprite_zero_hit_possible = False
                 if self.rendering_enabled:
                     self.sprite_count = self.eval_sprite_count
                     self.sprite_zero_hit_possible = self.eval_sprite_zero_possible
-                    for i in range(self.sprite_count):
-                        self.sprite_scanline[i][0] = self.eval_sprite_scanline[i][0]
-                        self.sprite_scanline[i][1] = self.eval_sprite_scanline[i][1]
-                        self.sprite_scanline[i][2] = self.eval_sprite_scanline[i][2]
-                        self.sprite_scanline[i][3] = self.eval_sprite_scanline[i][3]
+                    size = self.sprite_count * 4
+                    self.sprite_scanline[:size] = self.eval_sprite_scanline[:size]
 
-            if self.cycle == 340:
+            if cycle == 340:
                 sprite_height = 16 if (self.ctrl & 0x20) else 8
+                tile_cache = self._tile_cache
                 for i in range(self.sprite_count):
-                    y = self.sprite_scanline[i][0]
-                    tile = self.sprite_scanline[i][1]
-                    attr = self.sprite_scanline[i][2]
-                    row = self.scanline - y
+                    y = self.sprite_scanline[i * 4]
+                    tile = self.sprite_scanline[i * 4 + 1]
+                    attr = self.sprite_scanline[i * 4 + 2]
+                    row = scanline - y
                     if attr & 0x80:
                         row = sprite_height - 1 - row
                     if sprite_height == 8:
                         table = 0x1000 if (self.ctrl & 0x08) else 0x0000
-                        addr = table + tile * 16 + row
                     else:
                         table = (tile & 0x01) * 0x1000
                         tile &= 0xFE
                         if row > 7:
                             tile += 1
                             row -= 8
+                    if 0 <= row < 8:
+                        # Both planes of the row come from one tile fetch.
+                        index = (table >> 4) | tile
+                        pattern = tile_cache[index]
+                        if pattern is None:
+                            pattern = tile_cache[index] = self._mapper_read_tile(index << 4)
+                        lo = pattern[row]
+                        hi = pattern[row + 8]
+                    else:
+                        # Sprites left over from line 239 are refetched on the pre-render line with an out-of-tile row.
                         addr = table + tile * 16 + row
-                    lo = self.ppu_read(addr)
-                    hi = self.ppu_read(addr + 8)
+                        lo = self.ppu_read(addr)
+                        hi = self.ppu_read(addr + 8)
                     if attr & 0x40:
-                        lo = _reverse_bits(lo)
-                        hi = _reverse_bits(hi)
-                    self.sprite_shifter_pattern_lo[i] = lo
-                    self.sprite_shifter_pattern_hi[i] = hi
-
-        if self.scanline == 241 and self.cycle == 1:
+                        lo = _BITREV[lo]
+                        hi = _BITREV[hi]
+                    self.sprite_shifter_pattern[i] = _SPREAD_BITS[lo] | (_SPREAD_BITS[hi] << 1)
+
+            if scanline >= 0 and 1 <= cycle <= 256:
+                mask = self.mask
+                bg_pixel = 0
+                bg_palette = 0
+                if mask & 0x08:
+                    if (mask & 0x02) or (cycle > 8):
+                        # The pixel's bit sits at the same position in all four planes.
+                        shift = 15 - self.fine_x
+                        pattern = self.bg_shifter_pattern >> shift
+                        bg_pixel = ((pattern >> 15) & 0x02) | (pattern & 0x01)
+                        attr = self.bg_shifter_attr >> shift
+                        bg_palette = ((attr >> 15) & 0x02) | (attr & 0x01)
+
+                fg_pixel = 0
+                fg_palette = 0
+                fg_priority = False
+                self.sprite_zero_being_rendered = False
+                # Most lines carry no sprites, so the compositing loop is skipped outright.
+                sprite_count = self.sprite_count
+                if sprite_count and mask & 0x10:
+                    if (mask & 0x04) or (cycle > 8):
+                        sprite_scanline = self.sprite_scanline
+                        for i in range(sprite_count):
+                            if sprite_scanline[i * 4 + 3] == 0:
+                                fg_pixel = self.sprite_shifter_pattern[i] >> 14
+                                attr = sprite_scanline[i * 4 + 2]
+                                fg_palette = (attr & 0x03) + 0x04
+                                fg_priority = (attr & 0x20) == 0
+                                if fg_pixel != 0:
+                                    if i == 0:
+                                        self.sprite_zero_being_rendered = True
+                                    break
+
+                # Opaque pixels never land on a mirrored backdrop entry, so no mirror lookup is needed.
+                if fg_pixel and (fg_priority or not bg_pixel):
+                    palette_addr = (fg_palette << 2) | fg_pixel
+                elif bg_pixel:
+                    palette_addr = (bg_palette << 2) | bg_pixel
+                else:
+                    palette_addr = 0
+                if fg_pixel and bg_pixel and self.sprite_zero_hit_possible and self.sprite_zero_being_rendered:
+                    clipped_left = cycle <= 8 and (((mask & 0x02) == 0) or ((mask & 0x04) == 0))
+                    if not clipped_left:
+                        self.status |= 0x40
+
+                if self.render:
+                    x = cycle - 1
+                    line_colors = self._line_colors
+                    line_colors[x] = self.palette_ram[palette_addr] & 0x3F
+                    if x == 255:
+                        index = scanline * 768
+                        line = b"".join(map(_PALETTE_RGB_BYTES.__getitem__, line_colors))
+                        if self.frame_rgb[index : index + 768] != line:
+                            self.frame_rgb[index : index + 768] = line
+                            self.frame_dirty = True
+
+            if self.rendering_enabled and cycle == 260 and scanline >= 0:
+                self._mapper_clock_scanline()
+
+            if scanline == -1 and cycle == 338:
+                self.odd_skip_latch = self.rendering_enabled
+
+            # On odd frames with rendering enabled, pre-render dot 340 is skipped.
+            if scanline == -1 and cycle == 339 and self.odd_frame and self.odd_skip_latch:
+                self.cycle = 0
+                self.scanline = 0
+                return
+        elif scanline == 241 and cycle == 1:
             if self.suppress_vblank:
                 self._set_vblank(False)
             else:
@@ -563,90 +771,13 @@ class PPU:
                 self.nmi = False
             self.suppress_vblank = False
 
-        if 0 <= self.scanline < 240 and 1 <= self.cycle <= 256:
-            bg_pixel = 0
-            bg_palette = 0
-            if self.mask & 0x08:
-                if (self.mask & 0x02) or (self.cycle > 8):
-                    bit_mux = 0x8000 >> self.fine_x
-                    p0 = 1 if (self.bg_shifter_pattern_lo & bit_mux) else 0
-                    p1 = 1 if (self.bg_shifter_pattern_hi & bit_mux) else 0
-                    bg_pixel = (p1 << 1) | p0
-                    a0 = 1 if (self.bg_shifter_attr_lo & bit_mux) else 0
-                    a1 = 1 if (self.bg_shifter_attr_hi & bit_mux) else 0
-                    bg_palette = (a1 << 1) | a0
-
-            fg_pixel = 0
-            fg_palette = 0
-            fg_priority = False
-            self.sprite_zero_being_rendered = False
-            if self.mask & 0x10:
-                if (self.mask & 0x04) or (self.cycle > 8):
-                    for i in range(self.sprite_count):
-                        if self.sprite_scanline[i][3] == 0:
-                            p0 = (self.sprite_shifter_pattern_lo[i] & 0x80) >> 7
-                            p1 = (self.sprite_shifter_pattern_hi[i] & 0x80) >> 6
-                            fg_pixel = p0 | p1
-                            fg_palette = (self.sprite_scanline[i][2] & 0x03) + 0x04
-                            fg_priority = (self.sprite_scanline[i][2] & 0x20) == 0
-                            if fg_pixel != 0:
-                                if i == 0:
-                                    self.sprite_zero_being_rendered = True
-                                break
-
-            pixel = 0
-            palette = 0
-            if bg_pixel == 0 and fg_pixel == 0:
-                pixel = 0
-                palette = 0
-            elif bg_pixel == 0 and fg_pixel > 0:
-                pixel = fg_pixel
-                palette = fg_palette
-            elif bg_pixel > 0 and fg_pixel == 0:
-                pixel = bg_pixel
-                palette = bg_palette
-            else:
-                if fg_priority:
-                    pixel = fg_pixel
-                    palette = fg_palette
-                else:
-                    pixel = bg_pixel
-                    palette = bg_palette
-                if self.sprite_zero_hit_possible and self.sprite_zero_being_rendered:
-                    if self.mask & 0x18:
-                        clipped_left = self.cycle <= 8 and (((self.mask & 0x02) == 0) or ((self.mask & 0x04) == 0))
-                        if not clipped_left:
-                            self.status |= 0x40
-
-            x = self.cycle - 1
-            y = self.scanline
-            palette_addr = ((palette & 0x07) << 2) | (pixel & 0x03)
-            if (palette_addr & 0x13) == 0x10:
-                palette_addr &= 0x0F
-            color_idx = self.palette_ram[palette_addr] & 0x3F
-            red, green, blue = NES_RGB_PALETTE[color_idx]
-            index = (y * 256 + x) * 3
-            self.frame_rgb[index + 0] = red
-            self.frame_rgb[index + 1] = green
-            self.frame_rgb[index + 2] = blue
-
-        if self.rendering_enabled and self.cycle == 260 and 0 <= self.scanline < 240:
-            self.cartridge.mapper.clock_scanline()
-
-        if self.scanline == -1 and self.cycle == 338:
-            self.odd_skip_latch = self.rendering_enabled
-
-        # On odd frames with rendering enabled, pre-render dot 340 is skipped.
-        if self.scanline == -1 and self.cycle == 339 and self.odd_frame and self.odd_skip_latch:
-            self.cycle = 0
-            self.scanline = 0
-            return
-
-        self.cycle += 1
-        if self.cycle >= 341:
-            self.cycle = 0
-            self.scanline += 1
-            if self.scanline >= 261:
-                self.scanline = -1
+        cycle += 1
+        if cycle >= 341:
+            cycle = 0
+            scanline += 1
+            if scanline >= 261:
+                scanline = -1
                 self.frame_complete = True
                 self.odd_frame = not self.odd_frame
+            self.scanline = scanline
+        self.cycle = cycle
@@ -49,29 +49,34 @@ def _iter_candidate_package_dirs() -> list[Path]:
     return dirs
 
 
-def _load_external_cython_ppu() -> Type[PythonPPU] | None:
+def _load_external_extension(module_name: str, attr: str) -> type | None:
     for root in _iter_candidate_package_dirs():
         package_dir = root / "nintendo_sim"
         for suffix in importlib.machinery.EXTENSION_SUFFIXES:
-            candidate = package_dir / f"ppu_cython{suffix}"
+            candidate = package_dir / f"{module_name}{suffix}"
             if not candidate.exists():
                 continue
-            spec = importlib.util.spec_from_file_location("nintendo_sim.ppu_cython", candidate)
+            qualified_name = f"nintendo_sim.{module_name}"
+            spec = importlib.util.spec_from_file_location(qualified_name, candidate)
             if spec is None or spec.loader is None:
                 continue
             module = importlib.util.module_from_spec(spec)
-            sys.modules["nintendo_sim.ppu_cython"] = module
+            sys.modules[qualified_name] = module
             try:
                 spec.loader.exec_module(module)
             except Exception:
-                sys.modules.pop("nintendo_sim.ppu_cython", None)
+                sys.modules.pop(qualified_name, None)
                 continue
-            ppu_cls = getattr(module, "PPU", None)
-            if ppu_cls is not None:
-                return ppu_cls
+            cls = getattr(module, attr, None)
+            if cls is not None:
+                return cls
     return None
 
 
+def _load_external_cython_ppu() -> Type[PythonPPU] | None:
+    return _load_external_extension("ppu_cython", "PPU")
+
+
 def resolve_ppu_class(preferred: str | None) -> tuple[Type[PythonPPU], str]:
     mode = (preferred or os.getenv("NES_PPU_BACKEND", "auto")).strip().lower()
     if mode not in VALID_BACKENDS:
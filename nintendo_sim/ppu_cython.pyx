@@ -1,13 +1,9 @@
-# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False
+# cython: language_level=3, boundscheck=False, wraparound=False, initializedcheck=False, cdivision=True
 from __future__ import annotations
 
-from .mapper import (
-    MIRROR_FOUR_SCREEN,
-    MIRROR_HORIZONTAL,
-    MIRROR_SINGLE0,
-    MIRROR_SINGLE1,
-    MIRROR_VERTICAL,
-)
+from libc.string cimport memcpy, memset
+
+from .mapper import MIRROR_HORIZONTAL, MIRROR_VERTICAL, NAMETABLE_MAPS
 from .palette import NES_RGB_PALETTE
 
 
@@ -18,6 +14,27 @@ cdef inline int _reverse_bits(int byte):
     return byte & 0xFF
 
 
+# Bit-reversed bytes, for horizontally flipped sprite rows.
+cdef unsigned char _BITREV[256]
+for _byte in range(256):
+    _BITREV[_byte] = _reverse_bits(_byte)
+
+
+# Palette RAM index for each of the 32 palette addresses; $3F10/$3F14/$3F18/$3F1C are mirrors.
+cdef unsigned char _PALETTE_MIRROR[32]
+for _addr in range(32):
+    _PALETTE_MIRROR[_addr] = _addr - 0x10 if _addr in (0x10, 0x14, 0x18, 0x1C) else _addr
+
+
+# NES_RGB_PALETTE as a C table, padded to 4 bytes so each pixel can be written with one 32-bit store.
+cdef unsigned char _PALETTE_RGB[64][4]
+for _color, _rgb in enumerate(NES_RGB_PALETTE):
+    _PALETTE_RGB[_color][0] = _rgb[0]
+    _PALETTE_RGB[_color][1] = _rgb[1]
+    _PALETTE_RGB[_color][2] = _rgb[2]
+    _PALETTE_RGB[_color][3] = 0xFF
+
+
 POWER_UP_PALETTE = (
     0x09,
     0x01,
@@ -67,6 +84,9 @@ cdef class PPU:
     cdef public bint rendering_enabled
     cdef public bint dynamic_mirroring
     cdef public object cached_mirroring
+    cdef public bytes static_nt_map
+    # Mirroring map in effect; only a mapper register write can change it.
+    cdef bytes _nt_map
 
     cdef public int vram_addr
     cdef public int tram_addr
@@ -78,7 +98,11 @@ cdef class PPU:
     cdef public int cycle
     cdef public bint odd_frame
     cdef public bint frame_complete
+    cdef public bint frame_dirty
+    # When false, pixels are still composited (sprite 0 hits) but never written to frame_rgb.
+    cdef public bint render
     cdef public bint nmi
+    cdef public bint nmi_raised
     cdef public bint nmi_occurred
     cdef public bint nmi_output
     cdef public bint nmi_previous
@@ -114,7 +138,22 @@ cdef class PPU:
     cdef bint eval_overflow_mode
     cdef bint eval_done
 
-    cdef public bytearray frame_rgb
+    cdef readonly bytearray frame_rgb
+    # Colour index of every pixel, expanded into frame_rgb once the last visible line is drawn.
+    cdef unsigned char _frame_indices[256 * 240]
+    cdef bint _frame_indices_changed
+
+    # Pattern-table bytes as last read from the mapper. A byte is current while its tag matches
+    # _chr_generation, which advances whenever the mapper may have switched CHR banks.
+    cdef unsigned char _chr[0x2000]
+    cdef unsigned int _chr_tag[0x2000]
+    cdef unsigned int _chr_generation
+    cdef bint _chr_writable
+    cdef bint _chr_aliasing
+    # Bound mapper methods for CHR cache misses, CHR RAM writes and the scanline counter.
+    cdef object _mapper_read
+    cdef object _mapper_write
+    cdef object _mapper_clock_scanline
 
     def __init__(self, cartridge):
         self.cartridge = cartridge
@@ -123,6 +162,15 @@ cdef class PPU:
         self.oam = bytearray(256)
         self.cached_mirroring = MIRROR_HORIZONTAL
         self.frame_rgb = bytearray(256 * 240 * 3)
+        self.frame_dirty = True
+        self.render = True
+        self._frame_indices_changed = True
+        self._chr_generation = 1
+        self._chr_writable = cartridge.has_chr_ram
+        self._chr_aliasing = type(cartridge.mapper).chr_aliasing
+        self._mapper_read = cartridge.mapper.ppu_read
+        self._mapper_write = cartridge.mapper.ppu_write
+        self._mapper_clock_scanline = cartridge.mapper.clock_scanline
         self.reset()
 
     cdef inline void _clear_sprite_scanline(self):
@@ -160,8 +208,35 @@ cdef class PPU:
         self.nmi_occurred = active
         self._nmi_change()
 
+    cdef void _pack_frame(self):
+        cdef int i
+        cdef const unsigned char* rgb
+        cdef unsigned char* frame = self.frame_rgb
+        # The padding byte of each store is overwritten by the next pixel; the last one is written bytewise.
+        for i in range(256 * 240 - 1):
+            memcpy(frame + i * 3, _PALETTE_RGB[self._frame_indices[i]], 4)
+        i = 256 * 240 - 1
+        rgb = _PALETTE_RGB[self._frame_indices[i]]
+        frame[i * 3] = rgb[0]
+        frame[i * 3 + 1] = rgb[1]
+        frame[i * 3 + 2] = rgb[2]
+        self._frame_indices_changed = False
+        self.frame_dirty = True
+
+    cdef inline void _invalidate_chr(self):
+        self._chr_generation += 1
+        if self._chr_generation == 0:
+            memset(self._chr_tag, 0, sizeof(self._chr_tag))
+            self._chr_generation = 1
+
+    cpdef void notify_mapper_write(self):
+        self._invalidate_chr()
+        if self.dynamic_mirroring:
+            self._nt_map = self.cartridge.mapper.nt_map
+
     cpdef void reset(self):
         cdef int i
+        self.notify_mapper_write()
         mapper_mirroring = self.cartridge.mapper.mirroring()
         self.ctrl = 0
         self.mask = 0
@@ -174,6 +249,9 @@ cdef class PPU:
         else:
             self.dynamic_mirroring = True
             self.cached_mirroring = mapper_mirroring
+        # Unknown header values behave as vertical mirroring.
+        self.static_nt_map = NAMETABLE_MAPS.get(self.cached_mirroring, NAMETABLE_MAPS[MIRROR_VERTICAL])
+        self._nt_map = self.cartridge.mapper.nt_map if self.dynamic_mirroring else self.static_nt_map
         self.vram_addr = 0
         self.tram_addr = 0
         self.fine_x = 0
@@ -184,6 +262,7 @@ cdef class PPU:
         self.odd_frame = False
         self.frame_complete = False
         self.nmi = False
+        self.nmi_raised = False
         self.nmi_occurred = False
         self.nmi_output = False
         self.nmi_previous = False
@@ -279,35 +358,10 @@ cdef class PPU:
                     self.sprite_shifter_pattern_lo[i] = (self.sprite_shifter_pattern_lo[i] << 1) & 0xFF
                     self.sprite_shifter_pattern_hi[i] = (self.sprite_shifter_pattern_hi[i] << 1) & 0xFF
 
-    cdef inline object _resolve_mirroring(self):
-        mapper_mirroring = None
-        if not self.dynamic_mirroring:
-            return self.cached_mirroring
-        mapper_mirroring = self.cartridge.mapper.mirroring()
-        if mapper_mirroring is not None:
-            self.cached_mirroring = mapper_mirroring
-        return self.cached_mirroring
-
     cdef inline void _map_nametable_addr(self, int addr, int* table, int* index):
-        cdef int t
-        cdef object mirroring
-        addr &= 0x0FFF
-        t = (addr >> 10) & 0x03
+        cdef const unsigned char* nt_map = self._nt_map
+        table[0] = nt_map[(addr >> 10) & 0x03]
         index[0] = addr & 0x03FF
-        mirroring = self._resolve_mirroring()
-        if mirroring == MIRROR_FOUR_SCREEN:
-            pass
-        elif mirroring == MIRROR_VERTICAL:
-            t &= 0x01
-        elif mirroring == MIRROR_HORIZONTAL:
-            t = 0 if t in (0, 1) else 1
-        elif mirroring == MIRROR_SINGLE0:
-            t = 0
-        elif mirroring == MIRROR_SINGLE1:
-            t = 1
-        else:
-            t &= 0x01
-        table[0] = t
 
     cpdef int ppu_read(self, int addr):
         cdef int table
@@ -315,13 +369,14 @@ cdef class PPU:
         cdef int palette_addr
         addr &= 0x3FFF
         if addr <= 0x1FFF:
-            return self.cartridge.mapper.ppu_read(addr)
+            if self._chr_tag[addr] != self._chr_generation:
+                self._chr[addr] = self._mapper_read(addr)
+                self._chr_tag[addr] = self._chr_generation
+            return self._chr[addr]
         if addr <= 0x3EFF:
             self._map_nametable_addr(addr - 0x2000, &table, &index)
             return self.nametable[table][index]
-        palette_addr = addr & 0x001F
-        if palette_addr in (0x10, 0x14, 0x18, 0x1C):
-            palette_addr -= 0x10
+        palette_addr = _PALETTE_MIRROR[addr & 0x001F]
         return self.palette_ram[palette_addr] & 0x3F
 
     cpdef void ppu_write(self, int addr, int value):
@@ -331,15 +386,21 @@ cdef class PPU:
         addr &= 0x3FFF
         value &= 0xFF
         if addr <= 0x1FFF:
-            self.cartridge.mapper.ppu_write(addr, value)
+            # CHR ROM ignores the write, which also leaves the cached byte valid.
+            if self._chr_writable:
+                self._mapper_write(addr, value)
+                if self._chr_aliasing:
+                    # The byte may also be visible through another CHR window, so every cached byte is dropped.
+                    self._invalidate_chr()
+                else:
+                    # Generations start at 1, so a zero tag always forces a re-read.
+                    self._chr_tag[addr] = 0
             return
         if addr <= 0x3EFF:
             self._map_nametable_addr(addr - 0x2000, &table, &index)
             self.nametable[table][index] = value
             return
-        palette_addr = addr & 0x001F
-        if palette_addr in (0x10, 0x14, 0x18, 0x1C):
-            palette_addr -= 0x10
+        palette_addr = _PALETTE_MIRROR[addr & 0x001F]
         self.palette_ram[palette_addr] = value & 0x3F
 
     cpdef int cpu_read(self, int addr):
@@ -420,9 +481,18 @@ cdef class PPU:
         cdef int index
         cdef int length
         length = len(values)
+        if length == 256:
+            self.oam_dma(values)
+            return
         for index in range(length):
             self.oam[(self.oam_addr + index) & 0xFF] = values[index]
 
+    cpdef void oam_dma(self, object page):
+        # A DMA page is exactly 256 bytes, so it covers OAM once, wrapping at oam_addr.
+        cdef int split = 256 - self.oam_addr
+        self.oam[self.oam_addr :] = page[:split]
+        self.oam[: self.oam_addr] = page[split:]
+
     cdef inline void _begin_sprite_evaluation(self):
         self._clear_eval_sprite_scanline()
         self.eval_sprite_count = 0
@@ -496,6 +566,16 @@ cdef class PPU:
         self.nmi = False
         return True
 
+    cpdef bint clock_cpu_cycles(self, int cpu_cycles):
+        cdef int dot
+        for dot in range(cpu_cycles * 3):
+            self.clock()
+        if not self.nmi_raised:
+            return False
+        self.nmi_raised = False
+        self.nmi = False
+        return True
+
     cpdef void clock(self):
         cdef int phase
         cdef int addr
@@ -514,7 +594,7 @@ cdef class PPU:
         cdef int fg_pixel
         cdef int fg_palette
         cdef bint fg_priority
-        cdef int bit_mux
+        cdef int shift
         cdef int p0
         cdef int p1
         cdef int a0
@@ -524,9 +604,6 @@ cdef class PPU:
         cdef int x
         cdef int palette_addr
         cdef int color_idx
-        cdef int red
-        cdef int green
-        cdef int blue
         cdef int index
         cdef bint nmi_line
         cdef bint clipped_left
@@ -545,6 +622,7 @@ cdef class PPU:
                 self.nmi_delay -= 1
                 if self.nmi_delay == 0:
                     self.nmi = True
+                    self.nmi_raised = True
 
         if self.scanline == -1 and self.cycle == 1:
             self._set_vblank(False)
@@ -633,8 +711,8 @@ cdef class PPU:
                     lo = self.ppu_read(addr)
                     hi = self.ppu_read(addr + 8)
                     if attr & 0x40:
-                        lo = _reverse_bits(lo)
-                        hi = _reverse_bits(hi)
+                        lo = _BITREV[lo]
+                        hi = _BITREV[hi]
                     self.sprite_shifter_pattern_lo[i] = lo
                     self.sprite_shifter_pattern_hi[i] = hi
 
@@ -654,12 +732,13 @@ cdef class PPU:
             bg_palette = 0
             if self.mask & 0x08:
                 if (self.mask & 0x02) or (self.cycle > 8):
-                    bit_mux = 0x8000 >> self.fine_x
-                    p0 = 1 if (self.bg_shifter_pattern_lo & bit_mux) else 0
-                    p1 = 1 if (self.bg_shifter_pattern_hi & bit_mux) else 0
+                    # The pixel's bit sits at the same position in all four shifters.
+                    shift = 15 - self.fine_x
+                    p0 = (self.bg_shifter_pattern_lo >> shift) & 1
+                    p1 = (self.bg_shifter_pattern_hi >> shift) & 1
                     bg_pixel = (p1 << 1) | p0
-                    a0 = 1 if (self.bg_shifter_attr_lo & bit_mux) else 0
-                    a1 = 1 if (self.bg_shifter_attr_hi & bit_mux) else 0
+                    a0 = (self.bg_shifter_attr_lo >> shift) & 1
+                    a1 = (self.bg_shifter_attr_hi >> shift) & 1
                     bg_palette = (a1 << 1) | a0
 
             fg_pixel = 0
@@ -702,20 +781,18 @@ cdef class PPU:
                         if not clipped_left:
                             self.status |= 0x40
 
-            x = self.cycle - 1
-            y = self.scanline
-            palette_addr = ((palette & 0x07) << 2) | (pixel & 0x03)
-            if (palette_addr & 0x13) == 0x10:
-                palette_addr &= 0x0F
-            color_idx = self.palette_ram[palette_addr] & 0x3F
-            red, green, blue = NES_RGB_PALETTE[color_idx]
-            index = (y * 256 + x) * 3
-            self.frame_rgb[index + 0] = red
-            self.frame_rgb[index + 1] = green
-            self.frame_rgb[index + 2] = blue
+            if self.render:
+                x = self.cycle - 1
+                y = self.scanline
+                palette_addr = _PALETTE_MIRROR[((palette & 0x07) << 2) | (pixel & 0x03)]
+                color_idx = self.palette_ram[palette_addr] & 0x3F
+                index = y * 256 + x
+                if self._frame_indices[index] != color_idx:
+                    self._frame_indices[index] = color_idx
+                    self._frame_indices_changed = True
 
         if self.rendering_enabled and self.cycle == 260 and 0 <= self.scanline < 240:
-            self.cartridge.mapper.clock_scanline()
+            self._mapper_clock_scanline()
 
         if self.scanline == -1 and self.cycle == 338:
             self.odd_skip_latch = self.rendering_enabled
@@ -729,6 +806,8 @@ cdef class PPU:
         if self.cycle >= 341:
             self.cycle = 0
             self.scanline += 1
+            if self.scanline == 240 and self._frame_indices_changed and self.render:
+                self._pack_frame()
             if self.scanline >= 261:
                 self.scanline = -1
                 self.frame_complete = True
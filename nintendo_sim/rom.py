@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import os
+import struct
 from dataclasses import dataclass
 from pathlib import Path
 
@@ -14,6 +16,9 @@ from .mapper import (
     Mapper4,
 )
 
+# Signature, PRG ROM banks, CHR ROM banks, flags 6, flags 7 and PRG RAM banks.
+_INES_HEADER = struct.Struct("<4sBBBBB")
+
 
 @dataclass
 class Cartridge:
@@ -28,65 +33,82 @@ class Cartridge:
     mapper: Mapper
 
 
+_MAPPER_TABLE: dict[int, type[Mapper]] = {0: Mapper0, 1: Mapper1, 2: Mapper2, 4: Mapper4}
+
+
+def register_mapper(mapper_id: int, mapper_class: type[Mapper]) -> None:
+    """Make load_ines build mapper_class for ROMs with the given iNES mapper number.
+
+    The CPU and PPU cache what the mapper maps in, so a mapper class has to tell them when it changes:
+
+    - Bank and mirroring switches happen only on CPU writes at or above register_start ($8000 by
+      default), which must not be below cpu_map_start; lower it for registers that sit under $8000.
+    - A mapper that switches mirroring keeps nt_map equal to NAMETABLE_MAPS[mirroring()].
+    - chr_aliasing is False only if one physical CHR byte never appears at two PPU addresses.
+    - prg_offset, if overridden, returns the prg_rom index the CPU reads at a $8000+ address.
+    - Interrupts are raised by setting irq_flag and cleared by the mapper on acknowledge.
+    """
+    if mapper_class.register_start < mapper_class.cpu_map_start:
+        raise ValueError(
+            f"Mapper {mapper_id}: register_start {mapper_class.register_start:#06x} is below "
+            f"cpu_map_start {mapper_class.cpu_map_start:#06x}"
+        )
+    _MAPPER_TABLE[mapper_id] = mapper_class
+
+
 def _build_mapper(mapper_id: int, prg_rom: bytes, chr_data: bytearray, prg_ram: bytearray, has_chr_ram: bool) -> Mapper:
-    if mapper_id == 0:
-        return Mapper0(prg_rom=prg_rom, chr_data=chr_data, prg_ram=prg_ram, has_chr_ram=has_chr_ram)
-    if mapper_id == 1:
-        return Mapper1(prg_rom=prg_rom, chr_data=chr_data, prg_ram=prg_ram, has_chr_ram=has_chr_ram)
-    if mapper_id == 2:
-        return Mapper2(prg_rom=prg_rom, chr_data=chr_data, prg_ram=prg_ram, has_chr_ram=has_chr_ram)
-    if mapper_id == 4:
-        return Mapper4(prg_rom=prg_rom, chr_data=chr_data, prg_ram=prg_ram, has_chr_ram=has_chr_ram)
-    raise ValueError(f"Unsupported mapper: {mapper_id}")
+    mapper_class = _MAPPER_TABLE.get(mapper_id)
+    if mapper_class is None:
+        raise ValueError(f"Unsupported mapper: {mapper_id}")
+    return mapper_class(prg_rom=prg_rom, chr_data=chr_data, prg_ram=prg_ram, has_chr_ram=has_chr_ram)
 
 
 def load_ines(path: str | Path) -> Cartridge:
     rom_path = Path(path)
-    blob = rom_path.read_bytes()
-    if len(blob) < 16:
-        raise ValueError("ROM file too small")
-    if blob[:4] != b"NES\x1A":
-        raise ValueError("Invalid iNES header signature")
-
-    prg_rom_banks = blob[4]
-    chr_rom_banks = blob[5]
-    flag6 = blob[6]
-    flag7 = blob[7]
-    prg_ram_banks = blob[8] if len(blob) > 8 else 0
-
-    mapper_low = flag6 >> 4
-    mapper_high = flag7 & 0xF0
-    mapper_id = mapper_high | mapper_low
-
-    has_trainer = bool(flag6 & 0x04)
-    has_battery = bool(flag6 & 0x02)
-    four_screen = bool(flag6 & 0x08)
-    vertical_mirror = bool(flag6 & 0x01)
-
-    if four_screen:
-        mirroring = MIRROR_FOUR_SCREEN
-    else:
-        mirroring = MIRROR_VERTICAL if vertical_mirror else MIRROR_HORIZONTAL
-
-    offset = 16
-    if has_trainer:
-        if len(blob) < offset + 512:
-            raise ValueError("ROM missing trainer data")
-        offset += 512
-
-    prg_size = prg_rom_banks * 0x4000
-    chr_size = chr_rom_banks * 0x2000
-    if len(blob) < offset + prg_size + chr_size:
-        raise ValueError("ROM is truncated")
-
-    prg_rom = blob[offset : offset + prg_size]
-    offset += prg_size
-    if chr_size:
-        chr_data = bytearray(blob[offset : offset + chr_size])
-        has_chr_ram = False
-    else:
-        chr_data = bytearray(0x2000)
-        has_chr_ram = True
+    # Each ROM section is read straight into the buffer the mapper keeps, without a whole-file copy.
+    with rom_path.open("rb") as rom_file:
+        file_size = os.fstat(rom_file.fileno()).st_size
+        if file_size < 16:
+            raise ValueError("ROM file too small")
+        header = rom_file.read(16)
+        signature, prg_rom_banks, chr_rom_banks, flag6, flag7, prg_ram_banks = _INES_HEADER.unpack_from(header)
+        if signature != b"NES\x1A":
+            raise ValueError("Invalid iNES header signature")
+
+        mapper_low = flag6 >> 4
+        mapper_high = flag7 & 0xF0
+        mapper_id = mapper_high | mapper_low
+
+        has_trainer = bool(flag6 & 0x04)
+        has_battery = bool(flag6 & 0x02)
+        four_screen = bool(flag6 & 0x08)
+        vertical_mirror = bool(flag6 & 0x01)
+
+        if four_screen:
+            mirroring = MIRROR_FOUR_SCREEN
+        else:
+            mirroring = MIRROR_VERTICAL if vertical_mirror else MIRROR_HORIZONTAL
+
+        offset = 16
+        if has_trainer:
+            if file_size < offset + 512:
+                raise ValueError("ROM missing trainer data")
+            offset += 512
+
+        prg_size = prg_rom_banks * 0x4000
+        chr_size = chr_rom_banks * 0x2000
+        if file_size < offset + prg_size + chr_size:
+            raise ValueError("ROM is truncated")
+
+        rom_file.seek(offset)
+        prg_rom = rom_file.read(prg_size)
+        if chr_size:
+            chr_data = bytearray(chr_size)
+            rom_file.readinto(chr_data)
+            has_chr_ram = False
+        else:
+            chr_data = bytearray(0x2000)
+            has_chr_ram = True
 
     ram_size = max(1, prg_ram_banks) * 0x2000
     prg_ram = bytearray(ram_size)
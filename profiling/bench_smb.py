@@ -5,10 +5,11 @@ from nintendo_sim.nes import NES
 
 ROM = Path('rom/Super Mario Bro.nes')
 FRAMES = int(os.environ.get("FRAMES", "240"))
+# RENDER=0 skips writing pixels to the frame buffer, leaving emulation work only.
+RENDER = int(os.environ.get("RENDER", "1"))
 
-nes = NES.from_rom(ROM)
+nes = NES.from_rom(ROM, render=bool(RENDER))
 start = time.time()
-for _ in range(FRAMES):
-    nes.step_frame(copy_frame=False)
+nes.run_frames(FRAMES)
 elapsed = time.time() - start
 print(f"frames={FRAMES} elapsed={elapsed:.3f}s fps={FRAMES/elapsed:.3f}")
@@ -3,6 +3,7 @@ from __future__ import annotations
 
 import argparse
 import sys
+import time
 from pathlib import Path
 
 from nintendo_sim.controller import (
@@ -17,6 +18,8 @@ from nintendo_sim.controller import (
 )
 from nintendo_sim.nes import NES
 
+_FRAME_SECONDS = 1 / 60
+
 
 def _parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(description="Run NES ROMs")
@@ -29,6 +32,12 @@ def _parse_args() -> argparse.Namespace:
         default="auto",
         help="PPU implementation backend",
     )
+    parser.add_argument(
+        "--cpu-backend",
+        choices=("auto", "python", "cython"),
+        default="auto",
+        help="CPU implementation backend",
+    )
     return parser.parse_args()
 
 
@@ -40,6 +49,7 @@ def _headless(nes: NES, frames: int) -> int:
 def _interactive(nes: NES, scale: int) -> int:
     try:
         import pygame
+        from pygame._sdl2.video import Renderer, Texture, Window
     except ImportError as exc:
         print("pygame is required for interactive mode. Install dependencies first.", file=sys.stderr)
         print(f"Import error: {exc}", file=sys.stderr)
@@ -47,13 +57,16 @@ def _interactive(nes: NES, scale: int) -> int:
 
     pygame.init()
     try:
-        window = pygame.display.set_mode((256 * scale, 240 * scale))
-        pygame.display.set_caption("Nintendo Sim")
-        clock = pygame.time.Clock()
-        target_size = window.get_size()
-        frame_buffer = nes.bus.ppu.frame_rgb
-        frame_surface = pygame.image.frombuffer(frame_buffer, (256, 240), "RGB")
-        scaled_surface = pygame.transform.scale(frame_surface, target_size) if scale != 1 else None
+        window = Window("Nintendo Sim", size=(256 * scale, 240 * scale))
+        renderer = Renderer(window)
+        # The frame is uploaded at native size and the renderer scales it to the window on the GPU.
+        texture = Texture(renderer, (256, 240), streaming=True)
+        target_rect = pygame.Rect(0, 0, 256 * scale, 240 * scale)
+        # The surface shares the PPU's buffer, so it always holds the latest finished frame.
+        frame_surface = pygame.image.frombuffer(nes.frame_buffer, (256, 240), "RGB")
+        # Streaming textures are ARGB8888, so each frame is widened into a surface of exactly that format;
+        # Texture.update then copies its pixels straight across instead of converting a temporary surface.
+        upload_surface = pygame.Surface((256, 240), pygame.SRCALPHA, 32)
         running = True
         tap_latch_frames = 2
         key_to_button = {
@@ -91,14 +104,25 @@ def _interactive(nes: NES, scale: int) -> int:
             BUTTON_RIGHT: 0,
         }
 
+        button_entries = tuple((button, tuple(key_list)) for button, key_list in button_to_keys.items())
+        # Last state handed to the controller, so unchanged buttons are not written again.
+        button_state = dict.fromkeys(pulse_frames, False)
+
         def apply_keyboard_state() -> None:
             keys = pygame.key.get_pressed()
-            for button, key_list in button_to_keys.items():
-                realtime_pressed = any(keys[k] or manual_key_state.get(k, False) for k in key_list)
-                pressed = realtime_pressed or (pulse_frames[button] > 0)
-                nes.set_button(button, pressed)
-                if pulse_frames[button] > 0:
+            manual_pressed = manual_key_state.get
+            for button, key_list in button_entries:
+                pressed = pulse_frames[button] > 0
+                if pressed:
                     pulse_frames[button] -= 1
+                else:
+                    for key in key_list:
+                        if keys[key] or manual_pressed(key, False):
+                            pressed = True
+                            break
+                if pressed != button_state[button]:
+                    button_state[button] = pressed
+                    nes.set_button(button, pressed)
 
         def pump_events() -> None:
             nonlocal running
@@ -127,35 +151,56 @@ def _interactive(nes: NES, scale: int) -> int:
                         BUTTON_RIGHT,
                     ):
                         pulse_frames[button] = 0
+                        button_state[button] = False
                         nes.set_button(button, False)
 
-        step_instruction = nes.bus.step
+        input_event_types = (pygame.KEYDOWN, pygame.KEYUP, pygame.QUIT, pygame.WINDOWFOCUSLOST)
+
+        def poll_input() -> bool:
+            # Mid-frame polls only do work when SDL has queued something that can change the input.
+            if pygame.event.peek(input_event_types):
+                pump_events()
+                apply_keyboard_state()
+            return not running
+
+        run_until_frame = nes.bus.run_until_frame
         ppu = nes.bus.ppu
+        perf_counter = time.perf_counter
+        next_deadline = perf_counter() + _FRAME_SECONDS
 
         while running:
             pump_events()
             apply_keyboard_state()
 
             ppu.frame_complete = False
-            executed = 0
-            while running and not ppu.frame_complete:
-                step_instruction()
-                executed += 1
-                # Keep input responsive even when emulation is running < 60 FPS.
-                if (executed & 0x1FF) == 0:
-                    pump_events()
-                    apply_keyboard_state()
-                if executed >= 1_000_000:
-                    raise RuntimeError("Frame execution exceeded instruction limit")
+            # Input is polled every 4096 instructions so it stays responsive below 60 FPS.
+            run_until_frame(1_000_000, 0x1000, poll_input)
+            if not running:
+                break
+            if not ppu.frame_complete:
+                raise RuntimeError("Frame execution exceeded instruction limit")
             ppu.frame_complete = False
 
-            if scale == 1:
-                window.blit(frame_surface, (0, 0))
-            else:
-                pygame.transform.scale(frame_surface, target_size, scaled_surface)
-                window.blit(scaled_surface, (0, 0))
-            pygame.display.flip()
-            clock.tick(60)
+            # Identical back-to-back frames (title and pause screens) keep the texture already uploaded.
+            if ppu.frame_dirty:
+                ppu.frame_dirty = False
+                upload_surface.blit(frame_surface, (0, 0))
+                texture.update(upload_surface)
+            renderer.clear()
+            texture.draw(dstrect=target_rect)
+            renderer.present()
+
+            # Sleep to just short of the deadline and spin the rest; late frames are not paced.
+            remaining = next_deadline - perf_counter()
+            if remaining > 0:
+                if remaining > 0.002:
+                    time.sleep(remaining - 0.001)
+                while perf_counter() < next_deadline:
+                    pass
+            elif remaining < -0.033:
+                # Too far behind to catch up, so the schedule restarts from now.
+                next_deadline = perf_counter()
+            next_deadline += _FRAME_SECONDS
     finally:
         pygame.quit()
     return 0
@@ -163,8 +208,9 @@ def _interactive(nes: NES, scale: int) -> int:
 
 def main() -> int:
     args = _parse_args()
-    nes = NES.from_rom(args.rom, ppu_backend=args.ppu_backend)
+    nes = NES.from_rom(args.rom, ppu_backend=args.ppu_backend, cpu_backend=args.cpu_backend)
     print(f"PPU backend: {nes.ppu_backend}")
+    print(f"CPU backend: {nes.cpu_backend}")
     if args.headless_frames > 0:
         return _headless(nes, args.headless_frames)
     return _interactive(nes, args.scale)
@@ -2,11 +2,24 @@
 from __future__ import annotations
 
 import argparse
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
+from typing import Iterable
 
 from nintendo_sim.nes import NES
 
+# Instructions run between polls of the result locations.
+_POLL_INTERVAL = 1024
+_BRANCH_OPCODES = frozenset((0x10, 0x30, 0x50, 0x70, 0x90, 0xB0, 0xD0, 0xF0))
+# The $F0 protocol requires $F1-$F8 to be clear alongside the result.
+_ZERO_RESULT_BYTES = bytes(8)
+# Written to $6001-$6003 by blargg tests once $6000 holds a valid status.
+_BLARGG_SIGNATURE = b"\xDE\xB0\x61"
+_NON_PRINTABLE = bytes(v for v in range(256) if not (32 <= v <= 126 or v in (10, 13, 9)))
+
 
 @dataclass
 class TestResult:
@@ -31,44 +44,58 @@ class TestResult:
 
 
 def _read_ascii(nes: NES, start_addr: int, limit: int = 512) -> str:
-    chars: list[str] = []
-    for i in range(limit):
-        value = nes.bus.cpu_read(start_addr + i)
-        if value == 0:
-            break
-        if 32 <= value <= 126 or value in (10, 13, 9):
-            chars.append(chr(value))
-    return "".join(chars).strip()
-
-
-def run_test_rom(rom_path: Path, max_instructions: int = 5_000_000, ppu_backend: str = "auto") -> TestResult:
-    nes = NES.from_rom(rom_path, ppu_backend=ppu_backend)
+    data = nes.bus.read_bytes(start_addr, limit)
+    end = data.find(0)
+    if end >= 0:
+        data = data[:end]
+    return data.translate(None, _NON_PRINTABLE).decode("ascii").strip()
+
+
+def _spins_in_place(cpu_read, pc: int) -> bool:
+    # A test parks the CPU on a jump or branch to itself once it has finished.
+    opcode = cpu_read(pc)
+    if opcode == 0x4C:
+        return (cpu_read((pc + 1) & 0xFFFF) | (cpu_read((pc + 2) & 0xFFFF) << 8)) == pc
+    return opcode in _BRANCH_OPCODES and cpu_read((pc + 1) & 0xFFFF) == 0xFE
+
+
+def run_test_rom(
+    rom_path: Path, max_instructions: int = 5_000_000, ppu_backend: str = "auto", cpu_backend: str = "auto"
+) -> TestResult:
+    nes = NES.from_rom(rom_path, ppu_backend=ppu_backend, cpu_backend=cpu_backend)
+    bus = nes.bus
+    cpu = bus.cpu
+    ppu = bus.ppu
+    cpu_read = bus.cpu_read
+    ram = bus.ram
+    read_bytes = bus.read_bytes
+    cpu_timing = rom_path.name == "cpu_timing_test.nes"
     status = 0xFF
-    message = ""
     frames = 0
-    last_pc = nes.bus.cpu.pc
+    last_pc = cpu.pc
     stable_pc = 0
-    for instruction in range(1, max_instructions + 1):
-        nes.step_instruction()
-        if nes.bus.ppu.frame_complete:
+    instruction = 0
+    # The CPU runs in batches and the result locations are only polled in between; a finished test
+    # spins forever, so a late poll sees the same result.
+    while instruction < max_instructions:
+        executed = bus.run_until_frame(min(_POLL_INTERVAL, max_instructions - instruction))
+        instruction += executed
+        if ppu.frame_complete:
             frames += 1
-            nes.bus.ppu.frame_complete = False
+            ppu.frame_complete = False
 
-        pc = nes.bus.cpu.pc
-        if pc == last_pc:
-            stable_pc += 1
+        pc = cpu.pc
+        if pc == last_pc and _spins_in_place(cpu_read, pc):
+            stable_pc += executed
         else:
             stable_pc = 0
             last_pc = pc
 
         # blargg protocol at $6000-$6004
-        signature_ok = (
-            nes.bus.cpu_read(0x6001) == 0xDE and nes.bus.cpu_read(0x6002) == 0xB0 and nes.bus.cpu_read(0x6003) == 0x61
-        )
-        if signature_ok:
-            status = nes.bus.cpu_read(0x6000)
-            message = _read_ascii(nes, 0x6004)
+        if read_bytes(0x6001, 3) == _BLARGG_SIGNATURE:
+            status = cpu_read(0x6000)
             if status not in (0x80, 0x81):
+                message = _read_ascii(nes, 0x6004)
                 return TestResult(
                     rom=rom_path,
                     protocol="blargg",
@@ -78,9 +105,13 @@ def run_test_rom(rom_path: Path, max_instructions: int = 5_000_000, ppu_backend:
                     instructions=instruction,
                 )
 
+        # The remaining protocols only report once the CPU has parked on its final loop.
+        if stable_pc <= 2000:
+            continue
+
         # Validation-runtime protocol where final result is in low RAM ($F8) and code loops forever.
-        f8_status = nes.bus.cpu_read(0x00F8)
-        if f8_status != 0 and stable_pc > 2000:
+        f8_status = ram[0x00F8]
+        if f8_status != 0:
             return TestResult(
                 rom=rom_path,
                 protocol="f8",
@@ -91,12 +122,12 @@ def run_test_rom(rom_path: Path, max_instructions: int = 5_000_000, ppu_backend:
             )
 
         # blargg_ppu_tests_2005.09.15b protocol where result is in $F0.
-        f0_status = nes.bus.cpu_read(0x00F0)
+        f0_status = ram[0x00F0]
         if (
             stable_pc > 4000
-            and nes.bus.ppu.ctrl == 0
+            and ppu.ctrl == 0
             and 1 <= f0_status <= 0x20
-            and all(nes.bus.cpu_read(a) == 0 for a in range(0x00F1, 0x00F9))
+            and ram[0x00F1:0x00F9] == _ZERO_RESULT_BYTES
         ):
             return TestResult(
                 rom=rom_path,
@@ -108,8 +139,8 @@ def run_test_rom(rom_path: Path, max_instructions: int = 5_000_000, ppu_backend:
             )
 
         # cpu_timing_test6 writes final text to console then loops forever at EA5A.
-        if rom_path.name == "cpu_timing_test.nes" and stable_pc > 2000 and pc == 0xEA5A:
-            msg_ptr = nes.bus.cpu_read(0x0000) | (nes.bus.cpu_read(0x0001) << 8)
+        if cpu_timing and pc == 0xEA5A:
+            msg_ptr = cpu_read(0x0000) | (cpu_read(0x0001) << 8)
             final_text = _read_ascii(nes, msg_ptr, limit=16).upper()
             status = 1 if final_text.startswith("PASSED") else 2
             return TestResult(
@@ -137,6 +168,21 @@ def _iter_nes_files(path: Path) -> list[Path]:
     return sorted(p for p in path.rglob("*.nes") if p.is_file())
 
 
+def _report(results: Iterable[TestResult]) -> int:
+    failed = 0
+    for result in results:
+        status = "PASS" if result.passed else "FAIL"
+        print(
+            f"{status:4} [{result.protocol}] {result.rom} "
+            f"frames={result.frames} instr={result.instructions} code=0x{result.status:02X}"
+        )
+        if result.message:
+            print(result.message)
+        if not result.passed:
+            failed += 1
+    return failed
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Run NES test ROMs ($6000 blargg + $F8 runtime + $F0 blargg_ppu + cpu_timing_test6)"
@@ -149,6 +195,18 @@ def main() -> int:
         default="auto",
         help="PPU implementation backend",
     )
+    parser.add_argument(
+        "--cpu-backend",
+        choices=("auto", "python", "cython"),
+        default="auto",
+        help="CPU implementation backend",
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=os.cpu_count() or 1,
+        help="ROMs run in parallel worker processes (1 runs them in this process)",
+    )
     args = parser.parse_args()
 
     roms = _iter_nes_files(args.path)
@@ -156,18 +214,15 @@ def main() -> int:
         print(f"No ROM files found under {args.path}")
         return 1
 
-    failed = 0
-    for rom in roms:
-        result = run_test_rom(rom, args.max_instructions, ppu_backend=args.ppu_backend)
-        status = "PASS" if result.passed else "FAIL"
-        print(
-            f"{status:4} [{result.protocol}] {rom} "
-            f"frames={result.frames} instr={result.instructions} code=0x{result.status:02X}"
-        )
-        if result.message:
-            print(result.message)
-        if not result.passed:
-            failed += 1
+    run = partial(
+        run_test_rom, max_instructions=args.max_instructions, ppu_backend=args.ppu_backend, cpu_backend=args.cpu_backend
+    )
+    # Every ROM runs on its own NES, so they are independent; results are still reported in ROM order.
+    if args.jobs <= 1 or len(roms) == 1:
+        failed = _report(map(run, roms))
+    else:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(roms))) as executor:
+            failed = _report(executor.map(run, roms))
     return 1 if failed else 0
 
 
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from setuptools import Extension, setup
 
 try:
@@ -11,11 +13,29 @@ except ImportError as exc:
     ) from exc
 
 
+# MSVC takes its own flags; -fno-plt only applies to ELF targets.
+extra_compile_args: list[str] = []
+if sys.platform != "win32":
+    extra_compile_args.append("-O3")
+if sys.platform.startswith("linux"):
+    extra_compile_args.append("-fno-plt")
+
 extensions = [
     Extension(
         "nintendo_sim.ppu_cython",
         ["nintendo_sim/ppu_cython.pyx"],
-    )
+        extra_compile_args=extra_compile_args,
+    ),
+    Extension(
+        "nintendo_sim.cpu_cython",
+        ["nintendo_sim/cpu_cython.pyx"],
+        extra_compile_args=extra_compile_args,
+    ),
+    Extension(
+        "nintendo_sim.controller_cython",
+        ["nintendo_sim/controller_cython.pyx"],
+        extra_compile_args=extra_compile_args,
+    ),
 ]
 
 setup(
@@ -27,6 +47,10 @@ setup(
             "boundscheck": False,
             "wraparound": False,
             "initializedcheck": False,
+            "cdivision": True,
+            "nonecheck": False,
+            "profile": False,
+            "linetrace": False,
         },
     ),
 )
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+import unittest
+
+from nintendo_sim.cpu_backend import resolve_cpu_class
+
+
+def _cpu_classes():
+    classes = [resolve_cpu_class("python")[0]]
+    try:
+        classes.append(resolve_cpu_class("cython")[0])
+    except RuntimeError:
+        pass
+    return classes
+
+
+class BlockWrapTest(unittest.TestCase):
+    def test_run_wraps_past_ffff_like_step(self) -> None:
+        # NOPs up to an LDA absolute at $FFFE, whose operand wraps to $0000.
+        for cpu_class in _cpu_classes():
+            with self.subTest(cpu=cpu_class.__module__):
+                results = []
+                for use_run in (False, True):
+                    memory = bytearray([0xEA]) * 0x10000
+                    memory[0xFFFE] = 0xAD
+                    cpu = cpu_class(memory.__getitem__, memory.__setitem__)
+                    cpu.pc = 0xFFF8
+                    if use_run:
+                        executed = cpu.run(8, lambda cycles: False)
+                    else:
+                        executed = 8
+                        for _ in range(8):
+                            cpu.step()
+                    results.append((executed, cpu.pc, cpu.total_cycles))
+                self.assertEqual(results[0], (8, 0x0002, 18))
+                self.assertEqual(results[1], results[0])
+
+
+if __name__ == "__main__":
+    unittest.main()